@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.core.exceptions import ValidationError
+from core.rules import clean_field
+from core.utils import users_with_email, users_with_username
 from .models import UserProfile
 
 class CustomUserCreationForm(UserCreationForm):
@@ -10,10 +12,6 @@ class CustomUserCreationForm(UserCreationForm):
         widget=forms.EmailInput(attrs={
             'class': 'form-input', 
             'placeholder': 'your.email@example.com',
-            'hx-post': '/accounts/validate/email/', 
-            'hx-trigger': 'keyup changed delay:500ms',
-            'hx-target': '#email-validation', 
-            'hx-swap': 'innerHTML'
         })
     )
     first_name = forms.CharField(
@@ -22,10 +20,6 @@ class CustomUserCreationForm(UserCreationForm):
         widget=forms.TextInput(attrs={
             'class': 'form-input', 
             'placeholder': 'Enter your first name',
-            'hx-post': '/accounts/validate/first-name/', 
-            'hx-trigger': 'keyup changed delay:300ms',
-            'hx-target': '#first-name-validation', 
-            'hx-swap': 'innerHTML'
         })
     )
     last_name = forms.CharField(
@@ -34,10 +28,6 @@ class CustomUserCreationForm(UserCreationForm):
         widget=forms.TextInput(attrs={
             'class': 'form-input', 
             'placeholder': 'Enter your last name',
-            'hx-post': '/accounts/validate/last-name/', 
-            'hx-trigger': 'keyup changed delay:300ms',
-            'hx-target': '#last-name-validation', 
-            'hx-swap': 'innerHTML'
         })
     )
 
@@ -52,29 +42,17 @@ class CustomUserCreationForm(UserCreationForm):
         self.fields['username'].widget.attrs.update({
             'class': 'form-input', 
             'placeholder': 'Choose a unique username',
-            'hx-post': '/accounts/validate/username/', 
-            'hx-trigger': 'keyup changed delay:500ms',
-            'hx-target': '#username-validation', 
-            'hx-swap': 'innerHTML'
         })
         
         # Update password fields
         self.fields['password1'].widget.attrs.update({
             'class': 'form-input', 
             'placeholder': 'Create a strong password',
-            'hx-post': '/accounts/validate/password/', 
-            'hx-trigger': 'keyup changed delay:300ms',
-            'hx-target': '#password-validation', 
-            'hx-swap': 'innerHTML'
         })
         
         self.fields['password2'].widget.attrs.update({
             'class': 'form-input', 
             'placeholder': 'Confirm your password',
-            'hx-post': '/accounts/validate/password2/', 
-            'hx-trigger': 'keyup changed delay:300ms',
-            'hx-target': '#password2-validation', 
-            'hx-swap': 'innerHTML'
         })
         
         # Update field labels and help text
@@ -92,29 +70,17 @@ class CustomUserCreationForm(UserCreationForm):
 
     def clean_email(self):
         """Enhanced email validation"""
-        email = self.cleaned_data.get('email')
+        email = clean_field('email', self.cleaned_data.get('email'))
         if email:
-            email = email.lower().strip()
-            if User.objects.filter(email=email).exists():
+            if users_with_email(email).exists():
                 raise ValidationError("An account with this email already exists.")
         return email
 
     def clean_username(self):
-        """Enhanced username validation"""
-        username = self.cleaned_data.get('username')
-        if username:
-            username = username.strip()
-            
-            # Check for reserved usernames
-            reserved_usernames = ['admin', 'root', 'user', 'test', 'guest', 'administrator', 'api', 'www']
-            if username.lower() in reserved_usernames:
-                raise ValidationError("This username is reserved. Please choose another one.")
-                
-            # Check for profanity or inappropriate content (basic check)
-            inappropriate_words = ['spam', 'fake', 'scam', 'phishing']
-            if any(word in username.lower() for word in inappropriate_words):
-                raise ValidationError("Please choose a more appropriate username.")
-                
+        """Enhanced username validation, rejecting usernames that differ only in case"""
+        username = clean_field('username', self.cleaned_data.get('username'))
+        if username and users_with_username(username).exists():
+            raise ValidationError("A user with that username already exists.")
         return username
 
     def clean(self):
@@ -153,26 +119,14 @@ class UserProfileForm(forms.ModelForm):
             'phone_number': forms.TextInput(attrs={
                 'class': 'form-input', 
                 'placeholder': '+1 (555) 123-4567',
-                'hx-post': '/validate/phone-number/',
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#phone-validation',
-                'hx-swap': 'innerHTML'
             }),
             'website': forms.URLInput(attrs={
                 'class': 'form-input', 
                 'placeholder': 'https://your-website.com',
-                'hx-post': '/validate/website/',
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#website-validation',
-                'hx-swap': 'innerHTML'
             }),
             'location': forms.TextInput(attrs={
                 'class': 'form-input', 
                 'placeholder': 'City, Country',
-                'hx-post': '/validate/location/',
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#location-validation',
-                'hx-swap': 'innerHTML'
             })
         }
 
@@ -210,64 +164,13 @@ class UserProfileForm(forms.ModelForm):
         return bio
 
     def clean_phone_number(self):
-        """Enhanced phone number validation"""
-        phone = self.cleaned_data.get('phone_number')
-        if phone:
-            phone = phone.strip()
-            
-            # Remove all non-digit characters for validation
-            digits_only = ''.join(filter(str.isdigit, phone))
-            
-            if len(digits_only) < 10:
-                raise ValidationError("Phone number must contain at least 10 digits.")
-            if len(digits_only) > 15:
-                raise ValidationError("Phone number is too long.")
-                
-            # Check for obviously fake numbers
-            if digits_only in ['0000000000', '1111111111', '1234567890', '9999999999']:
-                raise ValidationError("Please enter a valid phone number.")
-                
-        return phone
+        return clean_field('phone_number', self.cleaned_data.get('phone_number'))
 
     def clean_website(self):
-        """Enhanced website validation"""
-        website = self.cleaned_data.get('website')
-        if website:
-            website = website.strip()
-            
-            # Add protocol if missing
-            if not website.startswith(('http://', 'https://')):
-                website = 'https://' + website
-                
-            # Additional validation for suspicious patterns
-            suspicious_patterns = ['bit.ly', 'tinyurl', 'localhost', '127.0.0.1', 'example.com']
-            if any(pattern in website.lower() for pattern in suspicious_patterns):
-                if 'example.com' in website.lower():
-                    raise ValidationError("Please enter your actual website URL.")
-                    
-        return website
+        return clean_field('website', self.cleaned_data.get('website'))
 
     def clean_location(self):
-        """Enhanced location validation"""
-        location = self.cleaned_data.get('location')
-        if location:
-            location = location.strip()
-            
-            # Check for minimum meaningful content
-            if len(location) < 2:
-                raise ValidationError("Location must be at least 2 characters.")
-                
-            # Check for valid characters (letters, spaces, commas, hyphens, apostrophes)
-            import re
-            if not re.match(r'^[a-zA-Z\s,\-\'\.]+$', location):
-                raise ValidationError("Location can only contain letters, spaces, commas, hyphens, apostrophes, and periods.")
-                
-            # Check for obvious test data
-            test_locations = ['test', 'testing', 'xyz', 'abc', 'none', 'n/a']
-            if location.lower() in test_locations:
-                raise ValidationError("Please enter a valid location.")
-                
-        return location
+        return clean_field('location', self.cleaned_data.get('location'))
 
     def clean_birth_date(self):
         """Enhanced birth date validation"""
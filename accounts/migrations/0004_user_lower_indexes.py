@@ -0,0 +1,23 @@
+# Generated manually for case-insensitive user lookups
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_userprofile_birth_date_and_more'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # Functional indexes matching the Lower() lookups in core.utils
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS accounts_user_email_lower_idx ON auth_user (LOWER(email));",
+            reverse_sql="DROP INDEX IF EXISTS accounts_user_email_lower_idx;"
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS accounts_user_username_lower_idx ON auth_user (LOWER(username));",
+            reverse_sql="DROP INDEX IF EXISTS accounts_user_username_lower_idx;"
+        ),
+    ]
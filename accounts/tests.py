@@ -1,3 +1,28 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from core.utils import users_with_email, users_with_username
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plan text is SQLite specific')
+class UserLookupQueryPlanTests(TestCase):
+    """Availability and reset lookups must use the Lower() indexes, not scan auth_user"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan)
+        self.assertNotIn('SCAN auth_user', plan)
+
+    def test_email_lookup_uses_lower_email_index(self):
+        self.assertUsesIndex(users_with_email('Jane@Example.org'), 'accounts_user_email_lower_idx')
+
+    def test_username_lookup_uses_lower_username_index(self):
+        self.assertUsesIndex(users_with_username('JaneDoe'), 'accounts_user_username_lower_idx')
+
+    def test_lookups_ignore_case(self):
+        User.objects.create_user('JaneDoe', 'Jane.Doe@Company.org', 'x-9Hq!w2Zr')
+        self.assertTrue(users_with_email(' jane.doe@company.org ').exists())
+        self.assertTrue(users_with_username('janedoe').exists())
@@ -10,16 +10,19 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import reverse_lazy
 from django.core.exceptions import ValidationError
-from django.contrib.auth.password_validation import validate_password
 from django.views.decorators.csrf import csrf_exempt
 
 from .forms import CustomUserCreationForm, UserProfileForm
 from .models import UserProfile
+from core import utils as core_utils
 from core.utils import (
-    is_htmx_request, validate_name, validate_username, 
-    validate_email_availability, validate_password_strength,
-    log_validation_attempt
+    is_htmx_request, validate_name, 
+    validate_email_availability,
+    log_validation_attempt, render_validation_response
 )
+from core.availability import is_taken
+from core.batch_validation import check_password, check_password_confirmation
+from core.routers import on_replica
 
 logger = logging.getLogger(__name__)
 
@@ -181,16 +184,16 @@ def validate_username(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_username(username)
+        is_valid, message = core_utils.validate_username(username)
         log_validation_attempt('username', username, is_valid, request)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating username: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Username validation failed'})
+        return render_validation_response('error', 'Username validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_login_username(request):
@@ -202,22 +205,16 @@ def validate_login_username(request):
     try:
         # First check basic format requirements
         if len(username) < 3:
-            return render(request, 'partials/validation_warning.html', {
-                'message': f'Username too short ({len(username)}/3 characters minimum)'
-            })
+            return render_validation_response('warning', f'Username too short ({len(username)}/3 characters minimum)', request)
         
         # Check if username exists
-        if User.objects.filter(username=username).exists():
-            return render(request, 'partials/validation_success.html', {
-                'message': '✓ Username found'
-            })
+        if is_taken('username', username, on_replica(User.objects.filter(username=username))):
+            return render_validation_response('success', '✓ Username found', request)
         else:
-            return render(request, 'partials/validation_warning.html', {
-                'message': 'Username not found in our system'
-            })
+            return render_validation_response('warning', 'Username not found in our system', request)
     except Exception as e:
         logger.error(f"Error validating login username: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_first_name(request):
@@ -231,12 +228,12 @@ def validate_first_name(request):
         log_validation_attempt('first_name', first_name, is_valid, request)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating first name: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'First name validation failed'})
+        return render_validation_response('error', 'First name validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_last_name(request):
@@ -250,12 +247,12 @@ def validate_last_name(request):
         log_validation_attempt('last_name', last_name, is_valid, request)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating last name: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Last name validation failed'})
+        return render_validation_response('error', 'Last name validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_email_register(request):
@@ -269,12 +266,12 @@ def validate_email_register(request):
         log_validation_attempt('registration_email', email, is_valid, request)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating registration email: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Email validation failed'})
+        return render_validation_response('error', 'Email validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_password_reset_email(request):
@@ -285,13 +282,13 @@ def validate_password_reset_email(request):
     
     try:
         # Check if user exists with this email
-        if User.objects.filter(email=email).exists():
-            return render(request, 'partials/validation_success.html', {'message': 'Email found in our system'})
+        if is_taken('email', email, on_replica(core_utils.users_with_email(email))):
+            return render_validation_response('success', 'Email found in our system', request)
         else:
-            return render(request, 'partials/validation_warning.html', {'message': 'No account found with this email'})
+            return render_validation_response('warning', 'No account found with this email', request)
     except Exception as e:
         logger.error(f"Error validating password reset email: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Email validation failed'})
+        return render_validation_response('error', 'Email validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_password(request):
@@ -301,58 +298,22 @@ def validate_password(request):
         return HttpResponse('')
     
     try:
-        # Get Django's built-in password validation
-        django_errors = []
-        try:
-            validate_password(password)
-        except ValidationError as e:
-            django_errors = e.messages
-        
-        # Get custom strength validation
-        strength, feedback = validate_password_strength(password)
-        
-        # Combine validation results
-        if django_errors:
-            return render(request, 'partials/validation_error.html', {
-                'message': django_errors[0]  # Show first Django validation error
-            })
-        elif strength < 3:
-            return render(request, 'partials/validation_warning.html', {
-                'message': f'Password strength: {"Weak" if strength <= 1 else "Fair"}. Missing: {", ".join(feedback)}'
-            })
-        else:
-            strength_label = "Strong" if strength >= 4 else "Good"
-            return render(request, 'partials/validation_success.html', {
-                'message': f'✓ {strength_label} password!'
-            })
-            
+        template_type, message = check_password(password, request.POST)
+        return render_validation_response(template_type, message, request)
     except Exception as e:
         logger.error(f"Error validating password: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Password validation failed'})
+        return render_validation_response('error', 'Password validation failed', request)
 
 @require_http_methods(["POST"])
 def validate_password2(request):
     """Enhanced password confirmation validation"""
-    password1 = request.POST.get('password1', '')
     password2 = request.POST.get('password2', '')
-    
     if not password2:
         return HttpResponse('')
     
     try:
-        if not password1:
-            return render(request, 'partials/validation_warning.html', {
-                'message': 'Enter password first'
-            })
-        elif password1 != password2:
-            return render(request, 'partials/validation_error.html', {
-                'message': 'Passwords do not match'
-            })
-        else:
-            return render(request, 'partials/validation_success.html', {
-                'message': '✓ Passwords match!'
-            })
-        
+        template_type, message = check_password_confirmation(password2, request.POST)
+        return render_validation_response(template_type, message, request)
     except Exception as e:
         logger.error(f"Error validating password confirmation: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Password confirmation failed'})
+        return render_validation_response('error', 'Password confirmation failed', request)
@@ -33,6 +33,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.replica_pinning_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -59,29 +60,77 @@ TEMPLATES = [
 # ASGI Configuration for Channels
 ASGI_APPLICATION = 'config.asgi.application'
 
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+
 # Channels Configuration
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [config('REDIS_URL', default='redis://localhost:6379/0')],
+            "hosts": [REDIS_URL],
         },
     },
 }
 
+# Cache Configuration
+# Per-process memory by default. With several worker processes set
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache so data versions
+# and counters agree; its LOCATION defaults to REDIS_URL
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=REDIS_URL if 'redis' in CACHE_BACKEND else ''),
+        'KEY_PREFIX': 'htmx',
+    }
+}
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# SQLite pragmas applied to every new connection. The performance profile
+# uses WAL so readers never block the writer, and syncs at checkpoints
+# instead of on every commit (durable against crashes, may lose the last
+# commits on power loss). See the sqlite_maintenance command for upkeep.
+SQLITE_PRAGMAS = ['foreign_keys=ON']
+if config('SQLITE_PERFORMANCE_PROFILE', default=True, cast=bool):
+    SQLITE_PRAGMAS += [
+        'journal_mode=WAL',
+        'synchronous=NORMAL',
+        f"mmap_size={config('SQLITE_MMAP_SIZE', default=134217728, cast=int)}",
+        f"cache_size=-{config('SQLITE_CACHE_SIZE_KB', default=32768, cast=int)}",
+        'temp_store=MEMORY',
+        f"busy_timeout={config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)}",
+    ]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
         'OPTIONS': {
-            'init_command': "PRAGMA foreign_keys=ON",
+            'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS),
             'transaction_mode': 'IMMEDIATE',
         },
     }
 }
 
+# Optional read replica for exports, dashboard counts and availability
+# checks (see core.routers). For local testing point it at a
+# second SQLite file and keep it current with `manage.py sync_replica --loop 5`
+DATABASE_REPLICA_NAME = config('DATABASE_REPLICA_NAME', default='')
+if DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DATABASE_REPLICA_NAME,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS + ['query_only=ON']),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# After a write, keep the client on the primary for this long
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 8}},
@@ -121,6 +170,61 @@ MESSAGE_TAGS = {
     messages.ERROR: 'bg-red-100 text-red-800',
 }
 
+# Near-duplicate contact detection
+# CONTACT_DUPLICATE_ACTION: 'allow' disables it, 'reject' shows a form error,
+# 'resolve' stores the submission as already resolved without notifying staff
+CONTACT_DUPLICATE_ACTION = config('CONTACT_DUPLICATE_ACTION', default='allow')
+CONTACT_DUPLICATE_WINDOW_DAYS = config('CONTACT_DUPLICATE_WINDOW_DAYS', default=7, cast=int)
+CONTACT_DUPLICATE_MAX_DISTANCE = 7  # Max differing SimHash bits from the same sender (must be < 8)
+# Max differing bits from another sender; one changed word moves about 4 bits,
+# so templated messages from different people stay apart
+CONTACT_DUPLICATE_ANY_SENDER_DISTANCE = config('CONTACT_DUPLICATE_ANY_SENDER_DISTANCE', default=0, cast=int)
+
+# Serve the home page, contact list and counts API from core.async_views;
+# only worth it under ASGI (daphne), so off by default
+CORE_ASYNC_VIEWS = config('CORE_ASYNC_VIEWS', default=False, cast=bool)
+# Threads for ORM reads from async views; 0 uses Django's single
+# thread-sensitive executor (the plain async ORM behaviour)
+ASYNC_DB_READ_THREADS = config('ASYNC_DB_READ_THREADS', default=4, cast=int)
+
+# Group commit: contact and newsletter inserts from concurrent requests
+# are combined into one transaction per window (see core.batching)
+WRITE_BATCHING = config('WRITE_BATCHING', default=False, cast=bool)
+WRITE_BATCH_WINDOW_MS = config('WRITE_BATCH_WINDOW_MS', default=5, cast=int)
+WRITE_BATCH_MAX_SIZE = 100
+
+# Repeats of a contact submission (same form token, or same email, subject
+# and message) within this window return the original instead of a new row
+CONTACT_IDEMPOTENCY_WINDOW_SECONDS = config('CONTACT_IDEMPOTENCY_WINDOW_SECONDS', default=600, cast=int)
+
+# Facet counts on the staff list are cached per search for this long
+CONTACT_FACET_CACHE_SECONDS = config('CONTACT_FACET_CACHE_SECONDS', default=30, cast=int)
+
+# Resolved contacts older than this are moved to the archive table
+CONTACT_ARCHIVE_AFTER_DAYS = config('CONTACT_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# Disposable email domains rejected by the email validators (see core.blocklist).
+# Files written by `manage.py build_domain_blocklist` are memory-mapped and
+# shared between workers; the file is re-checked for changes this often
+DISPOSABLE_DOMAINS_FILE = config('DISPOSABLE_DOMAINS_FILE', default=str(BASE_DIR / 'core' / 'data' / 'disposable_domains.txt'))
+DISPOSABLE_DOMAINS_MMAP = config('DISPOSABLE_DOMAINS_MMAP', default=True, cast=bool)
+DISPOSABLE_DOMAINS_RELOAD_SECONDS = config('DISPOSABLE_DOMAINS_RELOAD_SECONDS', default=60, cast=int)
+
+# Per-process Bloom filters answer most username/email availability checks
+# without a query (see core.availability). Values taken in other processes are
+# replayed from the shared cache every SYNC seconds and the filters rebuilt
+# every REBUILD seconds
+AVAILABILITY_FILTERS = config('AVAILABILITY_FILTERS', default=True, cast=bool)
+AVAILABILITY_FILTER_ERROR_RATE = config('AVAILABILITY_FILTER_ERROR_RATE', default=0.01, cast=float)
+AVAILABILITY_FILTER_SYNC_SECONDS = config('AVAILABILITY_FILTER_SYNC_SECONDS', default=5, cast=int)
+AVAILABILITY_FILTER_REBUILD_SECONDS = config('AVAILABILITY_FILTER_REBUILD_SECONDS', default=600, cast=int)
+
+# Memo of database-free field validation results (see core.validation_cache);
+# the TTL bounds how long a blocklist reload takes to reach cached emails.
+# A size of 0 disables the cache
+VALIDATION_CACHE_SIZE = config('VALIDATION_CACHE_SIZE', default=2048, cast=int)
+VALIDATION_CACHE_TTL_SECONDS = config('VALIDATION_CACHE_TTL_SECONDS', default=60, cast=int)
+
 # Security Settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -193,7 +297,8 @@ STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.ManifestStaticFilesSto
 
 # Database Optimization
 if not DEBUG:
-    DATABASES['default']['CONN_MAX_AGE'] = 60
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 60
 
 # Session Security
 SESSION_COOKIE_SECURE = not DEBUG
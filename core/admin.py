@@ -1,15 +1,29 @@
 from django.contrib import admin
-from .models import Contact, NewsletterSubscription
+from .history import get_email_history
+from .models import ArchivedContact, Contact, ContactRollup, EmailHistory, NewsletterSubscription
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'subject', 'category', 'created_at', 'is_resolved')
     list_filter = ('is_resolved', 'category', 'created_at')
     search_fields = ('name', 'email', 'subject', 'message')
+    readonly_fields = ('customer_history',)
     actions = ['mark_as_resolved']
 
+    @admin.display(description='Customer history')
+    def customer_history(self, obj):
+        history = get_email_history(obj.email) if obj.pk else None
+        if history is None:
+            return 'No previous contacts'
+        return (
+            f'{history.contact_count} contacts ({history.open_count} open), '
+            f'first {history.first_seen:%Y-%m-%d}, last {history.last_seen:%Y-%m-%d}'
+        )
+
     def mark_as_resolved(self, request, queryset):
-        queryset.update(is_resolved=True, resolved_by=request.user)
+        # Go through mark_resolved so resolved_at and the rollups stay correct
+        for contact in queryset.filter(is_resolved=False):
+            contact.mark_resolved(request.user)
     mark_as_resolved.short_description = "Mark selected contacts as resolved"
 
 @admin.register(NewsletterSubscription)
@@ -17,3 +31,23 @@ class NewsletterSubscriptionAdmin(admin.ModelAdmin):
     list_display = ('email', 'subscribed_at', 'is_active')
     list_filter = ('is_active', 'subscribed_at')
     search_fields = ('email',)
+
+@admin.register(ContactRollup)
+class ContactRollupAdmin(admin.ModelAdmin):
+    list_display = ('bucket', 'granularity', 'category', 'created_count', 'resolved_count')
+    list_filter = ('granularity', 'category')
+    date_hierarchy = 'bucket'
+
+@admin.register(ArchivedContact)
+class ArchivedContactAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'email', 'subject', 'category', 'created_at', 'archived_at')
+    list_filter = ('category', 'archived_at')
+    search_fields = ('name', 'email', 'subject')
+    readonly_fields = ('message',)
+    exclude = ('message_compressed',)
+
+@admin.register(EmailHistory)
+class EmailHistoryAdmin(admin.ModelAdmin):
+    list_display = ('email', 'contact_count', 'open_count', 'first_seen', 'last_seen')
+    search_fields = ('email',)
+    ordering = ('-last_seen',)
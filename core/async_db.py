@@ -0,0 +1,66 @@
+"""
+Helpers for running ORM reads from async views.
+
+Django's async ORM hands every query to sync_to_async(thread_sensitive=True),
+which under daphne means one shared thread for the whole process. Reads
+issued through run_read() go to a dedicated pool instead, so concurrent
+requests (and independent queries within one request) run in parallel.
+With ASYNC_DB_READ_THREADS = 0 they fall back to the async ORM's executor.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.shortcuts import render
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_read_threads():
+    return getattr(settings, 'ASYNC_DB_READ_THREADS', 0)
+
+def get_read_executor():
+    """Process-wide read pool, created on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_read_threads(),
+                    thread_name_prefix='db-read',
+                )
+    return _executor
+
+def _call_in_pool(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Pool threads outlive requests and no request_finished signal
+        # reaches them, so a connection left open here would never be
+        # recycled or notice a dropped server; close it after every job
+        for connection in connections.all(initialized_only=True):
+            connection.close()
+
+async def run_read(func, *args, **kwargs):
+    """Run a blocking, read-only ORM call without holding up the event loop"""
+    if not get_read_threads():
+        return await sync_to_async(func)(*args, **kwargs)
+    return await sync_to_async(
+        _call_in_pool, thread_sensitive=False, executor=get_read_executor()
+    )(func, *args, **kwargs)
+
+async def arender(request, template_name, context=None):
+    """Render on the read pool; templates may still touch lazy relations"""
+    return await run_read(render, request, template_name, context)
+
+async def aget_page(queryset, number, per_page):
+    """Async counterpart of Paginator.get_page() with the rows already fetched"""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await run_read(queryset.count)
+    # With the count known, get_page() only slices the queryset lazily
+    page = paginator.get_page(number)
+    page.object_list = await run_read(list, page.object_list)
+    return page
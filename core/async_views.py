@@ -0,0 +1,89 @@
+# core/async_views.py
+"""
+Async versions of the read-heavy core views.
+
+Under ASGI a sync view runs on the single thread-sensitive executor, so
+concurrent staff list loads queue behind each other. These views await
+their queries on the read pool from core.async_db instead. They are wired
+in by core/urls.py when CORE_ASYNC_VIEWS is enabled.
+"""
+import asyncio
+import logging
+from django.shortcuts import redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .async_db import aget_page, arender, run_read
+from .conditional import contact_data_conditional
+from .facets import get_contact_facets
+from .forms import NewsletterForm
+from .models import Contact
+from .utils import aget_contact_stats, contact_list_queryset
+from .views import CONTACTS_PER_PAGE
+
+logger = logging.getLogger(__name__)
+
+async def home(request):
+    """Home page with dashboard stats"""
+    context = await aget_contact_stats()
+    context['newsletter_form'] = NewsletterForm()
+    return await arender(request, 'core/home.html', context)
+
+@login_required
+@contact_data_conditional
+async def contact_list_view(request):
+    """Display contact list; the page and the facet counts are read concurrently"""
+    user = await request.auser()
+    if not user.is_staff:
+        messages.error(request, 'You do not have permission to view this page.')
+        return redirect('core:home')
+
+    try:
+        query = request.GET.get('q', '').strip()
+        status = request.GET.get('status', '')
+        archived = request.GET.get('archived') == '1'
+
+        contacts_list = contact_list_queryset(query, status, archived)
+        page_obj, facets = await asyncio.gather(
+            aget_page(contacts_list, request.GET.get('page'), CONTACTS_PER_PAGE),
+            run_read(get_contact_facets, query, archived),
+        )
+
+        context = {
+            'contacts': page_obj,
+            'facets': facets,
+            'query': query,
+            'status': status,
+            'archived': archived
+        }
+        return await arender(request, 'core/contact_list.html', context)
+
+    except Exception as e:
+        logger.error(f"Error loading contact list: {e}")
+        messages.error(request, 'Error loading contacts. Please try again.')
+        return redirect('core:home')
+
+@login_required
+@require_http_methods(["GET"])
+@contact_data_conditional
+async def api_pending_contacts_count(request):
+    """API endpoint to get current pending contacts count"""
+    user = await request.auser()
+    if not user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    try:
+        pending_count, total_count = await asyncio.gather(
+            run_read(Contact.objects.filter(is_resolved=False).count),
+            run_read(Contact.objects.count),
+        )
+
+        return JsonResponse({
+            'pending_count': pending_count,
+            'total_count': total_count
+        })
+    except Exception as e:
+        logger.error(f"Error getting pending contacts count: {e}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
@@ -0,0 +1,283 @@
+"""
+In-process existence filters for the availability checks.
+
+The htmx validators ask "is this username or email taken?" on every
+debounced keystroke. Each process keeps one Bloom filter per question
+(usernames, account emails, active newsletter emails), built from the
+database on first use and kept current by post_save signals. A value the
+filter has never seen is definitely not taken and is answered without a
+query; anything else is only possibly taken and is confirmed in the
+database.
+
+Bloom filters cannot forget, so deleted users, old usernames and
+unsubscribed emails stay in until the next rebuild and just cost a
+confirming query. Values taken in other worker processes (new rows, but
+also changed usernames and emails and reactivated subscriptions, which no
+query on the tables can find cheaply) are published to a numbered log in
+the shared cache, and every AVAILABILITY_FILTER_SYNC_SECONDS each process
+replays the entries it has not seen, then picks up rows written without
+signals by a primary-key catch-up query. A gap in the log (expired or
+evicted entries) forces a rebuild, as do AVAILABILITY_FILTER_REBUILD_SECONDS
+passing and a filter outgrowing its capacity. The filters only serve
+keystroke feedback: form submissions still ask the database.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from .models import NewsletterSubscription
+
+logger = logging.getLogger(__name__)
+
+MIN_CAPACITY = 1000
+CAPACITY_HEADROOM = 2  # room to grow before a rebuild is forced
+
+KEY_PREFIX = 'core:availability'
+MAX_REPLAY = 1000  # log entries replayed at once; a longer gap rebuilds instead
+
+# Tags this process's log entries so it does not replay (and count) them twice
+PROCESS_ID = uuid.uuid4().hex
+
+def filter_key(value):
+    return value.strip().lower()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, sized for capacity items at error_rate"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hash_count = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class AvailabilityFilter:
+    """A Bloom filter over one column of a queryset, with lookup counters"""
+
+    def __init__(self, name, queryset, field, error_rate=0.01, sync_seconds=5, rebuild_seconds=600):
+        self.name = name
+        self.queryset = queryset
+        self.field = field
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._max_pk = 0
+        self._seq = 0
+        self._sync_at = 0
+        self._rebuild_at = 0
+        self.lookups = 0
+        self.skipped_queries = 0
+        self.confirmed_hits = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+
+    def add(self, value):
+        """Record a value that is now taken in this process's filter"""
+        bloom = self._bloom
+        if bloom is not None and value:
+            bloom.add(filter_key(value))
+
+    def _seq_key(self):
+        return f'{KEY_PREFIX}:{self.name}:seq'
+
+    def _entry_key(self, seq):
+        return f'{KEY_PREFIX}:{self.name}:{seq}'
+
+    def remember(self, value):
+        """Record a committed value here and publish it for the other processes"""
+        if not value:
+            return
+        self.add(value)
+        try:
+            cache.add(self._seq_key(), 0, None)
+            seq = cache.incr(self._seq_key())
+            cache.set(self._entry_key(seq), (PROCESS_ID, filter_key(value)), self.rebuild_seconds)
+        except Exception as e:
+            # Other processes see the value at their next rebuild instead
+            logger.warning(f"Could not publish {self.name} availability update: {e}")
+
+    def _published_seq(self):
+        try:
+            return cache.get(self._seq_key(), 0)
+        except Exception as e:
+            logger.warning(f"Availability update log unavailable: {e}")
+            return None
+
+    def might_contain(self, value):
+        self._ensure_current()
+        return filter_key(value) in self._bloom
+
+    def is_taken(self, value, queryset):
+        """Whether queryset has a row for value, querying only on a possible hit"""
+        self.lookups += 1
+        if not self.might_contain(value):
+            self.skipped_queries += 1
+            return False
+        if queryset.exists():
+            self.confirmed_hits += 1
+            return True
+        self.false_positives += 1
+        return False
+
+    def stats(self):
+        bloom = self._bloom
+        possible_hits = self.lookups - self.skipped_queries
+        return {
+            'lookups': self.lookups,
+            'skipped_queries': self.skipped_queries,
+            'skip_rate': round(self.skipped_queries / self.lookups, 4) if self.lookups else None,
+            'confirmed_hits': self.confirmed_hits,
+            'false_positives': self.false_positives,
+            'false_positive_rate': round(self.false_positives / possible_hits, 4) if possible_hits else None,
+            'items': bloom.count if bloom else 0,
+            'capacity': bloom.capacity if bloom else 0,
+            'bytes': len(bloom.bits) if bloom else 0,
+            'rebuilds': self.rebuilds,
+        }
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        bloom = self._bloom
+        if bloom is not None and now < self._sync_at and bloom.count <= bloom.capacity:
+            return
+        with self._lock:
+            bloom = self._bloom
+            if bloom is None or now >= self._rebuild_at or bloom.count > bloom.capacity:
+                self._rebuild(now)
+            elif now >= self._sync_at:
+                self._catch_up(now)
+
+    def _rows(self, queryset):
+        return queryset.values_list('pk', self.field).order_by().iterator(chunk_size=2000)
+
+    def _rebuild(self, now):
+        started = time.perf_counter()
+        # Entries published from here on may be missing from the scan; replay them later
+        seq = self._published_seq()
+        queryset = self.queryset()
+        capacity = max(queryset.count() * CAPACITY_HEADROOM, MIN_CAPACITY)
+        bloom = BloomFilter(capacity, self.error_rate)
+        max_pk = 0
+        for pk, value in self._rows(queryset):
+            if value:
+                bloom.add(filter_key(value))
+            max_pk = max(max_pk, pk)
+
+        self._bloom, self._max_pk = bloom, max_pk
+        if seq is not None:
+            self._seq = seq
+        self._sync_at = now + self.sync_seconds
+        self._rebuild_at = now + self.rebuild_seconds
+        self.rebuilds += 1
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"Built {self.name} availability filter: {bloom.count} items, {len(bloom.bits)} bytes in {elapsed:.0f} ms")
+
+    def _catch_up(self, now):
+        """Add values taken since the last build, including by other processes"""
+        if not self._replay():
+            self._rebuild(now)
+            return
+        bloom = self._bloom
+        for pk, value in self._rows(self.queryset().filter(pk__gt=self._max_pk)):
+            if value:
+                bloom.add(filter_key(value))
+            self._max_pk = max(self._max_pk, pk)
+        self._sync_at = now + self.sync_seconds
+
+    def _replay(self):
+        """Add published values not seen yet; False when the log has a gap"""
+        seq = self._published_seq()
+        if seq is None or seq == self._seq:
+            return True
+        if seq < self._seq or seq - self._seq > MAX_REPLAY:
+            # The log was reset (cache flushed) or we fell too far behind
+            return False
+        keys = [self._entry_key(n) for n in range(self._seq + 1, seq + 1)]
+        try:
+            entries = cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Availability update log unavailable: {e}")
+            return True
+        if len(entries) < len(keys):
+            return False
+        for origin, key in entries.values():
+            if origin != PROCESS_ID:
+                self._bloom.add(key)
+        self._seq = seq
+        return True
+
+
+FILTER_SOURCES = {
+    'username': (lambda: User.objects.all(), 'username'),
+    'email': (lambda: User.objects.exclude(email=''), 'email'),
+    'newsletter': (lambda: NewsletterSubscription.objects.filter(is_active=True), 'email'),
+}
+
+_filters = None
+_filters_lock = threading.Lock()
+
+def filters_enabled():
+    return getattr(settings, 'AVAILABILITY_FILTERS', True)
+
+def get_filters():
+    """Process-wide filters configured from settings, built lazily on first lookup"""
+    global _filters
+    if _filters is None:
+        with _filters_lock:
+            if _filters is None:
+                _filters = {
+                    name: AvailabilityFilter(
+                        name, queryset, field,
+                        error_rate=getattr(settings, 'AVAILABILITY_FILTER_ERROR_RATE', 0.01),
+                        sync_seconds=getattr(settings, 'AVAILABILITY_FILTER_SYNC_SECONDS', 5),
+                        rebuild_seconds=getattr(settings, 'AVAILABILITY_FILTER_REBUILD_SECONDS', 600),
+                    )
+                    for name, (queryset, field) in FILTER_SOURCES.items()
+                }
+    return _filters
+
+def is_taken(name, value, queryset):
+    """
+    Whether queryset (a lookup of value) has a row, skipping the query when
+    the named filter has definitely never seen value
+    """
+    if not filters_enabled():
+        return queryset.exists()
+    return get_filters()[name].is_taken(value, queryset)
+
+def remember(name, value):
+    """Add a newly taken value to the named filter and publish it to other processes"""
+    if filters_enabled():
+        get_filters()[name].remember(value)
+
+def get_filter_stats():
+    if _filters is None:
+        return {}
+    return {name: availability_filter.stats() for name, availability_filter in _filters.items()}
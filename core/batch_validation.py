@@ -0,0 +1,234 @@
+"""
+Batched field validation.
+
+Each form has one debounced trigger (partials/batch_validation_trigger.html)
+that posts the whole form to one endpoint, with the fields edited since the
+last batch in validate_fields. Those fields and the fields whose checks read
+them are run through the matching core.utils validator, and each result is
+returned as an hx-swap-oob fragment aimed at the field's validation
+container. A newer batch from a form replaces its in-flight one.
+
+Fields listed in CLIENT_VALIDATED_FIELDS are checked in the browser first
+with the core.rules exported by client_validation_config(); a keystroke
+only reaches the endpoint once those rules pass and the field still needs
+the database or a server-only rule.
+"""
+import hashlib
+import json
+import logging
+from functools import lru_cache, partial
+
+from django.conf import settings
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from . import utils
+from .history import normalize_email
+from .models import EmailHistory
+from .routers import on_replica
+from .rules import client_rules
+
+logger = logging.getLogger(__name__)
+
+def _check(validator, invalid='error'):
+    """Adapt an (is_valid, message) validator to a (template_type, message) check"""
+    def check(value, data, user=None):
+        is_valid, message = validator(value)
+        return ('success' if is_valid else invalid), message
+    return check
+
+def check_contact_email(email, data, user=None):
+    """
+    Email format, plus a warning for staff when the sender has contacted us
+    before. Anyone else could use the warning to probe who has written in.
+    """
+    is_valid, message = utils.validate_email_format(email)
+    if not is_valid:
+        return 'error', message
+    if not getattr(user, 'is_staff', False):
+        return 'success', '✓ Email looks good!'
+
+    history = on_replica(EmailHistory.objects.filter(email=normalize_email(email))).first()
+    if history and history.contact_count:
+        times = 'once' if history.contact_count == 1 else f'{history.contact_count} times'
+        return 'warning', f'This email has contacted us {times} before (last on {history.last_seen:%Y-%m-%d})'
+    return 'success', '✓ Email looks good!'
+
+def check_password(password, data, user=None):
+    """Django's password validators first, then the strength meter"""
+    try:
+        validate_password(password)
+    except ValidationError as e:
+        return 'error', e.messages[0]
+
+    strength, feedback = utils.validate_password_strength(password)
+    if strength < 3:
+        return 'warning', f'Password strength: {"Weak" if strength <= 1 else "Fair"}. Missing: {", ".join(feedback)}'
+    return 'success', f'✓ {"Strong" if strength >= 4 else "Good"} password!'
+
+def check_password_confirmation(password2, data, user=None):
+    password1 = data.get('password1', '')
+    if not password1:
+        return 'warning', 'Enter password first'
+    if password1 != password2:
+        return 'error', 'Passwords do not match'
+    return 'success', '✓ Passwords match!'
+
+# (field name, validation container id, check) for each form using the endpoint;
+# a check is called as check(value, data, user) and returns (template_type, message)
+BATCH_VALIDATION_FORMS = {
+    'contact': (
+        ('name', 'name-validation', _check(utils.validate_name)),
+        ('email', 'email-validation', check_contact_email),
+        ('subject', 'subject-validation', _check(utils.validate_subject)),
+        ('message', 'message-validation', _check(utils.validate_message)),
+    ),
+    'newsletter': (
+        ('email', 'newsletter-validation', _check(utils.validate_newsletter_email, invalid='warning')),
+    ),
+    'register': (
+        ('first_name', 'first-name-validation', _check(partial(utils.validate_name, field_name='First name'))),
+        ('last_name', 'last-name-validation', _check(partial(utils.validate_name, field_name='Last name'))),
+        ('username', 'username-validation', _check(utils.validate_username)),
+        ('email', 'email-validation', _check(utils.validate_email_availability)),
+        ('password1', 'password-validation', check_password),
+        ('password2', 'password2-validation', check_password_confirmation),
+    ),
+    'profile': (
+        ('phone_number', 'phone-validation', _check(utils.validate_phone_number)),
+        ('website', 'website-validation', _check(utils.validate_website)),
+        ('location', 'location-validation', _check(utils.validate_location)),
+    ),
+}
+
+# Fields whose check reads another field of the form, revalidated when it changes
+DEPENDENT_FIELDS = {
+    'register': {'password1': ('password2',)},
+}
+
+# Form fields whose core.rules run in the browser before any request:
+# field -> (rules field, label, type for failures, needs the server once the rules pass)
+CLIENT_VALIDATED_FIELDS = {
+    'contact': {
+        'name': ('name', None, 'error', False),
+        'email': ('email', None, 'error', True),
+        'subject': ('subject', None, 'error', False),
+        'message': ('message', None, 'error', False),
+    },
+    'newsletter': {
+        'email': ('email', None, 'warning', True),
+    },
+    'register': {
+        'first_name': ('name', 'First name', 'error', False),
+        'last_name': ('name', 'Last name', 'error', False),
+        'username': ('username', None, 'error', True),
+        'email': ('email', None, 'error', True),
+    },
+    'profile': {
+        'phone_number': ('phone_number', None, 'error', False),
+        'website': ('website', None, 'error', False),
+        'location': ('location', None, 'error', False),
+    },
+}
+
+def client_validation_config():
+    """
+    Rules, per-form fields and message markup for the browser rules script,
+    plus the fields each form's batch trigger tracks. A field also goes to
+    the server when its rules end in a server-only check (such as the
+    disposable domain blocklist).
+    """
+    fields = client_rules()
+    forms = {}
+    for form_name, client_fields in CLIENT_VALIDATED_FIELDS.items():
+        targets = {name: target for name, target, _ in BATCH_VALIDATION_FORMS[form_name]}
+        forms[form_name] = {
+            field: {
+                'rules': rules_field,
+                'label': label or fields[rules_field]['label'],
+                'invalid': invalid,
+                'target': targets[field],
+                'server': needs_server or not fields[rules_field]['complete'],
+            }
+            for field, (rules_field, label, invalid, needs_server) in client_fields.items()
+        }
+    return {
+        'fields': fields,
+        'forms': forms,
+        'batch': {form_name: [field for field, _, _ in checks] for form_name, checks in BATCH_VALIDATION_FORMS.items()},
+        'fragments': {template_type: utils.validation_fragment_parts(template_type) for template_type in utils.VALIDATION_TEMPLATES},
+    }
+
+def _render_client_validation_script():
+    script = render_to_string('core/validation_rules.js', {'config': json.dumps(client_validation_config())})
+    return script, hashlib.sha256(script.encode('utf-8')).hexdigest()[:32]
+
+_cached_client_validation_script = lru_cache(maxsize=1)(_render_client_validation_script)
+
+def client_validation_script():
+    """(script, etag) of the browser rules; rendered once unless DEBUG is on"""
+    if settings.DEBUG:
+        return _render_client_validation_script()
+    return _cached_client_validation_script()
+
+def _oob_fragment(target, html=''):
+    return format_html('<div id="{}" hx-swap-oob="innerHTML">{}</div>', target, mark_safe(html))
+
+def get_field(form_name, field):
+    """(container id, check) for a form field, or None if it is not validated"""
+    for name, target, check in BATCH_VALIDATION_FORMS.get(form_name, ()):
+        if name == field:
+            return target, check
+    return None
+
+def render_field_validation(form_name, field, check, value, data, request=None, user=None):
+    """
+    Rendered validation message for one field value, or '' when it is empty.
+    user defaults to the request's; the WebSocket consumer passes its scope user.
+    """
+    if user is None:
+        user = getattr(request, 'user', None)
+    if field != 'password2':
+        value = value.strip()
+    if not value:
+        return ''
+
+    try:
+        template_type, message = check(value, data, user)
+    except Exception as e:
+        logger.error(f"Error validating {form_name} field {field}: {e}")
+        template_type, message = 'error', 'Validation error occurred'
+    else:
+        utils.log_validation_attempt(field, value, template_type != 'error', request)
+
+    return utils.render_validation_html(template_type, message)
+
+def fields_to_validate(form_name, changed):
+    """Names of the fields to check after changes to changed, or None for all of them"""
+    changed = [field for field in changed or () if get_field(form_name, field) is not None]
+    if not changed:
+        return None
+    dependents = DEPENDENT_FIELDS.get(form_name, {})
+    return {name for field in changed for name in (field, *dependents.get(field, ()))}
+
+def validate_fields(form_name, data, request=None, changed=None):
+    """
+    Validate the changed fields of form_name and their dependents, or every
+    field present in data when no known field is named, returning the
+    concatenated out-of-band fragments, or None for an unknown form.
+    Empty fields get an empty fragment so stale messages are cleared.
+    """
+    fields = BATCH_VALIDATION_FORMS.get(form_name)
+    if fields is None:
+        return None
+
+    selected = fields_to_validate(form_name, changed)
+    fragments = []
+    for field, target, check in fields:
+        if field in data and (selected is None or field in selected):
+            html = render_field_validation(form_name, field, check, data.get(field, ''), data, request)
+            fragments.append(_oob_fragment(target, html))
+    return ''.join(fragments)
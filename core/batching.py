@@ -0,0 +1,140 @@
+"""
+Group commit for form submissions.
+
+With IMMEDIATE transactions every save takes the SQLite write lock and
+pays for its own commit, so concurrent submissions serialize and can time
+out with "database is locked". When WRITE_BATCHING is enabled, inserts
+from concurrent requests are handed to a single writer thread which
+commits everything queued within WRITE_BATCH_WINDOW_MS in one
+transaction. Each item gets its own savepoint so one failing row does not
+sink the batch, and each caller blocks until its row is committed. A
+caller that gives up waiting gets WritePending rather than an error: its
+row is still queued and will usually be committed moments later.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from .routers import record_write
+
+logger = logging.getLogger(__name__)
+
+class WritePending(Exception):
+    """A queued write was not committed within the wait; future resolves to its pk"""
+
+    def __init__(self, future):
+        super().__init__('Write is still queued for commit')
+        self.future = future
+
+class WriteBatcher:
+    """Single writer thread committing queued model saves in batches"""
+
+    def __init__(self, window=0.005, max_batch=100, timeout=30):
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='write-batcher', daemon=True)
+                    self._thread.start()
+
+    def submit(self, instance):
+        """Queue an unsaved instance; the future resolves to its pk after commit"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((instance, future))
+        return future
+
+    def save(self, instance):
+        """Queue an instance and wait until its batch is committed"""
+        future = self.submit(instance)
+        try:
+            future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise WritePending(future) from None
+        return instance
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch):
+        results = []
+        try:
+            with transaction.atomic():
+                for instance, future in batch:
+                    try:
+                        with transaction.atomic():
+                            instance.save()
+                        results.append((future, instance.pk, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            for conn in connections.all(initialized_only=True):
+                if conn.errors_occurred:
+                    conn.close()
+
+        self.batches += 1
+        self.writes += len(batch)
+        for future, pk, error in results:
+            if error is None:
+                future.set_result(pk)
+            else:
+                future.set_exception(error)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_write_batcher():
+    """Process-wide batcher configured from settings"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = WriteBatcher(
+                    window=getattr(settings, 'WRITE_BATCH_WINDOW_MS', 5) / 1000,
+                    max_batch=getattr(settings, 'WRITE_BATCH_MAX_SIZE', 100),
+                )
+    return _batcher
+
+def save_instance(instance):
+    """
+    Save a new instance, through the group-commit queue when enabled. A
+    caller already inside a transaction saves directly so its own atomic
+    block still covers the write.
+    """
+    if not getattr(settings, 'WRITE_BATCHING', False) or connection.in_atomic_block:
+        instance.save()
+        return instance
+    # The router sees the write on the batcher thread, under that thread's
+    # routing state; pin this request as a direct save would
+    record_write()
+    return get_write_batcher().save(instance)
@@ -0,0 +1,165 @@
+"""
+Disposable email domain blocklist.
+
+The list is a text file with one domain per line. A file written by the
+build_domain_blocklist command starts with HEADER and is already lowercased,
+deduplicated and sorted, so it is memory-mapped as it is: worker processes
+share the page cache instead of each holding 100k+ Python strings, and
+loading only checks the order of the lines. Any other file (a list as
+downloaded, or a headered file edited out of order) is normalized into one
+sorted bytes buffer at load.
+
+Lookups binary-search the buffer for the domain and each of its parent
+domains, so subdomains of a listed domain are blocked too. The file is
+stat()ed at most every DISPOSABLE_DOMAINS_RELOAD_SECONDS and reloaded when
+it changes; replace it atomically (the build command does) so a reload
+never sees a partial file.
+"""
+import logging
+import mmap
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = b'# sorted-domain-blocklist v1\n'
+
+def normalize_domain(domain):
+    return domain.strip().lower().rstrip('.')
+
+def build_buffer(lines):
+    """Sorted, deduplicated blocklist file contents from raw lines"""
+    domains = set()
+    for line in lines:
+        domain = normalize_domain(line.split('#', 1)[0])
+        if domain and domain.isascii():
+            domains.add(domain)
+    return HEADER + ''.join(f'{domain}\n' for domain in sorted(domains)).encode('ascii')
+
+def buffer_contains(buffer, start, key):
+    """Binary search for a whole line equal to key in sorted newline-terminated lines"""
+    lo, hi = start, len(buffer)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        newline = buffer.rfind(b'\n', lo, mid)
+        line_start = lo if newline < 0 else newline + 1
+        line_end = buffer.find(b'\n', line_start)
+        if line_end < 0:
+            # An unterminated last line
+            line_end = len(buffer)
+        line = buffer[line_start:line_end]
+        if line == key:
+            return True
+        if line < key:
+            lo = line_end + 1
+        else:
+            hi = line_start
+    return False
+
+def count_sorted_lines(buffer, start):
+    """Number of lines after start if they are newline-terminated and sorted, else None"""
+    if len(buffer) > start and buffer[-1:] != b'\n':
+        return None
+    count, previous, position = 0, b'', start
+    while position < len(buffer):
+        line_end = buffer.find(b'\n', position)
+        line = buffer[position:line_end]
+        if line < previous:
+            return None
+        count, previous, position = count + 1, line, line_end + 1
+    return count
+
+
+class DomainBlocklist:
+    """A domain list file answering `domain in blocklist`, including subdomains"""
+
+    def __init__(self, path, use_mmap=True, reload_seconds=60):
+        self.path = str(path)
+        self.use_mmap = use_mmap
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._next_check = 0
+        # (buffer, first entry offset, (mtime, size), entry count), replaced as a whole on reload
+        self._state = (b'', 0, None, 0)
+
+    def __len__(self):
+        self._maybe_reload()
+        return self._state[3]
+
+    def __contains__(self, domain):
+        self._maybe_reload()
+        buffer, start = self._state[0], self._state[1]
+        labels = normalize_domain(domain).split('.')
+        # The domain itself and every parent down to the registrable two labels
+        for i in range(max(len(labels) - 1, 1)):
+            if buffer_contains(buffer, start, '.'.join(labels[i:]).encode('ascii', 'replace')):
+                return True
+        return False
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            first_check = not self._next_check
+            self._next_check = now + self.reload_seconds
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                # Warn once when the list goes missing, not on every check
+                if first_check or self._state[2] is not None:
+                    logger.warning(f"Disposable domain list {self.path} is missing")
+                self._state = (b'', 0, None, 0)
+                return
+            if (stat.st_mtime_ns, stat.st_size) != self._state[2]:
+                self._load((stat.st_mtime_ns, stat.st_size))
+
+    def _load(self, version):
+        try:
+            with open(self.path, 'rb') as f:
+                if self.use_mmap and version[1] > len(HEADER) and f.read(len(HEADER)) == HEADER:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    f.seek(0)
+                    buffer = f.read()
+                    if not buffer.startswith(HEADER):
+                        buffer = build_buffer(buffer.decode('utf-8', 'ignore').splitlines())
+        except OSError as e:
+            logger.error(f"Could not load disposable domain list {self.path}: {e}")
+            return
+
+        # Lookups binary-search the lines, so a header on an unsorted file must not be trusted
+        count = count_sorted_lines(buffer, len(HEADER))
+        if count is None:
+            logger.warning(f"Disposable domain list {self.path} is not sorted; normalizing it in memory")
+            lines = buffer[len(HEADER):].decode('utf-8', 'ignore').splitlines()
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+            buffer = build_buffer(lines)
+            count = count_sorted_lines(buffer, len(HEADER))
+        self._state = (buffer, len(HEADER), version, count)
+        logger.info(f"Loaded {count} disposable domains from {self.path}{' (mmap)' if isinstance(buffer, mmap.mmap) else ''}")
+
+
+_blocklist = None
+_blocklist_lock = threading.Lock()
+
+def get_disposable_domains():
+    global _blocklist
+    if _blocklist is None:
+        with _blocklist_lock:
+            if _blocklist is None:
+                _blocklist = DomainBlocklist(
+                    settings.DISPOSABLE_DOMAINS_FILE,
+                    use_mmap=getattr(settings, 'DISPOSABLE_DOMAINS_MMAP', True),
+                    reload_seconds=getattr(settings, 'DISPOSABLE_DOMAINS_RELOAD_SECONDS', 60),
+                )
+    return _blocklist
+
+def is_disposable_domain(domain):
+    return domain in get_disposable_domains()
@@ -0,0 +1,58 @@
+"""
+Incremental change feed for contacts.
+
+Consumers keep the id of the last change they processed and ask for the
+next batch after it, so each sync costs O(changes) instead of a full scan.
+"""
+from .models import ArchivedContact, Contact, ContactChange
+
+DEFAULT_FEED_LIMIT = 100
+MAX_FEED_LIMIT = 1000
+
+FEED_CONTACT_FIELDS = (
+    'id', 'name', 'email', 'subject', 'category',
+    'created_at', 'is_resolved', 'resolved_at',
+)
+
+def _snapshot_contacts(contact_ids):
+    """Current state of the referenced contacts, falling back to the archive"""
+    snapshots = {
+        row['id']: row
+        for row in Contact.objects.filter(id__in=contact_ids).values(*FEED_CONTACT_FIELDS)
+    }
+    missing = set(contact_ids) - snapshots.keys()
+    if missing:
+        archive_fields = [field for field in FEED_CONTACT_FIELDS if field != 'is_resolved']
+        for row in ArchivedContact.objects.filter(id__in=missing).values(*archive_fields):
+            row['is_resolved'] = True
+            row['archived'] = True
+            snapshots[row['id']] = row
+    return snapshots
+
+def get_contact_changes(after=0, limit=DEFAULT_FEED_LIMIT, since=None):
+    """
+    Return (changes, next_cursor, has_more) for changes with id > after.
+    `since` optionally starts the feed at a timestamp instead of a cursor.
+    """
+    limit = min(max(limit, 1), MAX_FEED_LIMIT)
+    changes = ContactChange.objects.filter(id__gt=after)
+    if since is not None:
+        changes = changes.filter(created_at__gte=since)
+
+    # Fetch one extra row to know whether another page exists
+    batch = list(changes.order_by('id').values('id', 'contact_id', 'action', 'created_at')[:limit + 1])
+    has_more = len(batch) > limit
+    batch = batch[:limit]
+
+    snapshots = _snapshot_contacts({change['contact_id'] for change in batch})
+    results = [
+        {
+            'cursor': change['id'],
+            'action': change['action'],
+            'changed_at': change['created_at'],
+            'contact': snapshots.get(change['contact_id']),
+        }
+        for change in batch
+    ]
+    next_cursor = batch[-1]['id'] if batch else after
+    return results, next_cursor, has_more
@@ -0,0 +1,147 @@
+"""
+Conditional GET support for contact-backed views.
+
+A single contact data version lives in the shared cache and advances on
+every Contact write. ETags and Last-Modified are derived from it, so an
+unchanged poll is answered with 304 without touching the Contact table.
+"""
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+CONTACT_DATA_VERSION_KEY = 'core:contact_data_version'
+
+def get_contact_data_version():
+    """
+    Current version as nanoseconds since the epoch of the last write. A
+    missing key (cold or evicted cache) is re-seeded with the current time,
+    which can only invalidate ETags, never revive stale ones.
+    """
+    version = cache.get(CONTACT_DATA_VERSION_KEY)
+    if version is None:
+        cache.add(CONTACT_DATA_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CONTACT_DATA_VERSION_KEY)
+    return version
+
+async def aget_contact_data_version():
+    version = await cache.aget(CONTACT_DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CONTACT_DATA_VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(CONTACT_DATA_VERSION_KEY)
+    return version
+
+def bump_contact_data_version():
+    """Advance the version after Contact rows change"""
+    try:
+        cache.set(CONTACT_DATA_VERSION_KEY, time.time_ns(), None)
+    except Exception as e:
+        # Fail loudly in the log: stale ETags would hide new contacts
+        logger.error(f"Could not bump contact data version: {e}")
+
+class ConditionalStats:
+    """Per-process counters of conditional requests answered with 304"""
+
+    def __init__(self):
+        self.not_modified = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def record(self, not_modified):
+        with self._lock:
+            self.total += 1
+            if not_modified:
+                self.not_modified += 1
+            return self.not_modified, self.total
+
+conditional_stats = ConditionalStats()
+
+def _is_conditional_candidate(request, user):
+    return request.method in ('GET', 'HEAD') and user.is_authenticated and user.is_staff
+
+def contact_etag(request, user, version):
+    """ETag from the data version plus everything else the page depends on"""
+    # The rendered page embeds the user and the CSRF token, and the query
+    # string selects filters/pages, so all of them are part of the tag
+    parts = [
+        str(version),
+        str(user.pk),
+        request.get_full_path(),
+        request.META.get('CSRF_COOKIE', ''),
+    ]
+    digest = hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def contact_last_modified(version):
+    return int(version // 1_000_000_000)
+
+def _precondition(request, user, version):
+    """Return (304 response or None, etag, last_modified) for this request"""
+    if version is None:
+        return None, None, None
+    etag = contact_etag(request, user, version)
+    last_modified = contact_last_modified(version)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return response, etag, last_modified
+
+def _finish(response, etag, last_modified):
+    """Set validators and report the running 304 ratio"""
+    if not etag:
+        return response
+    if not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers.setdefault('ETag', etag)
+    response['Cache-Control'] = 'private, no-cache'
+
+    not_modified, total = conditional_stats.record(response.status_code == 304)
+    response['X-Conditional-Stats'] = f"304={not_modified}; total={total}; ratio={not_modified / total:.2f}"
+    return response
+
+def _version_unavailable(e):
+    logger.warning(f"Contact data version unavailable, skipping conditional GET: {e}")
+
+def contact_data_conditional(view_func):
+    """
+    Answer unchanged GETs with 304 based on the contact data version and
+    report the running 304 ratio in an X-Conditional-Stats header.
+    Works for both sync and async views.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            version = None
+            if _is_conditional_candidate(request, user):
+                try:
+                    version = await aget_contact_data_version()
+                except Exception as e:
+                    _version_unavailable(e)
+            response, etag, last_modified = _precondition(request, user, version)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        version = None
+        if _is_conditional_candidate(request, request.user):
+            try:
+                version = get_contact_data_version()
+            except Exception as e:
+                _version_unavailable(e)
+        response, etag, last_modified = _precondition(request, request.user, version)
+        if response is None:
+            response = view_func(request, *args, **kwargs)
+        return _finish(response, etag, last_modified)
+
+    return wrapper
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+from functools import partial
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .async_db import run_read
+from .batch_validation import fields_to_validate, get_field, render_field_validation
+
+logger = logging.getLogger(__name__)
+
+MAX_VALUE_LENGTH = 5000
+
+# Checks one connection may have running at once
+MAX_PENDING_CHECKS = 4
+
+
+class ValidationConsumer(AsyncWebsocketConsumer):
+    """
+    Field validation over a WebSocket.
+
+    Clients send {"type": "validate", "form", "field", "value", "seq"} and get
+    back {"type": "validation", "form", "field", "target", "seq", "html"}.
+    Each message is checked in its own task so later keystrokes are read
+    while an earlier check runs. A change also rechecks the fields that read
+    it (the password confirmation), answered under the same seq. A newer
+    message for a field cancels that field's running check, and at most
+    MAX_PENDING_CHECKS run per connection; checks over that limit are
+    dropped unanswered.
+    """
+
+    async def connect(self):
+        self.latest = {}
+        self.values = {}
+        self.tasks = {}
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for task in self.tasks.values():
+            task.cancel()
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(data, dict):
+            return
+
+        if data.get('type') == 'ping':
+            await self.send(text_data=json.dumps({'type': 'pong'}))
+            return
+        if data.get('type') != 'validate':
+            return
+
+        form_name, field, value, seq = data.get('form'), data.get('field'), data.get('value'), data.get('seq')
+        found = get_field(form_name, field) if isinstance(form_name, str) and isinstance(field, str) else None
+        if found is None or not isinstance(value, str) or not isinstance(seq, int):
+            return
+
+        if seq <= self.latest.get((form_name, field), -1):
+            return
+        # Dependent checks (the password confirmation) read other fields of the form
+        form_values = self.values.setdefault(form_name, {})
+        form_values[field] = value[:MAX_VALUE_LENGTH]
+
+        # Like the batch endpoint, a change also rechecks the fields reading it
+        dependents = fields_to_validate(form_name, [field]) - {field}
+        self._start(form_name, field, found, seq)
+        for dependent in sorted(dependents):
+            if dependent in form_values:
+                self._start(form_name, dependent, get_field(form_name, dependent), seq)
+
+    def _start(self, form_name, field, found, seq):
+        key = (form_name, field)
+        previous = self.tasks.pop(key, None)
+        if previous:
+            previous.cancel()
+        if len(self.tasks) >= MAX_PENDING_CHECKS:
+            return
+        self.latest[key] = seq
+        task = asyncio.ensure_future(self.validate(form_name, field, found, seq))
+        self.tasks[key] = task
+        task.add_done_callback(partial(self._forget, key))
+
+    def _forget(self, key, task):
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+
+    async def validate(self, form_name, field, found, seq):
+        key = (form_name, field)
+        target, check = found
+        form_values = dict(self.values[form_name])
+        try:
+            html = await run_read(
+                render_field_validation, form_name, field, check, form_values[field], form_values,
+                user=self.scope.get('user'),
+            )
+        except Exception as e:
+            logger.error(f"Error validating {form_name} field {field} over websocket: {e}")
+            return
+
+        if self.latest.get(key) != seq:
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'validation',
+            'form': form_name,
+            'field': field,
+            'target': target,
+            'seq': seq,
+            'html': html,
+        }))
@@ -0,0 +1,79 @@
+"""
+Category x status facet counts for the staff contact list.
+
+All facets come from one GROUP BY over the searched contacts and are
+cached briefly under a key that includes the contact data version, so
+any write invalidates them and the TTL only bounds how long an entry
+lives.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .conditional import get_contact_data_version
+from .models import ArchivedContact, Contact
+from .utils import filter_contacts
+
+logger = logging.getLogger(__name__)
+
+def facet_cache_key(query, archived, version):
+    digest = hashlib.blake2b(f'{query}|{int(archived)}'.encode('utf-8'), digest_size=12).hexdigest()
+    return f'core:facets:{version}:{digest}'
+
+def compute_contact_facets(query='', archived=False):
+    """
+    Count contacts matching the search by category and status in one query.
+    Read from the primary since the result is cached under the data version.
+    """
+    model = ArchivedContact if archived else Contact
+    contacts = filter_contacts(model.objects.all(), query)
+
+    if archived:
+        # Everything in the archive is resolved
+        rows = ((category, True, count) for category, count in
+                contacts.values_list('category').annotate(count=Count('id')).order_by())
+    else:
+        rows = contacts.values_list('category', 'is_resolved').annotate(count=Count('id')).order_by()
+
+    counts = {}
+    for category, is_resolved, count in rows:
+        counts.setdefault(category, {'pending': 0, 'resolved': 0})
+        counts[category]['resolved' if is_resolved else 'pending'] += count
+
+    categories = []
+    for key, label in Contact.SUBJECT_CHOICES:
+        category = counts.get(key, {'pending': 0, 'resolved': 0})
+        categories.append({
+            'key': key,
+            'label': label,
+            'pending': category['pending'],
+            'resolved': category['resolved'],
+            'total': category['pending'] + category['resolved'],
+        })
+
+    pending = sum(category['pending'] for category in categories)
+    resolved = sum(category['resolved'] for category in categories)
+    return {
+        'categories': categories,
+        'pending': pending,
+        'resolved': resolved,
+        'total': pending + resolved,
+    }
+
+def get_contact_facets(query='', archived=False):
+    """Cached facet counts for the current search"""
+    timeout = getattr(settings, 'CONTACT_FACET_CACHE_SECONDS', 30)
+    try:
+        key = facet_cache_key(query, archived, get_contact_data_version())
+        facets = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Facet cache unavailable: {e}")
+        return compute_contact_facets(query, archived)
+
+    if facets is None:
+        facets = compute_contact_facets(query, archived)
+        cache.set(key, facets, timeout)
+    return facets
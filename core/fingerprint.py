@@ -0,0 +1,196 @@
+"""
+Near-duplicate detection for contact messages.
+
+Each message gets a 64-bit SimHash over its word frequencies. Messages whose
+fingerprints differ in only a few bits are near-identical. Recent
+fingerprints are kept in an in-memory LSH index: the 64 bits are split
+into bands and, by the pigeonhole principle, any fingerprint within
+MAX_DISTANCE < BANDS bits shares at least one band exactly, so a lookup
+only inspects a handful of candidates.
+
+Different people often send similar templated messages ("where is order
+10234"), which are a few bits apart. A near match therefore only counts
+as a duplicate when it came from the same email address, or when the
+fingerprints are within the much tighter ANY_SENDER_DISTANCE.
+"""
+import hashlib
+import re
+import threading
+from collections import Counter, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+MIN_TOKENS = 8  # shorter messages are too generic to compare safely
+BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+TOKEN_REGEX = re.compile(r'\w+')
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def to_signed(value):
+    """Store unsigned 64-bit fingerprints in a signed BIGINT column"""
+    return value - (1 << FINGERPRINT_BITS) if value >= (1 << (FINGERPRINT_BITS - 1)) else value
+
+def simhash(text):
+    """Return the unsigned 64-bit SimHash of a text, or None if it is too short"""
+    tokens = TOKEN_REGEX.findall(text.lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for token, count in Counter(tokens).items():
+        value = _token_hash(token)
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def message_fingerprint(message):
+    """Signed fingerprint suitable for Contact.fingerprint"""
+    value = simhash(message or '')
+    return None if value is None else to_signed(value)
+
+def hamming_distance(a, b):
+    return ((a ^ b) & FINGERPRINT_MASK).bit_count()
+
+def get_window():
+    return timedelta(days=getattr(settings, 'CONTACT_DUPLICATE_WINDOW_DAYS', 7))
+
+def get_max_distance():
+    return getattr(settings, 'CONTACT_DUPLICATE_MAX_DISTANCE', 7)
+
+def get_any_sender_distance():
+    return getattr(settings, 'CONTACT_DUPLICATE_ANY_SENDER_DISTANCE', 0)
+
+class FingerprintIndex:
+    """Thread-safe LSH index over fingerprints seen within a sliding window"""
+
+    def __init__(self, window, max_distance=7):
+        if max_distance >= BANDS:
+            raise ValueError('max_distance must be smaller than the number of bands')
+        self.window = window
+        self.max_distance = max_distance
+        self._bands = [dict() for _ in range(BANDS)]
+        self._entries = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _band_keys(fingerprint):
+        value = fingerprint & FINGERPRINT_MASK
+        return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+    def add(self, fingerprint, contact_id, created_at=None):
+        entry = (created_at or timezone.now(), fingerprint, contact_id)
+        with self._lock:
+            self._entries.append(entry)
+            for band, key in zip(self._bands, self._band_keys(fingerprint)):
+                band.setdefault(key, []).append(entry)
+
+    def prune(self, now=None):
+        """Drop fingerprints older than the window"""
+        cutoff = (now or timezone.now()) - self.window
+        with self._lock:
+            while self._entries and self._entries[0][0] < cutoff:
+                expired = self._entries.popleft()
+                for band, key in zip(self._bands, self._band_keys(expired[1])):
+                    bucket = band.get(key)
+                    if bucket:
+                        bucket.remove(expired)
+                        if not bucket:
+                            del band[key]
+
+    def near(self, fingerprint):
+        """(contact id, distance) for each recent fingerprint within max_distance, closest first"""
+        cutoff = timezone.now() - self.window
+        found = {}
+        with self._lock:
+            for band, key in zip(self._bands, self._band_keys(fingerprint)):
+                for created_at, candidate, contact_id in band.get(key, ()):
+                    if created_at >= cutoff:
+                        distance = hamming_distance(fingerprint, candidate)
+                        if distance <= self.max_distance:
+                            found[contact_id] = distance
+        return sorted(found.items(), key=lambda item: item[1])
+
+    def find_near(self, fingerprint):
+        """Return the id of the closest recent near-duplicate contact, or None"""
+        matches = self.near(fingerprint)
+        return matches[0][0] if matches else None
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_fingerprint_index():
+    """Process-wide index, warmed from the database on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = FingerprintIndex(get_window(), get_max_distance())
+                _warm(index)
+                _index = index
+    return _index
+
+def _warm(index):
+    from .models import Contact
+
+    recent = Contact.objects.filter(
+        created_at__gte=timezone.now() - index.window,
+        fingerprint__isnull=False,
+    ).order_by('created_at').values_list('id', 'fingerprint', 'created_at')
+    for contact_id, fingerprint, created_at in recent.iterator(chunk_size=2000):
+        index.add(fingerprint, contact_id, created_at)
+
+def find_duplicate(fingerprint, email=None):
+    """
+    Look for a recent duplicate: a near match in this process's LSH index
+    from the same email address or within ANY_SENDER_DISTANCE bits, then an
+    exact fingerprint match in the database, which also covers submissions
+    handled by other worker processes.
+    """
+    from .history import normalize_email
+    from .models import Contact
+
+    if fingerprint is None:
+        return None
+
+    index = get_fingerprint_index()
+    index.prune()
+    matches = index.near(fingerprint)
+    recent = Contact.objects.filter(created_at__gte=timezone.now() - index.window)
+    any_sender = get_any_sender_distance()
+    for contact_id, distance in matches:
+        if distance <= any_sender:
+            return contact_id
+
+    if email and matches:
+        same_sender = set(recent.filter(
+            id__in=[contact_id for contact_id, _ in matches], email=normalize_email(email),
+        ).values_list('id', flat=True))
+        for contact_id, _ in matches:
+            if contact_id in same_sender:
+                return contact_id
+
+    return recent.filter(fingerprint=fingerprint).values_list('id', flat=True).first()
+
+def remember(contact):
+    """Add a freshly saved contact to the in-process index"""
+    if contact.fingerprint is not None and _index is not None:
+        _index.add(contact.fingerprint, contact.id, contact.created_at)
@@ -1,9 +1,17 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.utils import timezone
+from .batching import save_instance
+from .fingerprint import find_duplicate, message_fingerprint
 from .models import Contact, NewsletterSubscription
-import re
+from .rules import clean_field
+import uuid
 
 class ContactForm(forms.ModelForm):
+    # Identifies one rendered form so re-posts of it can be recognised
+    idempotency_key = forms.CharField(required=False, max_length=64, widget=forms.HiddenInput)
+
     class Meta:
         model = Contact
         fields = ['name', 'email', 'subject', 'category', 'message']
@@ -11,28 +19,16 @@ class ContactForm(forms.ModelForm):
             'name': forms.TextInput(attrs={
                 'class': 'form-input', 
                 'placeholder': 'Enter your full name',
-                'hx-post': '/validate/name/', 
-                'hx-trigger': 'keyup changed delay:300ms',
-                'hx-target': '#name-validation', 
-                'hx-swap': 'innerHTML',
                 'autocomplete': 'name'
             }),
             'email': forms.EmailInput(attrs={
                 'class': 'form-input', 
                 'placeholder': 'your.email@example.com',
-                'hx-post': '/validate/email/', 
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#email-validation', 
-                'hx-swap': 'innerHTML',
                 'autocomplete': 'email'
             }),
             'subject': forms.TextInput(attrs={
                 'class': 'form-input', 
                 'placeholder': 'Brief description of your inquiry',
-                'hx-post': '/validate/subject/', 
-                'hx-trigger': 'keyup changed delay:300ms',
-                'hx-target': '#subject-validation', 
-                'hx-swap': 'innerHTML',
                 'maxlength': 200
             }),
             'category': forms.Select(attrs={
@@ -42,16 +38,16 @@ class ContactForm(forms.ModelForm):
                 'class': 'form-input resize-y min-h-[120px]', 
                 'rows': 5, 
                 'placeholder': 'Please provide detailed information about your inquiry...',
-                'hx-post': '/validate/message/', 
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#message-validation', 
-                'hx-swap': 'innerHTML',
                 'maxlength': 2000
             })
         }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, check_duplicates=True, **kwargs):
         super().__init__(*args, **kwargs)
+        self.check_duplicates = check_duplicates
+        self.duplicate_of = None
+        if not self.is_bound:
+            self.initial.setdefault('idempotency_key', uuid.uuid4().hex)
         
         # Add required attributes and improve labels
         self.fields['name'].required = True
@@ -74,118 +70,16 @@ class ContactForm(forms.ModelForm):
         self.fields['message'].help_text = 'Detailed message (10-2000 characters)'
 
     def clean_name(self):
-        """Enhanced name validation"""
-        name = self.cleaned_data.get('name')
-        if name:
-            name = name.strip()
-            
-            # Check minimum length
-            if len(name) < 2:
-                raise ValidationError("Name must be at least 2 characters long.")
-            
-            # Check maximum length
-            if len(name) > 100:
-                raise ValidationError("Name is too long (maximum 100 characters).")
-            
-            # Check for valid characters (letters, spaces, hyphens, apostrophes, periods)
-            if not re.match(r'^[a-zA-Z\s\-\'\.]+$', name):
-                raise ValidationError("Name can only contain letters, spaces, hyphens, apostrophes, and periods.")
-            
-            # Check for at least 2 letters
-            if len([c for c in name if c.isalpha()]) < 2:
-                raise ValidationError("Name must contain at least 2 letters.")
-            
-            # Check for obvious test data
-            test_names = ['test', 'testing', 'john doe', 'jane doe', 'test user', 'asdf']
-            if name.lower() in test_names:
-                raise ValidationError("Please enter your real name.")
-                
-        return name
+        return clean_field('name', self.cleaned_data.get('name'))
 
     def clean_email(self):
-        """Enhanced email validation"""
-        email = self.cleaned_data.get('email')
-        if email:
-            email = email.lower().strip()
-            
-            # Basic format validation
-            email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_regex, email):
-                raise ValidationError("Please enter a valid email address.")
-            
-            # Check for suspicious patterns
-            suspicious_domains = ['10minutemail.com', 'tempmail.org', 'guerrillamail.com']
-            domain = email.split('@')[1]
-            if domain in suspicious_domains:
-                raise ValidationError("Please use a permanent email address.")
-                
-            # Check for consecutive dots
-            if '..' in email:
-                raise ValidationError("Email address contains invalid characters.")
-                
-        return email
+        return clean_field('email', self.cleaned_data.get('email'))
 
     def clean_subject(self):
-        """Enhanced subject validation"""
-        subject = self.cleaned_data.get('subject')
-        if subject:
-            subject = subject.strip()
-            
-            # Check minimum length
-            if len(subject) < 5:
-                raise ValidationError("Subject must be at least 5 characters long.")
-            
-            # Check maximum length
-            if len(subject) > 200:
-                raise ValidationError("Subject is too long (maximum 200 characters).")
-            
-            # Check for meaningful content
-            if subject.count(' ') == 0 and len(subject) > 20:
-                raise ValidationError("Subject should contain spaces between words.")
-            
-            # Check for obvious spam patterns
-            spam_patterns = ['!!!', 'URGENT', 'FREE', 'WINNER', '$$$']
-            if any(pattern in subject.upper() for pattern in spam_patterns):
-                raise ValidationError("Subject appears to be spam. Please use a professional subject line.")
-                
-        return subject
+        return clean_field('subject', self.cleaned_data.get('subject'))
 
     def clean_message(self):
-        """Enhanced message validation"""
-        message = self.cleaned_data.get('message')
-        if message:
-            message = message.strip()
-            
-            # Check minimum length
-            if len(message) < 10:
-                raise ValidationError("Message must be at least 10 characters long.")
-            
-            # Check maximum length
-            if len(message) > 2000:
-                raise ValidationError("Message is too long (maximum 2000 characters).")
-            
-            # Check for minimum word count
-            word_count = len(message.split())
-            if word_count < 3:
-                raise ValidationError("Message should contain at least 3 words.")
-            
-            # Check for suspicious patterns
-            if message.count('http') > 3:
-                raise ValidationError("Message contains too many links.")
-            
-            # Check for excessive repetition
-            words = message.lower().split()
-            if len(words) > 10:
-                word_freq = {}
-                for word in words:
-                    word_freq[word] = word_freq.get(word, 0) + 1
-                
-                # Check if any word appears more than 30% of the time
-                max_freq = max(word_freq.values())
-                if max_freq > len(words) * 0.3:
-                    raise ValidationError("Message contains excessive repetition.")
-                    
-        return message
+        return clean_field('message', self.cleaned_data.get('message'))
 
     def clean(self):
         """Form-level validation"""
@@ -209,8 +103,26 @@ class ContactForm(forms.ModelForm):
             if len(subject.split()) > 10 and len(message.split()) < 5:
                 raise ValidationError("Subject and message content seem inconsistent.")
         
+        # Check for near-duplicates of recent submissions (spam waves)
+        if (message and self.check_duplicates
+                and getattr(settings, 'CONTACT_DUPLICATE_ACTION', 'allow') != 'allow'):
+            self.instance.fingerprint = message_fingerprint(message)
+            self.duplicate_of = find_duplicate(self.instance.fingerprint, email)
+            if self.duplicate_of and settings.CONTACT_DUPLICATE_ACTION == 'reject':
+                raise ValidationError("This message is nearly identical to a recent submission.")
+        
         return cleaned_data
 
+    def save(self, commit=True):
+        """Store near-duplicates as already resolved so they skip staff notifications"""
+        contact = super().save(commit=False)
+        if self.duplicate_of:
+            contact.is_resolved = True
+            contact.resolved_at = timezone.now()
+        if commit:
+            save_instance(contact)
+        return contact
+
 class NewsletterForm(forms.ModelForm):
     class Meta:
         model = NewsletterSubscription
@@ -219,10 +131,6 @@ class NewsletterForm(forms.ModelForm):
             'email': forms.EmailInput(attrs={
                 'class': 'form-input w-full text-white placeholder-blue-200 bg-white/10 border-white/20 focus:border-white focus:ring-white', 
                 'placeholder': 'Enter your email address',
-                'hx-post': '/validate/newsletter-email/', 
-                'hx-trigger': 'keyup changed delay:500ms',
-                'hx-target': '#newsletter-validation', 
-                'hx-swap': 'innerHTML',
                 'autocomplete': 'email'
             })
         }
@@ -237,34 +145,17 @@ class NewsletterForm(forms.ModelForm):
 
     def clean_email(self):
         """Enhanced email validation for newsletter"""
-        email = self.cleaned_data.get('email')
-        if email:
-            email = email.lower().strip()
-            
-            # Basic format validation
-            email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_regex, email):
-                raise ValidationError("Please enter a valid email address.")
-            
-            # Check if already subscribed
-            if NewsletterSubscription.objects.filter(email=email, is_active=True).exists():
-                raise ValidationError("This email address is already subscribed to our newsletter.")
-            
-            # Check for suspicious patterns
-            suspicious_domains = ['10minutemail.com', 'tempmail.org', 'guerrillamail.com', 'mailinator.com']
-            domain = email.split('@')[1]
-            if domain in suspicious_domains:
-                raise ValidationError("Please use a permanent email address for newsletter subscription.")
-            
-            # Check for role-based emails (optional warning)
-            role_prefixes = ['admin', 'info', 'support', 'sales', 'marketing', 'noreply', 'no-reply']
-            email_local = email.split('@')[0]
-            if email_local in role_prefixes:
-                # We'll allow it but could show a warning
-                pass
-                
+        email = clean_field('email', self.cleaned_data.get('email'))
+        if email and NewsletterSubscription.objects.filter(email=email, is_active=True).exists():
+            raise ValidationError("This email address is already subscribed to our newsletter.")
         return email
 
+    def save(self, commit=True):
+        subscription = super().save(commit=False)
+        if commit:
+            save_instance(subscription)
+        return subscription
+
 # Additional utility forms
 
 class QuickContactForm(forms.Form):
@@ -0,0 +1,115 @@
+"""
+Per-email customer history.
+
+EmailHistory holds first/last seen, the number of contacts and how many
+are still open for each sender. It is updated incrementally as contacts
+are created, resolved or deleted, so triage and validation read one row
+by primary key instead of scanning the (email, -created_at) index.
+Archiving does not change it: archived contacts are still part of a
+customer's history.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Lower
+
+from .models import ArchivedContact, Contact, EmailHistory
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+class HistoryDelta:
+    """Pending changes for a single EmailHistory row"""
+
+    __slots__ = ('first_seen', 'last_seen', 'contacts', 'opened')
+
+    def __init__(self):
+        self.first_seen = None
+        self.last_seen = None
+        self.contacts = 0
+        self.opened = 0
+
+    def add(self, created_at, is_open, contacts=1):
+        self.contacts += contacts
+        self.opened += is_open
+        self.first_seen = created_at if self.first_seen is None else min(self.first_seen, created_at)
+        self.last_seen = created_at if self.last_seen is None else max(self.last_seen, created_at)
+
+def _apply(deltas):
+    """Add deltas to their history rows in one transaction"""
+    with transaction.atomic():
+        for email, delta in deltas.items():
+            history = EmailHistory.objects.select_for_update().filter(email=email).first()
+            if history is None:
+                if delta.first_seen is None:
+                    # Nothing to attach an open-count change to
+                    continue
+                history = EmailHistory(email=email, first_seen=delta.first_seen, last_seen=delta.last_seen)
+            if delta.first_seen is not None:
+                history.first_seen = min(history.first_seen, delta.first_seen)
+                history.last_seen = max(history.last_seen, delta.last_seen)
+            history.contact_count = max(history.contact_count + delta.contacts, 0)
+            history.open_count = max(history.open_count + delta.opened, 0)
+            history.save()
+
+def record_contacts(contacts):
+    """Count newly created contacts against their senders"""
+    deltas = {}
+    for contact in contacts:
+        delta = deltas.setdefault(normalize_email(contact.email), HistoryDelta())
+        delta.add(contact.created_at, not contact.is_resolved)
+    if deltas:
+        _apply(deltas)
+
+def _adjust_open(contact, change):
+    delta = HistoryDelta()
+    delta.opened = change
+    _apply({normalize_email(contact.email): delta})
+
+def record_resolved(contact):
+    _adjust_open(contact, -1)
+
+def record_deleted(contact):
+    """A deleted open contact no longer needs attention; the count stays"""
+    if not contact.is_resolved:
+        _adjust_open(contact, -1)
+
+def build_email_history():
+    """Aggregate history rows for every sender with two GROUP BY queries"""
+    deltas = {}
+    live = Contact.objects.annotate(address=Lower('email')).values('address').annotate(
+        first=Min('created_at'),
+        last=Max('created_at'),
+        contacts=Count('id'),
+        opened=Count('id', filter=Q(is_resolved=False)),
+    ).order_by()
+    archived = ArchivedContact.objects.annotate(address=Lower('email')).values('address').annotate(
+        first=Min('created_at'),
+        last=Max('created_at'),
+        contacts=Count('id'),
+    ).order_by()
+
+    for row in list(live) + list(archived):
+        delta = deltas.setdefault(row['address'].strip(), HistoryDelta())
+        delta.add(row['first'], row.get('opened', 0), contacts=row['contacts'])
+        delta.add(row['last'], 0, contacts=0)
+    return deltas
+
+def rebuild_email_history():
+    """Recompute every history row from live and archived contacts, returning the row count"""
+    histories = [
+        EmailHistory(
+            email=email,
+            first_seen=delta.first_seen,
+            last_seen=delta.last_seen,
+            contact_count=delta.contacts,
+            open_count=delta.opened,
+        )
+        for email, delta in build_email_history().items()
+    ]
+    with transaction.atomic():
+        EmailHistory.objects.all().delete()
+        EmailHistory.objects.bulk_create(histories, batch_size=500)
+    return len(histories)
+
+def get_email_history(email):
+    return EmailHistory.objects.filter(email=normalize_email(email)).first()
@@ -0,0 +1,112 @@
+"""
+Idempotent contact submissions.
+
+A submission is identified by the hidden idempotency token of the form it
+came from and by a hash of its email, subject and message. Before
+validating or inserting, the view claims both keys with cache.add(), which
+is atomic, so a double-click, an htmx retry or a re-post from a flaky
+network finds the keys taken and is answered with the original contact
+instead of creating another one and broadcasting it again. A repeat that
+arrives while the original is still being saved is told so at once rather
+than waiting for it.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+KEY_PREFIX = 'core:idem'
+
+def get_window():
+    return getattr(settings, 'CONTACT_IDEMPOTENCY_WINDOW_SECONDS', 600)
+
+def submission_keys(data):
+    """Cache keys identifying a contact submission from its raw POST data"""
+    keys = []
+    token = (data.get('idempotency_key') or '').strip()
+    if token:
+        keys.append(f'{KEY_PREFIX}:token:{token[:64]}')
+
+    parts = [
+        (data.get('email') or '').strip().lower(),
+        ' '.join((data.get('subject') or '').split()),
+        ' '.join((data.get('message') or '').split()),
+    ]
+    if all(parts):
+        digest = hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+        keys.append(f'{KEY_PREFIX}:content:{digest}')
+    return keys
+
+class SubmissionClaim:
+    """Ownership of a submission's idempotency keys for the current request"""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.acquired = []
+        self.original_id = None
+        self.in_flight = False
+
+    @property
+    def is_duplicate(self):
+        return self.original_id is not None or self.in_flight
+
+    def acquire(self):
+        """
+        Claim every key. If one is already taken this is a repeat: the
+        original contact id is recorded, or in_flight is set while the
+        original is still being saved. This never waits; a worker parked
+        on a double-click is one fewer for everyone else.
+        """
+        try:
+            for key in self.keys:
+                if cache.add(key, PENDING, get_window()):
+                    self.acquired.append(key)
+                    continue
+                self.release()
+                self._read_original(key)
+                return self
+        except Exception as e:
+            # The cache only adds protection; never block submissions on it
+            logger.warning(f"Idempotency cache unavailable: {e}")
+            self.acquired = []
+        return self
+
+    def _read_original(self, key):
+        value = cache.get(key)
+        if value == PENDING:
+            self.in_flight = True
+        elif value is not None:
+            self.original_id = value
+        # None: the original failed and gave its keys back
+
+    def complete(self, contact_id):
+        """Point every claimed key at the saved contact for later repeats"""
+        try:
+            cache.set_many({key: contact_id for key in self.acquired}, get_window())
+        except Exception as e:
+            logger.warning(f"Could not record idempotency keys: {e}")
+
+    def complete_later(self, future):
+        """Keep the keys pending until a queued save resolves, then complete or release them"""
+        def done(future):
+            if future.exception() is None:
+                self.complete(future.result())
+            else:
+                self.release()
+        future.add_done_callback(done)
+
+    def release(self):
+        """Give the keys back so a corrected or retried submission can go through"""
+        try:
+            if self.acquired:
+                cache.delete_many(self.acquired)
+        except Exception as e:
+            logger.warning(f"Could not release idempotency keys: {e}")
+        self.acquired = []
+
+def claim_submission(data):
+    return SubmissionClaim(submission_keys(data)).acquire()
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ArchivedContact, Contact
+
+
+class Command(BaseCommand):
+    help = (
+        'Move resolved contacts older than the threshold into the compressed '
+        'archive table, in chunks, to keep the hot Contact table small.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.CONTACT_ARCHIVE_AFTER_DAYS,
+            help='Archive contacts resolved more than this many days ago'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count eligible contacts')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--days and --chunk-size must be positive')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Contacts resolved through the old admin action have no resolved_at
+        eligible = Contact.objects.filter(is_resolved=True).filter(
+            Q(resolved_at__lt=cutoff) | Q(resolved_at__isnull=True, created_at__lt=cutoff)
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'{eligible.count()} contacts would be archived')
+            return
+
+        moved = 0
+        raw_bytes = compressed_bytes = 0
+        started = time.perf_counter()
+        while True:
+            with transaction.atomic():
+                chunk = list(eligible.order_by('id')[:options['chunk_size']])
+                if not chunk:
+                    break
+                archived = [ArchivedContact.from_contact(contact) for contact in chunk]
+                ArchivedContact.objects.bulk_create(archived)
+                Contact.objects.filter(id__in=[contact.id for contact in chunk]).delete()
+
+            moved += len(chunk)
+            raw_bytes += sum(len(contact.message.encode('utf-8')) for contact in chunk)
+            compressed_bytes += sum(len(row.message_compressed) for row in archived)
+            self.stdout.write(f'  {moved} archived')
+
+        elapsed = time.perf_counter() - started
+        ratio = f', messages {raw_bytes} -> {compressed_bytes} bytes' if raw_bytes else ''
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} contacts in {elapsed:.1f}s{ratio}'))
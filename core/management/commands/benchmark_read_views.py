@@ -0,0 +1,88 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory
+
+from core import async_views, views
+
+VIEWS = {
+    'list': ('/contacts/', 'contact_list_view'),
+    'count': ('/api/pending-contacts-count/', 'api_pending_contacts_count'),
+    'home': ('/', 'home'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent-request throughput of the sync read views against '
+        'their async versions. Sync views are driven the way the ASGI handler '
+        'runs them, through the thread-sensitive executor.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', choices=sorted(VIEWS), action='append', help='Views to run (default: all)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per view and mode')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+        parser.add_argument('--query', default='', help='Search term for the list view (exercises a scan)')
+        parser.add_argument('--user', help='Staff username to request as (default: first staff user)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+
+        users = User.objects.filter(is_staff=True, is_active=True)
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No matching active staff user')
+
+        for name in options['view'] or sorted(VIEWS):
+            path, attr = VIEWS[name]
+            if name == 'list' and options['query']:
+                path = f'{path}?{urlencode({"q": options["query"]})}'
+            for mode, view in (('sync', sync_to_async(getattr(views, attr))), ('async', getattr(async_views, attr))):
+                result = asyncio.run(self._run(view, path, user, options['requests'], options['concurrency']))
+                self.stdout.write(
+                    f'{name:<6} {mode:<6} {result["rate"]:>8.1f} req/s  '
+                    f'p50 {result["p50"]:6.1f} ms  p95 {result["p95"]:6.1f} ms'
+                    + (f'  ({result["errors"]} non-200)' if result['errors'] else '')
+                )
+
+    async def _run(self, view, path, user, total, concurrency):
+        factory = AsyncRequestFactory()
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def auser():
+            return user
+
+        async def one():
+            nonlocal errors
+            request = factory.get(path)
+            request.user = user
+            request.auser = auser
+            async with semaphore:
+                started = time.perf_counter()
+                response = await view(request)
+                latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'rate': total / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+            'errors': errors,
+        }
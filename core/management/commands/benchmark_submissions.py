@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models.signals import post_save
+
+from core.batching import WriteBatcher
+from core.forms import ContactForm, NewsletterForm
+from core.models import Contact, ContactChange, EmailHistory, NewsletterSubscription
+from core.rollups import rebuild_rollups
+from notifications.signals import notify_new_contact
+
+BENCH_DOMAIN = 'loadtest.example.com'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent form submissions per second with direct saves and '
+        'with the group-commit write batcher. Staff are not notified of benchmark '
+        'contacts, and benchmark rows are deleted afterwards unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--form', choices=('newsletter', 'contact'), default='newsletter')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent submitters')
+        parser.add_argument('--per-thread', type=int, default=25, help='Submissions per submitter')
+        parser.add_argument('--window-ms', type=int, default=5, help='Batch window for the batched run')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['per_thread'] < 1:
+            raise CommandError('--threads and --per-thread must be positive')
+
+        batcher = WriteBatcher(window=options['window_ms'] / 1000)
+        # Benchmark contacts are not inquiries; keep them off the staff dashboard
+        post_save.disconnect(notify_new_contact, sender=Contact)
+        try:
+            for mode, save in (('direct', lambda instance: instance.save()), ('batched', batcher.save)):
+                result = self._run(options['form'], save, options['threads'], options['per_thread'])
+                self.stdout.write(
+                    f'{mode:<8} {result["rate"]:>8.1f} submissions/s  '
+                    f'{result["saved"]} saved, {result["locked"]} locked, {result["failed"]} failed'
+                )
+            self.stdout.write(
+                f'batched  {batcher.writes} writes in {batcher.batches} transactions '
+                f'({batcher.writes / max(batcher.batches, 1):.1f} per commit)'
+            )
+        finally:
+            post_save.connect(notify_new_contact, sender=Contact)
+            if not options['keep']:
+                self._cleanup(options['form'])
+
+    def _run(self, form_name, save, threads, per_thread):
+        counts = {'saved': 0, 'locked': 0, 'failed': 0}
+        lock = threading.Lock()
+        run_id = uuid.uuid4().hex[:8]
+
+        def submitter(worker):
+            try:
+                for i in range(per_thread):
+                    form = self._build_form(form_name, f'{run_id}-{worker}-{i}')
+                    if not form.is_valid():
+                        raise CommandError(f'Benchmark form is invalid: {form.errors.as_json()}')
+                    try:
+                        save(form.save(commit=False))
+                        key = 'saved'
+                    except OperationalError as e:
+                        key = 'locked' if 'locked' in str(e) else 'failed'
+                    except Exception:
+                        key = 'failed'
+                    with lock:
+                        counts[key] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=submitter, args=(n,)) for n in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        counts['rate'] = counts['saved'] / elapsed if elapsed else 0
+        return counts
+
+    def _build_form(self, form_name, token):
+        email = f'bench-{token}@{BENCH_DOMAIN}'
+        if form_name == 'newsletter':
+            return NewsletterForm(data={'email': email})
+        return ContactForm(data={
+            'name': 'Load Test',
+            'email': email,
+            'subject': f'Benchmark submission {token}',
+            'category': 'general',
+            'message': f'Benchmark message {token} checking how many submissions per second we can store.',
+        }, check_duplicates=False)
+
+    def _cleanup(self, form_name):
+        if form_name == 'newsletter':
+            NewsletterSubscription.objects.filter(email__endswith=f'@{BENCH_DOMAIN}').delete()
+            return
+
+        ids = list(Contact.objects.filter(email__endswith=f'@{BENCH_DOMAIN}').values_list('id', flat=True))
+        Contact.objects.filter(id__in=ids).delete()
+        ContactChange.objects.filter(contact_id__in=ids).delete()
+        EmailHistory.objects.filter(email__endswith=f'@{BENCH_DOMAIN}').delete()
+        rebuild_rollups()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandError
+from django.middleware.csrf import _get_new_csrf_string
+
+from config.asgi import application
+
+# Values typed into the contact form, one validation each
+SAMPLES = [
+    ('name', 'Jane Doe'),
+    ('email', 'jane.doe@example.com'),
+    ('subject', 'Question about my order'),
+    ('message', 'Hello, I would like to know when my order will ship.'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-field validation latency and process CPU time over the '
+        'batch HTTP endpoint and the validation WebSocket. Both go through '
+        'the ASGI application, so HTTP pays the full middleware stack and a '
+        'CSRF check. Client and server share the process, so CPU figures '
+        'include the test client on both sides.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--validations', type=int, default=400, help='Validations per mode')
+        parser.add_argument('--burst', type=int, default=20, help='Keystrokes per field in the superseded-drop run')
+        parser.add_argument('--host', default='localhost', help='Host and Origin header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        if options['validations'] < 1 or options['burst'] < 1:
+            raise CommandError('--validations and --burst must be positive')
+
+        for mode, run in (('http', self._http), ('websocket', self._websocket)):
+            result = asyncio.run(self._measure(run, options['validations'], options['host']))
+            self.stdout.write(
+                f'{mode:<10} p50 {result["p50"]:6.2f} ms  p95 {result["p95"]:6.2f} ms  '
+                f'cpu {result["cpu"]:6.3f} ms/validation'
+                + (f'  ({result["errors"]} failed)' if result['errors'] else '')
+            )
+
+        sent, replies = asyncio.run(self._burst(options['burst'], options['host']))
+        self.stdout.write(f'websocket burst: {sent} keystrokes, {replies} replies sent back')
+
+    async def _measure(self, run, total, host):
+        latencies = []
+        errors = 0
+        cpu_started = time.process_time()
+        async for latency in run(total, host):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+        cpu = time.process_time() - cpu_started
+
+        latencies = sorted(latencies) or [0.0]
+        return {
+            'p50': statistics.median(latencies),
+            'p95': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+            'cpu': cpu * 1000 / total,
+            'errors': errors,
+        }
+
+    async def _http(self, total, host):
+        csrf = _get_new_csrf_string()
+        headers = [
+            (b'host', host.encode()),
+            (b'content-type', b'application/x-www-form-urlencoded'),
+            (b'cookie', f'csrftoken={csrf}'.encode()),
+            (b'x-csrftoken', csrf.encode()),
+            (b'hx-request', b'true'),
+        ]
+        for i in range(total):
+            field, value = SAMPLES[i % len(SAMPLES)]
+            body = urlencode({'validate_form': 'contact', field: value}).encode()
+            started = time.perf_counter()
+            communicator = HttpCommunicator(application, 'POST', '/validate/batch/', body=body, headers=headers)
+            response = await communicator.get_response(timeout=10)
+            latency = (time.perf_counter() - started) * 1000
+            # Let the handler's disconnect listener finish
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait()
+            yield latency if response['status'] == 200 else None
+
+    async def _connect(self, host):
+        communicator = WebsocketCommunicator(application, '/ws/validation/', headers=[
+            (b'host', host.encode()),
+            (b'origin', f'http://{host}'.encode()),
+        ])
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise CommandError('Validation WebSocket refused the connection; check --host against ALLOWED_HOSTS')
+        return communicator
+
+    async def _websocket(self, total, host):
+        communicator = await self._connect(host)
+        try:
+            for seq in range(total):
+                field, value = SAMPLES[seq % len(SAMPLES)]
+                started = time.perf_counter()
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'validate', 'form': 'contact', 'field': field, 'value': value, 'seq': seq,
+                }))
+                reply = json.loads(await communicator.receive_from(timeout=10))
+                latency = (time.perf_counter() - started) * 1000
+                yield latency if reply.get('seq') == seq else None
+        finally:
+            await communicator.disconnect()
+
+    async def _burst(self, burst, host):
+        """Type each field a character at a time without waiting for replies"""
+        communicator = await self._connect(host)
+        sent = replies = 0
+        finals = set()
+        try:
+            seq = 0
+            for field, value in SAMPLES:
+                for length in range(1, burst + 1):
+                    seq += 1
+                    sent += 1
+                    await communicator.send_to(text_data=json.dumps({
+                        'type': 'validate', 'form': 'contact', 'field': field,
+                        'value': (value * burst)[:length], 'seq': seq,
+                    }))
+                finals.add(seq)
+            # The last keystroke of a field is never superseded, so its reply always comes
+            while finals:
+                reply = json.loads(await communicator.receive_from(timeout=10))
+                finals.discard(reply['seq'])
+                replies += 1
+        finally:
+            await communicator.disconnect()
+        return sent, replies
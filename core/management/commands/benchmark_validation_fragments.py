@@ -0,0 +1,61 @@
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.shortcuts import render
+from django.test import RequestFactory
+
+from core.utils import VALIDATION_TEMPLATES, render_validation_html, render_validation_response
+
+MESSAGES = {
+    'success': '✓ Subject looks good! (4 words)',
+    'error': 'Name can only contain letters, spaces, hyphens, apostrophes, and periods',
+    'warning': 'Previous message from <this email> is still open',
+}
+
+
+def make_request():
+    """A POST request carrying what the middleware would attach for context processors"""
+    request = RequestFactory().post('/validate/subject/', {'subject': 'Question about my order'})
+    request.user = AnonymousUser()
+    request.session = SessionStore()
+    request._messages = FallbackStorage(request)
+    return request
+
+
+class Command(BaseCommand):
+    help = (
+        'Time a validation message response rendered with render() (template '
+        'engine plus context processors) against the pre-rendered fragments '
+        'used by render_validation_response.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=5000, help='Responses per type and repeat')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeats; the fastest is reported')
+
+    def handle(self, *args, **options):
+        number, repeat = options['number'], options['repeat']
+        if number < 1 or repeat < 1:
+            raise CommandError('--number and --repeat must be positive')
+
+        request = make_request()
+        for template_type, message in MESSAGES.items():
+            template = VALIDATION_TEMPLATES[template_type]
+            rendered = render(request, template, {'message': message}).content.decode()
+            if rendered != render_validation_html(template_type, message):
+                raise CommandError(f'Pre-rendered {template_type} fragment differs from render()')
+
+            timings = []
+            for label, respond in (
+                ('render()', lambda: render(request, template, {'message': message})),
+                ('fragment', lambda: render_validation_response(template_type, message, request)),
+            ):
+                best = min(timeit.repeat(respond, number=number, repeat=repeat))
+                timings.append(best * 1e6 / number)
+            self.stdout.write(
+                f'{template_type:<8} render() {timings[0]:7.2f} us  fragment {timings[1]:6.2f} us  '
+                f'({timings[0] / timings[1]:.1f}x)'
+            )
@@ -0,0 +1,79 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import utils
+from core.validation_cache import get_validation_cache
+from core.forms import ContactForm
+
+LONG_MESSAGE = (
+    'Hello team, I placed an order last week and the tracking page has not '
+    'updated since Tuesday. Could you check whether it left the warehouse? '
+) * 12
+
+# (label, callable, sample values); the samples mix valid and rejected input
+FIELDS = [
+    ('email', utils.validate_email_format, ['jane.doe@company.org', 'bad..dots@company.org', 'not-an-email']),
+    ('name', utils.validate_name, ['Jane Doe-Smith', 'x', 'Test']),
+    ('subject', utils.validate_subject, ['Question about my order', 'FREE MONEY!!!', 'Hi']),
+    ('message', utils.validate_message, [LONG_MESSAGE[:2000], 'Please call me back about the invoice.', 'spam spam']),
+    ('phone', utils.validate_phone_number, ['+1 (415) 555-0199', '1234567890', 'call me']),
+    ('website', utils.validate_website, ['www.company.org', 'https://bit.ly/xyz', 'nodot']),
+    ('location', utils.validate_location, ['San Francisco, CA', 'n/a', '123']),
+]
+
+CONTACT_DATA = {
+    'name': 'Jane Doe-Smith',
+    'email': 'jane.doe@company.org',
+    'subject': 'Question about my order',
+    'category': 'general',
+    'message': LONG_MESSAGE[:2000],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the pure field validators and a full ContactForm clean, '
+        'reporting microseconds per call with the validation result cache '
+        'disabled and warm. Database-backed checks (availability, '
+        'subscriptions, duplicates) are left out.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000, help='Calls per sample and repeat')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeats; the fastest is reported')
+
+    def handle(self, *args, **options):
+        number, repeat = options['number'], options['repeat']
+        if number < 1 or repeat < 1:
+            raise CommandError('--number and --repeat must be positive')
+
+        cache = get_validation_cache()
+        maxsize = cache.maxsize
+
+        def timed(run, calls_per_run, calls):
+            # Uncached first, then warm (one untimed run fills the cache)
+            timings = []
+            for size in (0, maxsize or 2048):
+                cache.maxsize = size
+                cache.clear()
+                run()
+                best = min(timeit.repeat(run, number=calls, repeat=repeat))
+                timings.append(best * 1e6 / (calls * calls_per_run))
+            return timings
+
+        try:
+            for label, validator, samples in FIELDS:
+                def run():
+                    for sample in samples:
+                        validator(sample)
+                uncached, cached = timed(run, len(samples), number)
+                self.stdout.write(f'{label:<10} {uncached:8.2f} us/call  cached {cached:6.2f} us/call')
+
+            def clean_form():
+                ContactForm(CONTACT_DATA, check_duplicates=False).is_valid()
+            uncached, cached = timed(clean_form, 1, max(number // 10, 1))
+            self.stdout.write(f'{"form":<10} {uncached:8.2f} us/ContactForm clean  cached {cached:6.2f} us')
+        finally:
+            cache.maxsize = maxsize
+            cache.clear()
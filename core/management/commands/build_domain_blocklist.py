@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.blocklist import HEADER, build_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile one or more domain lists (one domain per line, # comments '
+        'allowed) into the sorted blocklist file used for disposable email '
+        'checks. The file is replaced atomically, so running workers pick '
+        'it up on their next reload check.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='+', help='Domain list files to compile')
+        parser.add_argument(
+            '--output', default=settings.DISPOSABLE_DOMAINS_FILE,
+            help='Blocklist file to write (default: DISPOSABLE_DOMAINS_FILE)'
+        )
+        parser.add_argument('--merge', action='store_true', help='Keep the domains already in the output file')
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        sources = [Path(source) for source in options['sources']]
+        if options['merge'] and output.exists():
+            sources.append(output)
+
+        started = time.perf_counter()
+        lines = []
+        for source in sources:
+            try:
+                lines.extend(source.read_text(encoding='utf-8', errors='ignore').splitlines())
+            except OSError as e:
+                raise CommandError(f'Could not read {source}: {e}')
+
+        buffer = build_buffer(lines)
+        count = buffer.count(b'\n') - HEADER.count(b'\n')
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=output.parent, prefix=f'.{output.name}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(buffer)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, output)
+        except OSError as e:
+            os.unlink(temp_path)
+            raise CommandError(f'Could not write {output}: {e}')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {count:,} domains ({len(buffer):,} bytes) to {output} in {elapsed * 1000:.0f} ms'
+        ))
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, stream_contacts
+from core.models import ArchivedContact, Contact
+from core.utils import filter_contacts
+
+
+class Command(BaseCommand):
+    help = 'Stream contacts to a CSV or JSONL file with constant memory usage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('-q', '--query', default='', help='Search name, email and subject')
+        parser.add_argument('--status', choices=['pending', 'resolved'], default='')
+        parser.add_argument('-o', '--output', help='Output file (defaults to stdout)')
+        parser.add_argument('--archived', action='store_true', help='Export the archive table instead')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output on the fly')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        source = ArchivedContact.objects.all() if options['archived'] else Contact.objects.all()
+        contacts = filter_contacts(source, options['query'].strip(), options['status'])
+        chunks = stream_contacts(
+            contacts,
+            options['format'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['output']:
+            written = 0
+            with open(options['output'], 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    written += len(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,151 @@
+import csv
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from core.conditional import bump_contact_data_version
+from core.fingerprint import message_fingerprint
+from core.forms import ContactForm
+from core.history import record_contacts as record_email_history
+from core.models import Contact, ContactChange
+from core.rollups import record_contacts
+from notifications.signals import notify_contacts_imported
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import contacts from a CSV or JSONL file. Rows are validated with the '
+        'ContactForm rules and inserted with bulk_create in chunked transactions, '
+        'followed by a single summary notification.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file (optionally .gz)')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per INSERT statement')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, do not insert')
+        parser.add_argument('--no-notify', action='store_true', help='Skip the summary notification')
+        parser.add_argument('--max-errors', type=int, default=20, help='Invalid rows to report in detail')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        batch_size = options['batch_size']
+        chunk_size = options['chunk_size']
+        if batch_size < 1 or chunk_size < 1:
+            raise CommandError('--batch-size and --chunk-size must be positive')
+
+        export_format = options['format'] or self._guess_format(path)
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            fh = opener(path, 'rt', encoding='utf-8', newline='')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        imported = skipped = 0
+        pending = []
+        started = time.perf_counter()
+
+        with fh:
+            for line_number, row in self._iter_rows(fh, export_format):
+                contact, errors = self._build_contact(row)
+                if contact is None:
+                    skipped += 1
+                    if skipped <= options['max_errors']:
+                        self.stderr.write(f'Row {line_number} skipped: {errors}')
+                    continue
+
+                pending.append(contact)
+                if len(pending) >= chunk_size:
+                    imported += self._flush(pending, batch_size, options['dry_run'])
+                    pending = []
+                    self._report_progress(imported, skipped, started)
+
+            if pending:
+                imported += self._flush(pending, batch_size, options['dry_run'])
+
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else imported
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {imported} contacts ({skipped} skipped) in {elapsed:.1f}s - {rate:,.0f} rows/s'
+        ))
+
+        if imported and not options['dry_run'] and not options['no_notify']:
+            notify_contacts_imported(imported, skipped, source=path)
+
+    def _guess_format(self, path):
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith(('.jsonl', '.ndjson', '.json')):
+            return 'jsonl'
+        if name.endswith('.csv'):
+            return 'csv'
+        raise CommandError('Cannot infer the file format, pass --format')
+
+    def _iter_rows(self, fh, export_format):
+        """Yield (line_number, dict) pairs without reading the whole file"""
+        if export_format == 'csv':
+            reader = csv.DictReader(fh)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, {'__error__': f'invalid JSON ({e})'}
+                continue
+            yield line_number, row if isinstance(row, dict) else {'__error__': 'not an object'}
+
+    def _build_contact(self, row):
+        """Validate a row with ContactForm and return an unsaved Contact"""
+        if '__error__' in row:
+            return None, row['__error__']
+
+        data = {key: ('' if value is None else str(value)) for key, value in row.items()}
+        data.setdefault('category', 'general')
+        # Historical rows are not checked against the live duplicate window
+        form = ContactForm(data=data, check_duplicates=False)
+        if not form.is_valid():
+            return None, dict(form.errors)
+
+        contact = form.instance
+        contact.fingerprint = message_fingerprint(contact.message)
+        created_at = parse_datetime(data.get('created_at', ''))
+        if created_at:
+            contact.created_at = created_at
+        if data.get('is_resolved', '').lower() in TRUE_VALUES:
+            contact.is_resolved = True
+            contact.resolved_at = parse_datetime(data.get('resolved_at', '')) or contact.created_at
+        return contact, None
+
+    def _flush(self, contacts, batch_size, dry_run):
+        if dry_run:
+            return len(contacts)
+        with transaction.atomic():
+            Contact.objects.bulk_create(contacts, batch_size=batch_size)
+            # bulk_create skips post_save, so update rollups, history and the change feed per chunk
+            record_contacts(contacts)
+            record_email_history(contacts)
+            ContactChange.objects.bulk_create(
+                [ContactChange(contact_id=contact.id, action='created') for contact in contacts],
+                batch_size=batch_size,
+            )
+        bump_contact_data_version()
+        return len(contacts)
+
+    def _report_progress(self, imported, skipped, started):
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else imported
+        self.stdout.write(f'  {imported} imported, {skipped} skipped ({rate:,.0f} rows/s)')
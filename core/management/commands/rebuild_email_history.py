@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.history import rebuild_email_history
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-email customer history from live and archived contacts'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_email_history()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} email history rows in {elapsed:.1f}s'))
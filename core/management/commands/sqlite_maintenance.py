@@ -0,0 +1,110 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Routine SQLite upkeep: ANALYZE, PRAGMA optimize, WAL checkpoint and '
+        'incremental vacuum, with before/after file and page statistics. '
+        'Run it from cron, or keep it running with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--skip-analyze', action='store_true', help='Only run the cheap PRAGMA optimize')
+        parser.add_argument('--vacuum-pages', type=int, default=0, help='Free pages to release (0 = all)')
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='Switch the file to auto_vacuum=INCREMENTAL (runs a full VACUUM once)'
+        )
+        parser.add_argument('--loop', type=int, metavar='SECONDS', help='Repeat every SECONDS until interrupted')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'{options["database"]} is not an SQLite database')
+        if options['vacuum_pages'] < 0:
+            raise CommandError('--vacuum-pages cannot be negative')
+
+        if options['enable_incremental_vacuum']:
+            self._enable_incremental_vacuum(connection)
+
+        while True:
+            self._run_once(connection, options)
+            if not options['loop']:
+                break
+            # Don't hold a connection (and its WAL snapshot) while idle
+            connection.close()
+            time.sleep(options['loop'])
+
+    def _run_once(self, connection, options):
+        before = self._stats(connection)
+        timings = []
+
+        def step(label, sql):
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                rows = cursor.fetchall()
+            timings.append((label, time.perf_counter() - started, rows))
+
+        if not options['skip_analyze']:
+            step('analyze', 'ANALYZE')
+        step('optimize', 'PRAGMA optimize')
+        if before['journal_mode'] == 'wal':
+            step('checkpoint', 'PRAGMA wal_checkpoint(TRUNCATE)')
+        if before['auto_vacuum'] == 2:
+            pages = options['vacuum_pages']
+            step('vacuum', f'PRAGMA incremental_vacuum({pages})' if pages else 'PRAGMA incremental_vacuum')
+
+        after = self._stats(connection)
+
+        for label, elapsed, rows in timings:
+            detail = ''
+            if label == 'checkpoint' and rows:
+                busy, log_pages, checkpointed = rows[0]
+                detail = f' (busy={busy}, wal pages={log_pages}, checkpointed={checkpointed})'
+            self.stdout.write(f'  {label:<11} {elapsed * 1000:8.1f} ms{detail}')
+
+        if before['auto_vacuum'] != 2:
+            self.stdout.write('  vacuum      skipped (auto_vacuum is not INCREMENTAL, see --enable-incremental-vacuum)')
+
+        for key in ('file_bytes', 'wal_bytes', 'page_count', 'freelist_count', 'stat_rows'):
+            self.stdout.write(f'  {key:<15} {before[key]:>14,} -> {after[key]:>14,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'SQLite maintenance done ({after["journal_mode"]} journal, page size {after["page_size"]})'
+        ))
+
+    def _stats(self, connection):
+        with connection.cursor() as cursor:
+            def pragma(name):
+                cursor.execute(f'PRAGMA {name}')
+                return cursor.fetchone()[0]
+
+            stats = {
+                name: pragma(name)
+                for name in ('journal_mode', 'auto_vacuum', 'page_size', 'page_count', 'freelist_count')
+            }
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone()[0]:
+                cursor.execute('SELECT count(*) FROM sqlite_stat1')
+                stats['stat_rows'] = cursor.fetchone()[0]
+            else:
+                stats['stat_rows'] = 0
+
+        path = str(connection.settings_dict['NAME'])
+        stats['file_bytes'] = os.path.getsize(path) if os.path.exists(path) else 0
+        stats['wal_bytes'] = os.path.getsize(f'{path}-wal') if os.path.exists(f'{path}-wal') else 0
+        return stats
+
+    def _enable_incremental_vacuum(self, connection):
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            # The new mode only takes effect after a full rebuild of the file
+            cursor.execute('VACUUM')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Enabled incremental vacuum in {elapsed:.1f}s')
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database into the replica file with the online '
+        'backup API. A local stand-in for replication when DATABASE_REPLICA_NAME '
+        'is set; use --loop to keep the replica a few seconds behind.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=int, metavar='SECONDS', help='Repeat every SECONDS until interrupted')
+        parser.add_argument(
+            '--pages', type=int, default=-1,
+            help='Pages copied per step; smaller steps let writers in between (-1 = all at once)'
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in connections.settings:
+            raise CommandError('No replica database configured (set DATABASE_REPLICA_NAME)')
+
+        primary = connections.settings[DEFAULT_DB_ALIAS]
+        replica = connections.settings[REPLICA_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3' or replica['ENGINE'] != primary['ENGINE']:
+            raise CommandError('sync_replica only supports SQLite primaries and replicas')
+        if str(primary['NAME']) == str(replica['NAME']):
+            raise CommandError('The replica must be a different file from the primary')
+
+        while True:
+            self._sync(str(primary['NAME']), str(replica['NAME']), options['pages'])
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def _sync(self, source_path, target_path, pages):
+        started = time.perf_counter()
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target, pages=pages)
+            page_count = target.execute('PRAGMA page_count').fetchone()[0]
+        except sqlite3.Error as e:
+            raise CommandError(f'Replica sync failed: {e}')
+        finally:
+            target.close()
+            source.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Replica synced: {page_count:,} pages in {elapsed * 1000:.0f} ms'
+        ))
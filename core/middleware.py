@@ -0,0 +1,43 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from .routers import begin_request, end_request, get_routing_state, replica_configured
+
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+def _start(request):
+    return begin_request(pinned=REPLICA_PIN_COOKIE in request.COOKIES)
+
+def _finish(response):
+    if get_routing_state().wrote and replica_configured():
+        response.set_cookie(
+            REPLICA_PIN_COOKIE, '1',
+            max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """
+    Give each request its own routing state and, after a write, pin the
+    client to the primary for REPLICA_PIN_SECONDS so replica lag never
+    hides the user's own changes
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _start(request)
+            try:
+                return _finish(await get_response(request))
+            finally:
+                end_request(token)
+    else:
+        def middleware(request):
+            token = _start(request)
+            try:
+                return _finish(get_response(request))
+            finally:
+                end_request(token)
+    return middleware
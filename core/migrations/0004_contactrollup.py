@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_contact_category_alter_contact_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField(help_text='Start of the time bucket (UTC)')),
+                ('category', models.CharField(choices=[('general', 'General Inquiry'), ('support', 'Technical Support'), ('feedback', 'Feedback'), ('business', 'Business Inquiry'), ('other', 'Other')], max_length=20)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('resolved_count', models.PositiveIntegerField(default=0)),
+                ('resolve_seconds_total', models.BigIntegerField(default=0)),
+                ('resolve_histogram', models.JSONField(blank=True, default=dict, help_text='Log-scaled histogram of time-to-resolve, used for medians')),
+            ],
+            options={
+                'verbose_name': 'Contact Rollup',
+                'verbose_name_plural': 'Contact Rollups',
+                'ordering': ['-bucket'],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'category'), name='core_rollup_unique_bucket')],
+            },
+        ),
+    ]
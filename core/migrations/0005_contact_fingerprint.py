@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:51
+
+import hashlib
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+# A frozen copy of core.fingerprint as of this migration, so later changes
+# to that module do not change what the backfill computes
+FINGERPRINT_BITS = 64
+MIN_TOKENS = 8
+TOKEN_REGEX = re.compile(r'\w+')
+
+
+def message_fingerprint(message):
+    """Signed 64-bit SimHash of a message, or None if it is too short"""
+    tokens = TOKEN_REGEX.findall((message or '').lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for token, count in Counter(tokens).items():
+        value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    if fingerprint >= 1 << (FINGERPRINT_BITS - 1):
+        fingerprint -= 1 << FINGERPRINT_BITS
+    return fingerprint
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Contact = apps.get_model('core', 'Contact')
+    batch = []
+    for contact in Contact.objects.only('id', 'message').iterator(chunk_size=2000):
+        contact.fingerprint = message_fingerprint(contact.message)
+        batch.append(contact)
+        if len(batch) >= 2000:
+            Contact.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    if batch:
+        Contact.objects.bulk_update(batch, ['fingerprint'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_contactrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='fingerprint',
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, help_text='SimHash of the message used for duplicate detection', null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_contact_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContact',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(db_index=True, max_length=254)),
+                ('subject', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('general', 'General Inquiry'), ('support', 'Technical Support'), ('feedback', 'Feedback'), ('business', 'Business Inquiry'), ('other', 'Other')], default='general', max_length=20)),
+                ('message_compressed', models.BinaryField()),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_resolved_contacts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Contact Message',
+                'verbose_name_plural': 'Archived Contact Messages',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
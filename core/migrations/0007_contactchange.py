@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_changes(apps, schema_editor):
+    """Give existing contacts a 'created' (and 'resolved') entry so feeds can start at 0"""
+    Contact = apps.get_model('core', 'Contact')
+    ContactChange = apps.get_model('core', 'ContactChange')
+    batch = []
+    rows = Contact.objects.order_by('created_at', 'id').values_list('id', 'created_at', 'is_resolved', 'resolved_at')
+    for contact_id, created_at, is_resolved, resolved_at in rows.iterator(chunk_size=2000):
+        batch.append(ContactChange(contact_id=contact_id, action='created', created_at=created_at))
+        if is_resolved:
+            batch.append(ContactChange(contact_id=contact_id, action='resolved', created_at=resolved_at or created_at))
+        if len(batch) >= 2000:
+            ContactChange.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ContactChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_archivedcontact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contact_id', models.BigIntegerField(db_index=True)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('resolved', 'Resolved')], max_length=10)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Contact Change',
+                'verbose_name_plural': 'Contact Changes',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_contactchange'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contact',
+            name='core_contac_is_reso_c1069a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='archivedcontact',
+            index=models.Index(fields=['-created_at', '-id', 'name', 'subject'], name='core_archived_list_cover'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['is_resolved', '-created_at', '-id', 'name', 'subject'], name='core_contact_list_cover'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['-created_at', '-id', 'is_resolved', 'name', 'subject'], name='core_contact_recent_cover'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:07
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Lower
+
+
+def seed_history(apps, schema_editor):
+    """Aggregate history for existing live and archived contacts"""
+    Contact = apps.get_model('core', 'Contact')
+    ArchivedContact = apps.get_model('core', 'ArchivedContact')
+    EmailHistory = apps.get_model('core', 'EmailHistory')
+
+    live = Contact.objects.annotate(address=Lower('email')).values('address').annotate(
+        first=Min('created_at'),
+        last=Max('created_at'),
+        contacts=Count('id'),
+        opened=Count('id', filter=Q(is_resolved=False)),
+    ).order_by()
+    archived = ArchivedContact.objects.annotate(address=Lower('email')).values('address').annotate(
+        first=Min('created_at'),
+        last=Max('created_at'),
+        contacts=Count('id'),
+    ).order_by()
+
+    # email -> [first_seen, last_seen, contact_count, open_count]
+    histories = {}
+    for row in list(live) + list(archived):
+        history = histories.setdefault(row['address'].strip(), [row['first'], row['last'], 0, 0])
+        history[0] = min(history[0], row['first'])
+        history[1] = max(history[1], row['last'])
+        history[2] += row['contacts']
+        history[3] += row.get('opened', 0)
+
+    EmailHistory.objects.bulk_create([
+        EmailHistory(
+            email=email,
+            first_seen=first_seen,
+            last_seen=last_seen,
+            contact_count=contact_count,
+            open_count=open_count,
+        )
+        for email, (first_seen, last_seen, contact_count, open_count) in histories.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_contact_facet_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(help_text='Lower-cased sender address', max_length=254, unique=True)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('contact_count', models.PositiveIntegerField(default=0)),
+                ('open_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Email History',
+                'verbose_name_plural': 'Email Histories',
+            },
+        ),
+        migrations.RunPython(seed_history, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
+import zlib
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import MinLengthValidator
 from django.core.exceptions import ValidationError
 
+from .fingerprint import message_fingerprint
+
 # Constants
 MAX_CONTACT_SUBJECT_LENGTH = 200
 MAX_CONTACT_NAME_LENGTH = 100
@@ -63,6 +67,13 @@ class Contact(models.Model):
         blank=True,
         related_name='resolved_contacts'
     )
+    fingerprint = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,  # Indexed for near-duplicate lookups
+        help_text="SimHash of the message used for duplicate detection"
+    )
 
     class Meta:
         ordering = ['-created_at']
@@ -70,9 +81,20 @@ class Contact(models.Model):
         verbose_name_plural = "Contact Messages"
         indexes = [
             # Composite indexes for common query patterns
-            models.Index(fields=['is_resolved', '-created_at']),
             models.Index(fields=['category', '-created_at']),
             models.Index(fields=['email', '-created_at']),
+            # Covering indexes for the staff list: they hold every column the
+            # page displays, so list pages are answered by index-only reads
+            models.Index(
+                fields=['is_resolved', '-created_at', '-id', 'name', 'subject'],
+                name='core_contact_list_cover',
+            ),
+            models.Index(
+                fields=['-created_at', '-id', 'is_resolved', 'name', 'subject'],
+                name='core_contact_recent_cover',
+            ),
+            # Lets the category x status facet GROUP BY read only the index
+            models.Index(fields=['category', 'is_resolved'], name='core_contact_facet_idx'),
         ]
 
     def __str__(self):
@@ -84,12 +106,107 @@ class Contact(models.Model):
         if self.resolved_at and not self.is_resolved:
             raise ValidationError("Cannot have resolved_at without is_resolved being True")
 
+    def save(self, *args, **kwargs):
+        """Fingerprint the message on first save"""
+        if self.fingerprint is None:
+            self.fingerprint = message_fingerprint(self.message)
+        super().save(*args, **kwargs)
+
     def mark_resolved(self, user=None):
         """Mark contact as resolved with proper timestamp"""
+        from .history import record_resolved as record_history_resolved
+        from .rollups import record_resolved
+
+        was_resolved = self.is_resolved
         self.is_resolved = True
         self.resolved_at = timezone.now()
         self.resolved_by = user
         self.save(update_fields=['is_resolved', 'resolved_at', 'resolved_by'])
+        if not was_resolved:
+            record_resolved(self)
+            record_history_resolved(self)
+            ContactChange.objects.create(contact_id=self.id, action='resolved')
+
+class ArchivedContact(models.Model):
+    """
+    Cold storage for old resolved contacts. Rows keep their original id
+    (the reference number shown to the customer) and the message body is
+    stored zlib-compressed to keep the archive small. The first byte of
+    message_compressed marks the encoding: b'z' for zlib, b'r' for raw.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=MAX_CONTACT_NAME_LENGTH)
+    email = models.EmailField(db_index=True)
+    subject = models.CharField(max_length=MAX_CONTACT_SUBJECT_LENGTH)
+    category = models.CharField(
+        max_length=20,
+        choices=Contact.SUBJECT_CHOICES,
+        default='general'
+    )
+    message_compressed = models.BinaryField()
+    created_at = models.DateTimeField(db_index=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    resolved_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_resolved_contacts'
+    )
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    # Archived contacts are always resolved; exposed for template/export parity
+    is_resolved = True
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Archived Contact Message"
+        verbose_name_plural = "Archived Contact Messages"
+        indexes = [
+            # Covers the archived view of the staff list
+            models.Index(
+                fields=['-created_at', '-id', 'name', 'subject'],
+                name='core_archived_list_cover',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived contact from {self.name} - {self.subject[:50]}"
+
+    @staticmethod
+    def compress_message(message):
+        """Deflate the message, keeping it raw when that is smaller (short texts)"""
+        raw = message.encode('utf-8')
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            return b'z' + compressed
+        return b'r' + raw
+
+    @staticmethod
+    def decompress_message(data):
+        data = bytes(data)
+        if data[:1] == b'z':
+            return zlib.decompress(data[1:]).decode('utf-8')
+        return data[1:].decode('utf-8')
+
+    @property
+    def message(self):
+        return self.decompress_message(self.message_compressed)
+
+    @classmethod
+    def from_contact(cls, contact):
+        """Build an unsaved archive row from a resolved Contact"""
+        return cls(
+            id=contact.id,
+            name=contact.name,
+            email=contact.email,
+            subject=contact.subject,
+            category=contact.category,
+            message_compressed=cls.compress_message(contact.message),
+            created_at=contact.created_at,
+            resolved_at=contact.resolved_at,
+            resolved_by_id=contact.resolved_by_id,
+        )
 
 class NewsletterSubscription(models.Model):
     email = models.EmailField(
@@ -119,3 +236,86 @@ class NewsletterSubscription(models.Model):
         """Deactivate subscription instead of deleting"""
         self.is_active = False
         self.save(update_fields=['is_active'])
+
+class ContactChange(models.Model):
+    """
+    Append-only log of contact state changes. The auto-increment id is the
+    feed cursor: consumers ask for changes after the last id they saw.
+    contact_id is not a foreign key so entries survive archiving.
+    """
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('resolved', 'Resolved'),
+    ]
+
+    contact_id = models.BigIntegerField(db_index=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Contact Change"
+        verbose_name_plural = "Contact Changes"
+
+    def __str__(self):
+        return f"#{self.id} {self.action} contact {self.contact_id}"
+
+class ContactRollup(models.Model):
+    """
+    Pre-aggregated contact counts per time bucket and category.
+    Contacts are attributed to the bucket they were created in, so
+    pending = created_count - resolved_count for that cohort.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hourly'),
+        ('day', 'Daily'),
+    ]
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the time bucket (UTC)")
+    category = models.CharField(max_length=20, choices=Contact.SUBJECT_CHOICES)
+    created_count = models.PositiveIntegerField(default=0)
+    resolved_count = models.PositiveIntegerField(default=0)
+    resolve_seconds_total = models.BigIntegerField(default=0)
+    resolve_histogram = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Log-scaled histogram of time-to-resolve, used for medians"
+    )
+
+    class Meta:
+        ordering = ['-bucket']
+        verbose_name = "Contact Rollup"
+        verbose_name_plural = "Contact Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'category'],
+                name='core_rollup_unique_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_granularity_display()} {self.bucket:%Y-%m-%d %H:%M} {self.category}"
+
+    @property
+    def pending_count(self):
+        return self.created_count - self.resolved_count
+
+class EmailHistory(models.Model):
+    """
+    Per-email aggregate of everything a customer has sent us, kept
+    current on write so triage reads one row instead of scanning Contact.
+    Archived contacts stay counted; see core.history.
+    """
+    email = models.EmailField(unique=True, help_text="Lower-cased sender address")
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    contact_count = models.PositiveIntegerField(default=0)
+    open_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Email History"
+        verbose_name_plural = "Email Histories"
+
+    def __str__(self):
+        return f"{self.email}: {self.contact_count} contacts ({self.open_count} open)"
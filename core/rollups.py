@@ -0,0 +1,189 @@
+"""
+Time-bucketed contact rollups for dashboards and analytics.
+
+Counters are updated incrementally when contacts are created or resolved,
+so analytics queries read O(buckets) rows instead of scanning Contact.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedContact, Contact, ContactRollup
+
+GRANULARITIES = ('hour', 'day')
+
+# Time-to-resolve histogram resolution: 4 bins per doubling (~19% wide)
+HISTOGRAM_BINS_PER_OCTAVE = 4
+
+def bucket_start(value, granularity):
+    """Truncate a datetime to the start of its UTC hour or day"""
+    value = value.astimezone(dt_timezone.utc)
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def histogram_bin(seconds):
+    """Map a duration in seconds to its log-scaled histogram bin"""
+    return int(math.log2(max(seconds, 0) + 1) * HISTOGRAM_BINS_PER_OCTAVE)
+
+def bin_seconds(index):
+    """Representative duration for a histogram bin (geometric midpoint)"""
+    return 2 ** ((index + 0.5) / HISTOGRAM_BINS_PER_OCTAVE) - 1
+
+def merge_histograms(target, histogram):
+    for index, count in histogram.items():
+        target[str(index)] = target.get(str(index), 0) + count
+    return target
+
+def median_from_histogram(histogram):
+    """Approximate median time-to-resolve from a rollup histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    seen = 0
+    for index in sorted(histogram, key=int):
+        seen += histogram[index]
+        if seen * 2 >= total:
+            return timedelta(seconds=round(bin_seconds(int(index))))
+    return None
+
+class RollupDelta:
+    """Pending counter changes for a single rollup row"""
+
+    __slots__ = ('created', 'resolved', 'seconds', 'histogram')
+
+    def __init__(self):
+        self.created = 0
+        self.resolved = 0
+        self.seconds = 0
+        self.histogram = {}
+
+def _accumulate(deltas, category, created_at, resolved_at=None, created=True):
+    seconds = None
+    if resolved_at:
+        seconds = max(int((resolved_at - created_at).total_seconds()), 0)
+
+    for granularity in GRANULARITIES:
+        delta = deltas[(granularity, bucket_start(created_at, granularity), category)]
+        if created:
+            delta.created += 1
+        if seconds is not None:
+            delta.resolved += 1
+            delta.seconds += seconds
+            merge_histograms(delta.histogram, {histogram_bin(seconds): 1})
+
+def _apply(deltas):
+    """Add accumulated deltas to their rollup rows in one transaction"""
+    with transaction.atomic():
+        for (granularity, bucket, category), delta in deltas.items():
+            rollup, _ = ContactRollup.objects.select_for_update().get_or_create(
+                granularity=granularity, bucket=bucket, category=category
+            )
+            rollup.created_count += delta.created
+            rollup.resolved_count += delta.resolved
+            rollup.resolve_seconds_total += delta.seconds
+            rollup.resolve_histogram = merge_histograms(rollup.resolve_histogram or {}, delta.histogram)
+            rollup.save()
+
+def record_contacts(contacts):
+    """Count newly created contacts (resolved ones included) in their buckets"""
+    deltas = defaultdict(RollupDelta)
+    for contact in contacts:
+        _accumulate(
+            deltas,
+            contact.category,
+            contact.created_at,
+            contact.resolved_at if contact.is_resolved else None,
+        )
+    if deltas:
+        _apply(deltas)
+
+def record_created(contact):
+    record_contacts([contact])
+
+def record_resolved(contact):
+    """Count a resolution against the bucket the contact was created in"""
+    deltas = defaultdict(RollupDelta)
+    _accumulate(
+        deltas,
+        contact.category,
+        contact.created_at,
+        contact.resolved_at or timezone.now(),
+        created=False,
+    )
+    _apply(deltas)
+
+def rebuild_rollups(chunk_size=5000):
+    """Recompute every rollup row from live and archived contacts, returning the row count"""
+    deltas = defaultdict(RollupDelta)
+    rows = Contact.objects.values_list(
+        'category', 'created_at', 'is_resolved', 'resolved_at'
+    ).iterator(chunk_size=chunk_size)
+    for category, created_at, is_resolved, resolved_at in rows:
+        _accumulate(deltas, category, created_at, resolved_at if is_resolved else None)
+
+    # Archived contacts still belong to the history
+    archived = ArchivedContact.objects.values_list(
+        'category', 'created_at', 'resolved_at'
+    ).iterator(chunk_size=chunk_size)
+    for category, created_at, resolved_at in archived:
+        _accumulate(deltas, category, created_at, resolved_at or created_at)
+
+    rollups = [
+        ContactRollup(
+            granularity=granularity,
+            bucket=bucket,
+            category=category,
+            created_count=delta.created,
+            resolved_count=delta.resolved,
+            resolve_seconds_total=delta.seconds,
+            resolve_histogram=delta.histogram,
+        )
+        for (granularity, bucket, category), delta in deltas.items()
+    ]
+    with transaction.atomic():
+        ContactRollup.objects.all().delete()
+        ContactRollup.objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
+
+def get_rollup_series(granularity='day', since=None):
+    """
+    Build a per-bucket series plus overall totals from rollup rows.
+    Cost is proportional to the number of buckets in the range.
+    """
+    rollups = ContactRollup.objects.filter(granularity=granularity)
+    if since:
+        rollups = rollups.filter(bucket__gte=bucket_start(since, granularity))
+
+    buckets = {}
+    overall_histogram = {}
+    totals = {'created': 0, 'resolved': 0, 'pending': 0}
+    for rollup in rollups.order_by('bucket', 'category'):
+        entry = buckets.setdefault(rollup.bucket, {
+            'bucket': rollup.bucket,
+            'created': 0,
+            'resolved': 0,
+            'pending': 0,
+            'categories': {},
+            'histogram': {},
+        })
+        entry['created'] += rollup.created_count
+        entry['resolved'] += rollup.resolved_count
+        entry['pending'] += rollup.pending_count
+        entry['categories'][rollup.category] = rollup.created_count
+        merge_histograms(entry['histogram'], rollup.resolve_histogram)
+        merge_histograms(overall_histogram, rollup.resolve_histogram)
+
+    series = []
+    for entry in buckets.values():
+        entry['median_resolve'] = median_from_histogram(entry.pop('histogram'))
+        for key in totals:
+            totals[key] += entry[key]
+        series.append(entry)
+
+    totals['median_resolve'] = median_from_histogram(overall_histogram)
+    return series, totals
@@ -0,0 +1,99 @@
+"""
+Read replica routing.
+
+When DATABASES has a 'replica' alias, read-only paths that tolerate a
+little lag (exports, dashboard counts, availability checks) read from it;
+everything else stays on 'default'. Views answered under the contact data
+version ETag (core.conditional) read the primary too, or a lagging page
+would be cached under a version it does not reflect. A request that writes
+is pinned to the primary for the rest of the request, and the pinning
+middleware carries that over to the next few seconds of requests from
+the same browser, so users always read their own writes.
+"""
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+
+# Session writes happen on every request and never hit the replica
+UNPINNED_APPS = ('sessions',)
+
+class RoutingState:
+    """Per-request routing flags, shared with threads the request spawns"""
+
+    __slots__ = ('pinned', 'wrote', 'replica_depth')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica_depth = 0
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+def begin_request(pinned=False):
+    """Start fresh routing state; returns a token for end_request()"""
+    return _routing_state.set(RoutingState(pinned))
+
+def end_request(token):
+    _routing_state.reset(token)
+
+def get_routing_state():
+    state = _routing_state.get()
+    if state is None:
+        state = RoutingState()
+        _routing_state.set(state)
+    return state
+
+def record_write():
+    """Pin the current request to the primary, as its write will not be on the replica yet"""
+    state = get_routing_state()
+    state.pinned = True
+    state.wrote = True
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+class read_replica(ContextDecorator):
+    """Route reads inside the block to the replica unless pinned to the primary"""
+
+    def __enter__(self):
+        get_routing_state().replica_depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        get_routing_state().replica_depth -= 1
+        return False
+
+def on_replica(queryset):
+    """
+    Bind a queryset to the read alias chosen now, for querysets that are
+    evaluated later (templates, streamed responses, thread pools)
+    """
+    with read_replica():
+        return queryset.using(queryset.db)
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state and state.replica_depth and not state.pinned and replica_configured():
+            return REPLICA_ALIAS
+        # Never follow a replica-loaded instance outside a replica block
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in UNPINNED_APPS:
+            record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, never migrated directly
+        if db == REPLICA_ALIAS:
+            return False
+        return None
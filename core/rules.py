@@ -0,0 +1,481 @@
+"""
+Declarative field validation rules.
+
+Every field rule set is declared once here and compiled at import: patterns
+become compiled regexes, word lists become frozensets or a single compiled
+alternation, the spam lists are scanned by the shared matcher in
+core.patterns and disposable email domains are looked up in the
+core.blocklist file. core.utils validators (used by the htmx endpoints) and the
+forms' clean_* methods both go through validate()/clean_field(), so the two
+can no longer drift apart, and share the result memo in
+core.validation_cache. Database checks such as availability stay with
+their callers.
+
+Rules are plain data where possible so client_rules() can export them for
+the browser (templates/core/validation_rules.js implements the same rule
+types); a Check without a `client` name only runs on the server.
+"""
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from django.core.exceptions import ValidationError
+
+from .blocklist import is_disposable_domain
+from .patterns import TEXT_PATTERNS, scan_text
+from .validation_cache import get_validation_cache
+
+# Patterns are exported to the browser and run there with the u flag, so
+# they stick to syntax both engines read the same way: re.ASCII keeps \d and
+# \D to 0-9 as in JavaScript, whitespace is spelled out because the two
+# disagree on Unicode \s, and classes avoid escapes the u flag rejects
+WHITESPACE = r'\t\n\v\f\r '
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', re.ASCII)
+NAME_RE = re.compile(rf"^[a-zA-Z{WHITESPACE}'.-]+$", re.ASCII)
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_.-]+$', re.ASCII)
+PHONE_RE = re.compile(rf'^\+?[0-9{WHITESPACE}().-]{{10,17}}$', re.ASCII)
+LOCATION_RE = re.compile(rf"^[a-zA-Z{WHITESPACE},'.-]+$", re.ASCII)
+NON_DIGIT_RE = re.compile(r'\D', re.ASCII)
+EMAIL_DOMAIN_EDGE_RE = re.compile(r'@\.|\.$', re.ASCII)
+UNSPACED_SUBJECT_RE = re.compile(r'^[^ ]{21,}$', re.ASCII)
+LINK_RE = re.compile(r'http', re.ASCII)
+HAS_DOT_RE = re.compile(r'[^.]*\.', re.ASCII)
+EMPTY_LABEL_RE = re.compile(r'^\.|\.\.|\.$', re.ASCII)
+PUNCTUATION_ONLY_RE = re.compile(r'^[ ,.-]+$', re.ASCII)
+
+PLACEHOLDER_DOMAINS = frozenset({'test.com', 'example.com', 'fake.com', 'notreal.com'})
+ROLE_EMAIL_PREFIXES = frozenset({'admin', 'info', 'support', 'sales', 'marketing', 'noreply', 'no-reply'})
+
+
+class Rule(ABC):
+    """
+    A single check; fails() returns True when the value breaks the rule.
+    `part` picks what is checked (the whole value by default). to_client()
+    describes the rule for the browser copy of the rules, or returns None
+    when only the server can run it.
+    """
+
+    __slots__ = ('message', 'part')
+    client_type = None
+
+    def __init__(self, message, part=None):
+        self.message = message
+        self.part = part
+
+    def _part(self, value):
+        return value if self.part is None else self.part(value)
+
+    @abstractmethod
+    def fails(self, value):
+        """True when value breaks the rule"""
+
+    def client_args(self):
+        return {}
+
+    def to_client(self):
+        if self.client_type is None or self.part not in CLIENT_PARTS:
+            return None
+        return {'type': self.client_type, 'message': self.message, 'part': CLIENT_PARTS[self.part], **self.client_args()}
+
+
+class MinLength(Rule):
+    __slots__ = ('limit',)
+    client_type = 'minLength'
+
+    def __init__(self, limit, message, part=None):
+        super().__init__(message, part)
+        self.limit = limit
+
+    def fails(self, value):
+        return len(self._part(value)) < self.limit
+
+    def client_args(self):
+        return {'limit': self.limit}
+
+
+class MaxLength(Rule):
+    __slots__ = ('limit',)
+    client_type = 'maxLength'
+
+    def __init__(self, limit, message, part=None):
+        super().__init__(message, part)
+        self.limit = limit
+
+    def fails(self, value):
+        return len(self._part(value)) > self.limit
+
+    def client_args(self):
+        return {'limit': self.limit}
+
+
+class Matches(Rule):
+    """The value must match a precompiled pattern"""
+
+    __slots__ = ('pattern',)
+    client_type = 'matches'
+
+    def __init__(self, pattern, message, part=None):
+        super().__init__(message, part)
+        self.pattern = pattern
+
+    def fails(self, value):
+        return self.pattern.match(self._part(value)) is None
+
+    def client_args(self):
+        # match() anchors at the start; RegExp.test() does not
+        return {'pattern': f'^(?:{self.pattern.pattern})'}
+
+
+class Rejects(Rule):
+    """The value must not contain the pattern more than `allowed` times"""
+
+    __slots__ = ('pattern', 'allowed')
+    client_type = 'rejects'
+
+    def __init__(self, pattern, message, allowed=0, part=None):
+        super().__init__(message, part)
+        self.pattern = pattern
+        self.allowed = allowed
+
+    def fails(self, value):
+        value = self._part(value)
+        if not self.allowed:
+            return self.pattern.search(value) is not None
+        return len(self.pattern.findall(value)) > self.allowed
+
+    def client_args(self):
+        return {'pattern': self.pattern.pattern, 'allowed': self.allowed}
+
+
+class OneOf(Rule):
+    """The value, or part of it, must not be one of a set of words"""
+
+    __slots__ = ('words',)
+    client_type = 'oneOf'
+
+    def __init__(self, words, message, part=str.lower):
+        super().__init__(message, part)
+        self.words = frozenset(words)
+
+    def fails(self, value):
+        return self._part(value) in self.words
+
+    def client_args(self):
+        return {'words': sorted(self.words)}
+
+
+class Contains(Rule):
+    """
+    The value must not contain more than `allowed` distinct words of a
+    list, ignoring case. The words are scanned for with one alternation
+    over the lowercased value, which is much cheaper than re.IGNORECASE.
+    """
+
+    __slots__ = ('words', 'pattern', 'allowed')
+    client_type = 'contains'
+
+    def __init__(self, words, message, allowed=0, part=str.lower):
+        super().__init__(message, part)
+        self.words = sorted({word.lower() for word in words}, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(word) for word in self.words))
+        self.allowed = allowed
+
+    def fails(self, value):
+        value = self._part(value)
+        if not self.allowed:
+            return self.pattern.search(value) is not None
+        return len(set(self.pattern.findall(value))) > self.allowed
+
+    def client_args(self):
+        return {'words': self.words, 'allowed': self.allowed}
+
+
+class Scan(Rule):
+    """
+    The value must not contain more than `allowed` patterns of one of the
+    core.patterns lists, found by the same matcher as the security check.
+    """
+
+    __slots__ = ('list_name', 'allowed')
+    client_type = 'scan'
+
+    def __init__(self, list_name, message, allowed=0):
+        super().__init__(message)
+        self.list_name = list_name
+        self.allowed = allowed
+
+    def fails(self, value):
+        return len(scan_text(value).get(self.list_name, ())) > self.allowed
+
+    def client_args(self):
+        return {'patterns': list(TEXT_PATTERNS.lists[self.list_name]), 'allowed': self.allowed}
+
+
+class MinCount(Rule):
+    """The value must have at least `limit` letters, words or distinct characters"""
+
+    __slots__ = ('counter', 'limit')
+    client_type = 'minCount'
+
+    def __init__(self, counter, limit, message, part=None):
+        super().__init__(message, part)
+        self.counter = counter
+        self.limit = limit
+
+    def fails(self, value):
+        return COUNTERS[self.counter](self._part(value), self.limit) < self.limit
+
+    def client_args(self):
+        return {'counter': self.counter, 'limit': self.limit}
+
+
+class Check(Rule):
+    """
+    Any other condition, as a function returning True when the value is
+    invalid. `client` names the same test in the browser rules, if any.
+    """
+
+    __slots__ = ('test', 'client')
+    client_type = 'check'
+
+    def __init__(self, test, message, client=None):
+        super().__init__(message)
+        self.test = test
+        self.client = client
+
+    def fails(self, value):
+        return self.test(value)
+
+    def to_client(self):
+        return super().to_client() if self.client else None
+
+    def client_args(self):
+        return {'name': self.client}
+
+
+class FieldRules:
+    """
+    The ordered rules for one field. Messages may use {field} and
+    {field_lower} for the field label, and the success message {words}
+    for the value's word count.
+    """
+
+    __slots__ = ('label', 'rules', 'success', 'normalize')
+
+    def __init__(self, label, rules, success, normalize=str.strip):
+        self.label = label
+        self.rules = tuple(rules)
+        self.success = success
+        self.normalize = normalize
+
+    def validate(self, value, label=None):
+        """(is_valid, message, normalized value)"""
+        label = label or self.label
+        value = self.normalize(value) if value else ''
+        if not value:
+            return False, f'{label} is required', value
+
+        for rule in self.rules:
+            if rule.fails(value):
+                return False, rule.message.format(field=label, field_lower=label.lower()), value
+
+        words = _word_count(value) if '{words}' in self.success else 0
+        return True, self.success.format(field=label, field_lower=label.lower(), words=words), value
+
+    def to_client(self):
+        """
+        The leading rules the browser can run. Rules after the first
+        server-only one are left out, since the first failure wins.
+        """
+        rules = []
+        for rule in self.rules:
+            spec = rule.to_client()
+            if spec is None:
+                break
+            rules.append(spec)
+        return {
+            'label': self.label,
+            'normalize': CLIENT_NORMALIZERS[self.normalize],
+            'rules': rules,
+            'success': self.success,
+            'complete': len(rules) == len(self.rules),
+        }
+
+
+def _domain(email):
+    return email.rpartition('@')[2]
+
+def _local_part(email):
+    return email.partition('@')[0]
+
+def _strip_lower(value):
+    return value.strip().lower()
+
+def _compact_lower(name):
+    return name.replace(' ', '').lower()
+
+# Several rules look at the same derived part; cache it for the value being checked
+@lru_cache(maxsize=256)
+def _digits(phone):
+    return NON_DIGIT_RE.sub('', phone)
+
+def _word_count(text):
+    return len(text.split())
+
+def _is_repetitive(message):
+    """One word of three or more letters making up over 30% of a longer message"""
+    words = message.lower().split()
+    if len(words) <= 10:
+        return False
+    top = max((seen for word, seen in Counter(words).items() if len(word) > 2), default=0)
+    return top > len(words) * 0.3
+
+def _is_disposable_email(email):
+    return is_disposable_domain(_domain(email))
+
+def _with_scheme(website):
+    website = website.strip()
+    if website and not website.startswith(('http://', 'https://')):
+        website = 'https://' + website
+    return website
+
+@lru_cache(maxsize=256)
+def _host(website):
+    try:
+        return urlparse(website).netloc.lower()
+    except ValueError:
+        return ''
+
+# MinCount counters; words stop splitting once `limit` words are found
+COUNTERS = {
+    'letters': lambda text, limit: sum(c.isalpha() for c in text),
+    'words': lambda text, limit: len(text.split(None, limit - 1)),
+    'distinct': lambda text, limit: len(set(text)),
+}
+
+# Names of the parts and normalizers the browser rules implement
+CLIENT_PARTS = {
+    None: None,
+    str.lower: 'lower',
+    _domain: 'domain',
+    _local_part: 'localPart',
+    _compact_lower: 'compactLower',
+    _digits: 'digits',
+    _host: 'host',
+}
+CLIENT_NORMALIZERS = {
+    str.strip: 'strip',
+    _strip_lower: 'stripLower',
+    _with_scheme: 'withScheme',
+}
+
+FIELD_RULES = {
+    'email': FieldRules('Email', (
+        MaxLength(254, 'Email address is too long'),
+        Matches(EMAIL_RE, 'Please enter a valid email address'),
+        MaxLength(64, 'Email address is too long', part=_local_part),
+        Rejects(EMAIL_DOMAIN_EDGE_RE, 'Invalid domain format'),
+        Contains(('..',), 'Email address contains invalid characters'),
+        OneOf(PLACEHOLDER_DOMAINS, 'Please enter a real email address', part=_domain),
+        Check(_is_disposable_email, 'Please use a permanent email address'),
+    ), '✓ Email format is valid', normalize=_strip_lower),
+    'name': FieldRules('Name', (
+        MinLength(2, '{field} must be at least 2 characters long'),
+        MaxLength(100, '{field} must be less than 100 characters'),
+        Matches(NAME_RE, '{field} can only contain letters, spaces, hyphens, apostrophes, and periods'),
+        MinCount('letters', 2, '{field} must contain at least 2 letters'),
+        OneOf(
+            ('test', 'testing', 'john doe', 'jane doe', 'test user', 'asdf', 'qwerty', 'admin'),
+            'Please enter your real {field_lower}',
+        ),
+        MinCount('distinct', 3, 'Please enter a valid {field_lower}', part=_compact_lower),
+    ), '✓ {field} looks good!'),
+    'username': FieldRules('Username', (
+        MinLength(3, 'Username must be at least 3 characters long'),
+        MaxLength(30, 'Username must be less than 30 characters'),
+        Matches(USERNAME_RE, 'Username can only contain letters, numbers, dots, hyphens, and underscores'),
+        OneOf((
+            'admin', 'root', 'user', 'test', 'guest', 'administrator', 'api', 'www',
+            'mail', 'email', 'support', 'help', 'info', 'contact', 'service',
+            'system', 'null', 'undefined', 'none', 'delete', 'remove',
+        ), 'This username is reserved. Please choose another one'),
+        Contains(
+            ('admin', 'moderator', 'staff', 'official', 'spam', 'fake', 'scam', 'phishing'),
+            'Please choose a different username',
+        ),
+    ), '✓ Username is valid'),
+    'subject': FieldRules('Subject', (
+        MinLength(5, 'Subject must be at least 5 characters'),
+        MaxLength(200, 'Subject must be less than 200 characters'),
+        Rejects(UNSPACED_SUBJECT_RE, 'Subject should contain spaces between words'),
+        Scan('subject_spam', 'Subject appears to be spam. Please use a professional subject line'),
+        MinCount('words', 2, 'Subject should contain at least 2 words'),
+    ), '✓ Subject looks good! ({words} words)'),
+    'message': FieldRules('Message', (
+        MinLength(10, 'Message must be at least 10 characters'),
+        MaxLength(2000, 'Message must be less than 2000 characters'),
+        MinCount('words', 3, 'Message should contain at least 3 words'),
+        Rejects(LINK_RE, 'Message contains too many links', allowed=3),
+        Check(_is_repetitive, 'Message contains excessive repetition', client='repetitive'),
+        Scan('message_spam', 'Message appears to be spam', allowed=2),
+    ), '✓ Message looks good! ({words} words)'),
+    'phone_number': FieldRules('Phone number', (
+        Matches(PHONE_RE, 'Please enter a valid phone number (e.g., +1-234-567-8900)'),
+        MinLength(10, 'Phone number must contain at least 10 digits', part=_digits),
+        MaxLength(15, 'Phone number is too long (max 15 digits)', part=_digits),
+        OneOf(
+            ('0000000000', '1111111111', '1234567890', '9999999999', '5555555555'),
+            'Please enter a valid phone number',
+            part=_digits,
+        ),
+        MinCount('distinct', 4, 'Please enter a valid phone number', part=_digits),
+    ), '✓ Phone number format is valid'),
+    'website': FieldRules('Website URL', (
+        MinLength(1, 'Please enter a valid website URL', part=_host),
+        Matches(HAS_DOT_RE, 'Please enter a complete domain name', part=_host),
+        Rejects(EMPTY_LABEL_RE, 'Invalid domain format', part=_host),
+        Contains(('bit.ly', 'tinyurl', 'localhost', '127.0.0.1'), 'Please enter a proper website URL', part=_host),
+        Contains(('example.com',), 'Please enter your actual website URL', part=_host),
+    ), '✓ Website URL looks good!', normalize=_with_scheme),
+    'location': FieldRules('Location', (
+        MinLength(2, 'Location must be at least 2 characters'),
+        MaxLength(100, 'Location must be less than 100 characters'),
+        Matches(LOCATION_RE, 'Location can only contain letters, spaces, commas, hyphens, apostrophes, and periods'),
+        Rejects(PUNCTUATION_ONLY_RE, 'Please enter a valid location'),
+        OneOf(
+            ('test', 'testing', 'xyz', 'abc', 'none', 'n/a', 'unknown', 'nowhere'),
+            'Please enter a valid location',
+        ),
+        MinCount('letters', 2, 'Location must contain at least 2 letters'),
+    ), '✓ Location looks good!'),
+}
+
+
+def client_rules():
+    """Every field's rules as run in the browser (see core.batch_validation)"""
+    return {field: field_rules.to_client() for field, field_rules in FIELD_RULES.items()}
+
+def _cached_result(field, value, label):
+    """(is_valid, message), memoized per field, label and value"""
+    field_rules = FIELD_RULES[field]
+    return get_validation_cache().get_or_compute(
+        field, label, value or '', lambda: field_rules.validate(value, label)[:2]
+    )
+
+def validate(field, value, label=None):
+    """(is_valid, message) for a value under a field's rules"""
+    return _cached_result(field, value, label)
+
+def clean_field(field, value, label=None):
+    """
+    Form clean_* helper: empty values pass through for the field's own
+    required check; anything else is normalized or raises ValidationError.
+    """
+    if not value:
+        return value
+    is_valid, message = _cached_result(field, value, label)
+    if not is_valid:
+        raise ValidationError(message)
+    return FIELD_RULES[field].normalize(value)
@@ -0,0 +1,79 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import availability
+from .conditional import bump_contact_data_version
+from .fingerprint import remember
+from .history import record_contacts as record_email_history, record_deleted
+from .models import Contact, ContactChange, NewsletterSubscription
+from .rollups import record_created
+
+
+@receiver(post_save, sender=Contact)
+def update_contact_rollups(sender, instance, created, **kwargs):
+    """
+    Keep rollups, email history, the duplicate index and the change feed
+    current as contacts are created (resolutions are recorded by
+    Contact.mark_resolved). The table writes share the contact's
+    transaction; the in-process duplicate index is only told once it commits.
+    """
+    if created:
+        record_created(instance)
+        record_email_history([instance])
+        ContactChange.objects.create(contact_id=instance.id, action='created')
+        transaction.on_commit(partial(remember, instance))
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def advance_contact_data_version(sender, **kwargs):
+    """
+    Invalidate ETags of contact-backed views on any Contact write, once it
+    commits: a bump before commit lets a poll cache the old rows under the
+    new version, and a rolled-back write should not invalidate anything
+    """
+    transaction.on_commit(bump_contact_data_version)
+
+
+@receiver(post_delete, sender=Contact)
+def release_open_email_history(sender, instance, **kwargs):
+    """Deleted open contacts stop counting as open for their sender"""
+    record_deleted(instance)
+
+
+# Availability filters named after the User field they hold
+ACCOUNT_FILTER_FIELDS = ('username', 'email')
+
+
+@receiver(post_init, sender=User)
+def note_account_names(sender, instance, **kwargs):
+    """Keep the loaded username and email so saves can tell whether they changed"""
+    # __dict__, not getattr: a deferred field would cost a query per instance
+    instance._saved_account_names = {field: instance.__dict__.get(field) for field in ACCOUNT_FILTER_FIELDS}
+
+
+@receiver(post_save, sender=User)
+def remember_taken_account(sender, instance, created, update_fields=None, **kwargs):
+    """
+    New or changed usernames and emails become possible hits in the
+    availability filters. Other saves, such as the last_login update on
+    every login, publish nothing.
+    """
+    saved = getattr(instance, '_saved_account_names', {})
+    for field in ACCOUNT_FILTER_FIELDS:
+        if update_fields is not None and field not in update_fields:
+            continue
+        value = getattr(instance, field)
+        if created or value != saved.get(field):
+            transaction.on_commit(partial(availability.remember, field, value))
+            saved[field] = value
+
+
+@receiver(post_save, sender=NewsletterSubscription)
+def remember_subscribed_email(sender, instance, **kwargs):
+    if instance.is_active:
+        transaction.on_commit(partial(availability.remember, 'newsletter', instance.email))
@@ -0,0 +1,26 @@
+from django import template
+
+register = template.Library()
+
+@register.filter
+def get_item(mapping, key):
+    """Look up a dictionary value by a variable key"""
+    if not mapping:
+        return None
+    return mapping.get(key)
+
+@register.filter
+def duration_display(value):
+    """Render a timedelta compactly, e.g. '3h 20m' or '2d 4h'"""
+    if value is None:
+        return '—'
+
+    seconds = int(value.total_seconds())
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes = seconds // 60
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
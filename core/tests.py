@@ -1,3 +1,1182 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib
+import io
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.template.loader import render_to_string
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import async_views
+from .async_db import run_read
+from .availability import FILTER_SOURCES, AvailabilityFilter, BloomFilter
+from .batch_validation import client_validation_config, client_validation_script
+from .batching import WriteBatcher, WritePending, save_instance
+from .blocklist import HEADER, DomainBlocklist, buffer_contains
+from .conditional import get_contact_data_version
+from .consumers import MAX_PENDING_CHECKS, ValidationConsumer
+from .exports import aiter_chunks, iter_csv
+from .facets import compute_contact_facets
+from .fingerprint import FingerprintIndex, message_fingerprint
+from .forms import ContactForm
+from .history import rebuild_email_history
+from .idempotency import PENDING, submission_keys
+from .models import ArchivedContact, Contact, ContactChange, ContactRollup, EmailHistory, NewsletterSubscription
+from .patterns import MultiPatternMatcher, scan_text
+from .rollups import rebuild_rollups
+from .routers import REPLICA_ALIAS, begin_request, end_request, get_routing_state, on_replica
+from .rules import FIELD_RULES, Rule, clean_field, validate
+from .utils import VALIDATION_TEMPLATES, contact_list_queryset, render_validation_html
+from .validation_cache import ValidationCache
+
+
+IMPORT_FIELDS = ['name', 'email', 'subject', 'category', 'message', 'created_at', 'is_resolved', 'resolved_at']
+IMPORT_ROWS = [
+    ['Maria Lopez', 'Maria.Lopez@company.org', 'Question about my order', 'support',
+     'Hello, I would like to know when my order will ship.', '', '', ''],
+    ['J', 'short.name@company.org', 'Question about my order', 'support',
+     'Hello, I would like to know when my order will ship.', '', '', ''],
+    ['Omar Haddad', 'omar.haddad@company.org', 'Feedback on the new dashboard', 'feedback',
+     'The new dashboard loads much faster, thank you for the update.',
+     '2026-03-02T09:30:00+00:00', 'yes', '2026-03-03T10:00:00+00:00'],
+]
+
+
+def contacts_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(IMPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def import_contacts_file(test, filename, content, *args):
+    """Import content from a temporary file; returns (stdout, stderr, notification mock)"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    path = Path(directory.name) / filename
+    path.write_text(content, encoding='utf-8')
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with mock.patch('core.management.commands.import_contacts.notify_contacts_imported') as notify:
+        call_command('import_contacts', str(path), *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue(), notify
+
+
+class ImportContactsTests(TestCase):
+    """Valid rows are inserted chunk by chunk, bad rows reported, and one notification sent"""
+
+    def test_csv_rows_are_inserted_in_chunks(self):
+        with mock.patch.object(Contact.objects, 'bulk_create', wraps=Contact.objects.bulk_create) as bulk_create:
+            stdout, stderr, notify = import_contacts_file(
+                self, 'contacts.csv', contacts_csv(IMPORT_ROWS), '--chunk-size', '1',
+            )
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [1, 1])
+        self.assertIn('Row 3 skipped', stderr)
+        self.assertIn('Imported 2 contacts (1 skipped)', stdout)
+        notify.assert_called_once_with(2, 1, source=mock.ANY)
+
+        resolved = Contact.objects.get(email='omar.haddad@company.org')
+        self.assertTrue(resolved.is_resolved)
+        self.assertEqual(resolved.resolved_at.isoformat(), '2026-03-03T10:00:00+00:00')
+        self.assertEqual(Contact.objects.get(name='Maria Lopez').email, 'maria.lopez@company.org')
+
+    def test_jsonl_dry_run_reports_bad_lines(self):
+        lines = [json.dumps(dict(zip(IMPORT_FIELDS, IMPORT_ROWS[0]))), '{"name": ', '["not", "an", "object"]']
+        stdout, stderr, notify = import_contacts_file(self, 'contacts.jsonl', '\n'.join(lines) + '\n', '--dry-run')
+        self.assertEqual(Contact.objects.count(), 0)
+        self.assertIn('Row 2 skipped: invalid JSON', stderr)
+        self.assertIn('Row 3 skipped: not an object', stderr)
+        self.assertIn('Validated 1 contacts (2 skipped)', stdout)
+        notify.assert_not_called()
+
+
+def make_contact(**fields):
+    values = {
+        'name': 'Jane Doe',
+        'email': 'jane.doe@company.org',
+        'subject': 'Question about my order',
+        'message': 'Hello, I would like to know when my order will ship.',
+    }
+    values.update(fields)
+    return Contact.objects.create(**values)
+
+
+class ContactRollupTests(TestCase):
+    """Rollups kept current on write match a rebuild from the contacts"""
+
+    def rollup_rows(self):
+        return sorted(ContactRollup.objects.values_list(
+            'granularity', 'bucket', 'category', 'created_count', 'resolved_count', 'resolve_seconds_total',
+        ))
+
+    def test_incremental_rollups_match_rebuild(self):
+        make_contact(category='support')
+        make_contact(category='support', email='other@company.org')
+        make_contact(category='feedback').mark_resolved()
+
+        incremental = self.rollup_rows()
+        self.assertTrue(incremental)
+        rebuild_rollups()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_imported_contacts_match_rebuild(self):
+        import_contacts_file(self, 'contacts.csv', contacts_csv(IMPORT_ROWS), '--chunk-size', '1')
+        incremental = self.rollup_rows()
+        self.assertEqual(sum(row[3] for row in incremental if row[0] == 'day'), 2)
+        rebuild_rollups()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+
+SPAM_MESSAGE = (
+    'Congratulations, you have been selected for an exclusive offer on premium '
+    'watches, reply today with your shipping address to claim the discount'
+)
+
+
+class FingerprintTests(SimpleTestCase):
+    """Near-duplicate messages share most fingerprint bits; unrelated ones do not"""
+
+    def test_index_finds_near_duplicate(self):
+        index = FingerprintIndex(timedelta(hours=1), max_distance=7)
+        index.add(message_fingerprint(SPAM_MESSAGE), 1)
+        near = SPAM_MESSAGE.replace('today', 'now')
+        unrelated = 'Hello, I would like to know when my order will ship to my new address please.'
+        self.assertEqual(index.find_near(message_fingerprint(near)), 1)
+        self.assertIsNone(index.find_near(message_fingerprint(unrelated)))
+
+    def test_short_messages_have_no_fingerprint(self):
+        self.assertIsNone(message_fingerprint('Hello there, thanks'))
+
+    def test_backfill_migration_matches_live_fingerprint(self):
+        migration = importlib.import_module('core.migrations.0005_contact_fingerprint')
+        for message in (SPAM_MESSAGE, SPAM_MESSAGE.upper(), 'short one', 'Ünïcödé wörds ' * 8):
+            with self.subTest(message=message):
+                self.assertEqual(migration.message_fingerprint(message), message_fingerprint(message))
+
+
+ORDER_MESSAGE = 'Hello, I would like to know the status of my order number 10234, it has not arrived yet and I am worried.'
+
+
+@override_settings(CONTACT_DUPLICATE_ACTION='resolve')
+class DuplicateContactTests(TestCase):
+    """Only repeats from the same sender, or identical messages from anyone, are stored as resolved"""
+
+    def setUp(self):
+        patcher = mock.patch('core.fingerprint._index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, email, message):
+        form = ContactForm(data={
+            'name': 'Maria Lopez', 'email': email, 'subject': 'Question about my order',
+            'category': 'support', 'message': message,
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            return form.save()
+
+    def test_similar_messages_from_different_senders_are_kept(self):
+        self.submit('jane.doe@company.org', ORDER_MESSAGE)
+        other = self.submit('omar.haddad@company.org', ORDER_MESSAGE.replace('10234', '55817'))
+        self.assertFalse(other.is_resolved)
+
+    def test_similar_message_from_same_sender_is_resolved(self):
+        first = self.submit('jane.doe@company.org', ORDER_MESSAGE)
+        again = self.submit('Jane.Doe@company.org', ORDER_MESSAGE.replace('worried', 'concerned'))
+        self.assertTrue(again.is_resolved)
+        self.assertNotEqual(again.id, first.id)
+
+    def test_identical_message_from_another_sender_is_resolved(self):
+        self.submit('jane.doe@company.org', ORDER_MESSAGE)
+        self.assertTrue(self.submit('omar.haddad@company.org', ORDER_MESSAGE).is_resolved)
+
+    @override_settings(CONTACT_DUPLICATE_ACTION='allow')
+    def test_allow_skips_the_check(self):
+        self.submit('jane.doe@company.org', ORDER_MESSAGE)
+        self.assertFalse(self.submit('jane.doe@company.org', ORDER_MESSAGE).is_resolved)
+
+
+def make_old_resolved_contact(days, stamped=True, **fields):
+    """A contact resolved days ago; unstamped ones lack resolved_at like rows resolved by the old admin action"""
+    contact = make_contact(**fields)
+    then = timezone.now() - timedelta(days=days)
+    Contact.objects.filter(id=contact.id).update(
+        created_at=then, is_resolved=True, resolved_at=then if stamped else None,
+    )
+    return Contact.objects.get(id=contact.id)
+
+
+def archive_contacts(*args):
+    stdout = io.StringIO()
+    call_command('archive_contacts', '--days', '90', *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+class ArchiveContactsTests(TestCase):
+    """Old resolved contacts move into the compressed archive, chunk by chunk"""
+
+    def test_message_compression_round_trip(self):
+        for message, marker in (('Short note', b'r'), ('Please ship my order soon. ' * 20, b'z'), ('Ünïcödé wörds ' * 30, b'z')):
+            with self.subTest(message=message[:20]):
+                data = ArchivedContact.compress_message(message)
+                self.assertEqual(data[:1], marker)
+                self.assertEqual(ArchivedContact.decompress_message(memoryview(data)), message)
+
+    def test_old_resolved_contacts_are_moved_in_chunks(self):
+        old = make_old_resolved_contact(120, email='old@company.org', message='Please ship my order soon. ' * 20)
+        unstamped = make_old_resolved_contact(120, stamped=False, email='unstamped@company.org')
+        recent_unstamped = make_old_resolved_contact(5, stamped=False, email='recent@company.org')
+        still_open = make_contact(email='open@company.org')
+
+        output = archive_contacts('--chunk-size', '1')
+        self.assertIn('  1 archived', output)
+        self.assertIn('  2 archived', output)
+        self.assertEqual(sorted(ArchivedContact.objects.values_list('id', flat=True)), [old.id, unstamped.id])
+        self.assertEqual(sorted(Contact.objects.values_list('id', flat=True)), [recent_unstamped.id, still_open.id])
+
+        archived = ArchivedContact.objects.get(id=old.id)
+        self.assertEqual((archived.email, archived.message, archived.resolved_at), (old.email, old.message, old.resolved_at))
+        self.assertIsNone(ArchivedContact.objects.get(id=unstamped.id).resolved_at)
+
+    def test_dry_run_only_counts(self):
+        make_old_resolved_contact(120)
+        make_old_resolved_contact(120, stamped=False)
+        self.assertIn('2 contacts would be archived', archive_contacts('--dry-run'))
+        self.assertEqual(Contact.objects.count(), 2)
+        self.assertFalse(ArchivedContact.objects.exists())
+
+    def test_archiving_keeps_rollups(self):
+        make_old_resolved_contact(120, category='support')
+        make_old_resolved_contact(100, category='feedback')
+        make_contact(category='support')
+        rebuild_rollups()
+        before = sorted(ContactRollup.objects.values_list('granularity', 'bucket', 'category', 'created_count', 'resolved_count'))
+
+        archive_contacts()
+        self.assertEqual(ArchivedContact.objects.count(), 2)
+        after = sorted(ContactRollup.objects.values_list('granularity', 'bucket', 'category', 'created_count', 'resolved_count'))
+        self.assertEqual(after, before)
+        rebuild_rollups()
+        self.assertEqual(
+            sorted(ContactRollup.objects.values_list('granularity', 'bucket', 'category', 'created_count', 'resolved_count')),
+            before,
+        )
+
+
+class ContactChangeFeedTests(TestCase):
+    """Pages of the change feed resume from their cursor without gaps or repeats"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staffer', 'staff@company.org', 'x-9Hq!w2Zr', is_staff=True)
+
+    def test_cursor_pages_cover_every_change(self):
+        first = make_contact(email='first@company.org')
+        make_contact(email='second@company.org')
+        first.mark_resolved()
+        self.client.force_login(self.staff)
+
+        seen, after = [], 0
+        while True:
+            page = self.client.get('/api/contacts/changes/', {'after': after, 'limit': 2}).json()
+            seen += [(change['action'], change['contact']['email']) for change in page['changes']]
+            after = page['next_cursor']
+            if not page['has_more']:
+                break
+        self.assertEqual(seen, [
+            ('created', 'first@company.org'),
+            ('created', 'second@company.org'),
+            ('resolved', 'first@company.org'),
+        ])
+
+    def test_imported_contacts_are_in_the_feed(self):
+        import_contacts_file(self, 'contacts.csv', contacts_csv(IMPORT_ROWS), '--chunk-size', '1')
+        self.assertEqual(
+            sorted(ContactChange.objects.values_list('contact_id', 'action')),
+            sorted((contact_id, 'created') for contact_id in Contact.objects.values_list('id', flat=True)),
+        )
+
+    def test_archived_contacts_stay_in_the_feed(self):
+        contact = make_old_resolved_contact(120, email='archived@company.org')
+        changes = ContactChange.objects.count()
+        archive_contacts()
+        # Deleting the live rows must not add feed entries; the archive answers for them
+        self.assertEqual(ContactChange.objects.count(), changes)
+        self.client.force_login(self.staff)
+        page = self.client.get('/api/contacts/changes/', {'after': 0}).json()
+        self.assertEqual([change['contact']['email'] for change in page['changes']], [contact.email])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite performance profile')
+class SQLiteProfileTests(TransactionTestCase):
+    """New connections get the profile's pragmas and maintenance runs against them"""
+
+    def file_database(self):
+        """A connection like the default one but to a file; in-memory test databases cannot use WAL"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': str(Path(directory.name) / 'profile.sqlite3')}, alias='profile',
+        )
+        self.addCleanup(database.close)
+        return database
+
+    @skipUnless('journal_mode=WAL' in settings.SQLITE_PRAGMAS, 'SQLITE_PERFORMANCE_PROFILE is off')
+    def test_pragmas_applied_on_connect(self):
+        with self.file_database().cursor() as cursor:
+            for pragma, expected in (('journal_mode', 'wal'), ('synchronous', 1), ('foreign_keys', 1), ('temp_store', 2)):
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
+
+    def test_maintenance_runs_on_test_database(self):
+        stdout = io.StringIO()
+        call_command('sqlite_maintenance', stdout=stdout)
+        self.assertIn('analyze', stdout.getvalue())
+        self.assertIn('SQLite maintenance done', stdout.getvalue())
+
+    @skipUnless('journal_mode=WAL' in settings.SQLITE_PRAGMAS, 'SQLITE_PERFORMANCE_PROFILE is off')
+    def test_maintenance_checkpoints_wal(self):
+        database = self.file_database()
+        with database.cursor() as cursor:
+            cursor.execute('CREATE TABLE notes (body TEXT)')
+            cursor.execute("INSERT INTO notes VALUES ('kept')")
+        stdout = io.StringIO()
+        with mock.patch('core.management.commands.sqlite_maintenance.connections', {'profile': database}):
+            call_command('sqlite_maintenance', '--database', 'profile', stdout=stdout)
+        self.assertIn('checkpoint', stdout.getvalue())
+        self.assertIn('SQLite maintenance done (wal journal', stdout.getvalue())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plan text is SQLite specific')
+class ContactListQueryPlanTests(TestCase):
+    """List pages must be answered from the covering indexes alone"""
+
+    def assertCoveredBy(self, queryset, index_name):
+        page = queryset[20:30]
+        plan = page.explain()
+        self.assertIn(f'USING COVERING INDEX {index_name}', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_projection_skips_message_and_joins(self):
+        sql = str(contact_list_queryset().query)
+        self.assertNotIn('"message"', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_unfiltered_list_uses_recent_cover(self):
+        self.assertCoveredBy(contact_list_queryset(), 'core_contact_recent_cover')
+
+    def test_status_filters_use_list_cover(self):
+        for status in ('pending', 'resolved'):
+            with self.subTest(status=status):
+                self.assertCoveredBy(contact_list_queryset(status=status), 'core_contact_list_cover')
+
+    def test_archived_list_uses_archive_cover(self):
+        self.assertCoveredBy(contact_list_queryset(archived=True), 'core_archived_list_cover')
+
+
+class EmailHistoryTests(TestCase):
+    """Per-sender history kept current on write matches a rebuild"""
+
+    def history_rows(self):
+        return sorted(EmailHistory.objects.values_list('email', 'first_seen', 'last_seen', 'contact_count', 'open_count'))
+
+    def test_incremental_history_matches_rebuild(self):
+        make_contact(email='Repeat@Company.org')
+        make_contact(email='repeat@company.org').mark_resolved()
+        make_contact(email='once@company.org')
+
+        incremental = self.history_rows()
+        self.assertEqual([row[0] for row in incremental], ['once@company.org', 'repeat@company.org'])
+        self.assertEqual(incremental[1][3:], (2, 1))
+        rebuild_email_history()
+        self.assertEqual(self.history_rows(), incremental)
+
+    def test_imported_contacts_match_rebuild(self):
+        import_contacts_file(self, 'contacts.csv', contacts_csv(IMPORT_ROWS + [IMPORT_ROWS[0]]), '--chunk-size', '2')
+        incremental = self.history_rows()
+        self.assertEqual([row[3:] for row in incremental], [(2, 2), (1, 0)])
+        rebuild_email_history()
+        self.assertEqual(self.history_rows(), incremental)
+
+    def test_archiving_keeps_history(self):
+        make_old_resolved_contact(120, email='archived@company.org')
+        make_contact(email='archived@company.org')
+        rebuild_email_history()
+        before = self.history_rows()
+        archive_contacts()
+        self.assertEqual(self.history_rows(), before)
+        rebuild_email_history()
+        self.assertEqual(self.history_rows(), before)
+
+
+class IdempotentSubmissionTests(TestCase):
+    """Re-posting a contact form answers with the original instead of saving again"""
+
+    form = {
+        'name': 'Maria Lopez',
+        'email': 'maria.lopez@company.org',
+        'subject': 'Question about my order',
+        'category': 'support',
+        'message': 'Hello, I would like to know when my order will ship.',
+        'idempotency_key': 'a1b2c3',
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_post_creates_one_contact(self):
+        first = self.client.post('/contact/', self.form, headers={'hx-request': 'true'})
+        second = self.client.post('/contact/', self.form, headers={'hx-request': 'true'})
+        self.assertEqual(Contact.objects.count(), 1)
+        reference = f'#{Contact.objects.get().id}'
+        self.assertContains(first, reference)
+        self.assertContains(second, reference)
+
+    def test_same_content_from_new_form_is_suppressed(self):
+        self.client.post('/contact/', self.form)
+        self.client.post('/contact/', {**self.form, 'idempotency_key': 'd4e5f6'})
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_invalid_post_releases_claim(self):
+        self.client.post('/contact/', {**self.form, 'name': 'J'})
+        self.client.post('/contact/', self.form)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_repeat_of_in_flight_submission_is_answered_at_once(self):
+        for key in submission_keys(self.form):
+            cache.add(key, PENDING)
+        with mock.patch('time.sleep') as sleep:
+            response = self.client.post('/contact/', self.form, headers={'hx-request': 'true'})
+        sleep.assert_not_called()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Contact.objects.count(), 0)
+
+
+class RuleEngineTests(SimpleTestCase):
+    """Endpoints and forms get the same verdicts from the shared rules"""
+
+    def test_first_failing_rule_wins(self):
+        self.assertEqual(validate('name', 'J'), (False, 'Name must be at least 2 characters long'))
+        self.assertEqual(
+            validate('name', 'J0', label='First name'),
+            (False, 'First name can only contain letters, spaces, hyphens, apostrophes, and periods'),
+        )
+
+    def test_success_message_and_normalization(self):
+        self.assertEqual(validate('subject', '  Question about my order '), (True, '✓ Subject looks good! (4 words)'))
+        self.assertEqual(clean_field('email', ' Jane@Company.ORG '), 'jane@company.org')
+
+    def test_clean_field_raises_the_endpoint_message(self):
+        with self.assertRaisesMessage(ValidationError, validate('username', 'admin')[1]):
+            clean_field('username', 'admin')
+        self.assertEqual(clean_field('username', ''), '')
+
+    def test_placeholder_domains_are_rejected(self):
+        self.assertFalse(validate('email', 'jane@example.com')[0])
+        self.assertTrue(validate('email', 'jane@company.org')[0])
+
+    def test_rule_without_fails_cannot_be_built(self):
+        class Unfinished(Rule):
+            __slots__ = ()
+
+        with self.assertRaises(TypeError):
+            Unfinished('message')
+
+
+class ValidationFragmentTests(SimpleTestCase):
+    """Pre-rendered fragments must equal the partials rendered by the template engine"""
+
+    def test_fragments_match_templates(self):
+        message = 'Previous message from <this email> is "still" open & unread'
+        for template_type, template in VALIDATION_TEMPLATES.items():
+            with self.subTest(template_type=template_type):
+                self.assertEqual(
+                    render_validation_html(template_type, message),
+                    render_to_string(template, {'message': message}),
+                )
+
+
+class PatternMatcherTests(SimpleTestCase):
+    """One pass over the text finds every pattern, including overlapping and nested ones"""
+
+    def test_matches_a_substring_search_per_pattern(self):
+        matcher = MultiPatternMatcher(
+            words=('free', 'freedom', 'dom', 'edo'), symbols=('$$$', '(a|b)', 'a.b'), shared=('dom',),
+        )
+        texts = ['Freedom!', 'free domain', 'x$$$$y', 'see (A|B) and a.b', 'axb', 'fre', '']
+        for text in texts:
+            with self.subTest(text=text):
+                expected = {p for patterns in matcher.lists.values() for p in patterns if p in text.lower()}
+                self.assertEqual(set(matcher.find(text)), expected)
+
+    def test_scan_reports_each_list(self):
+        self.assertEqual(
+            scan_text('URGENT: you are a Winner, click here'),
+            {'subject_spam': ('urgent', 'winner', 'click here'), 'message_spam': ('winner', 'click here')},
+        )
+        self.assertEqual(scan_text('<img onerror=alert(1)>'), {'injection': ('onerror=', 'alert(')})
+
+
+class ValidationCacheTests(SimpleTestCase):
+
+    def test_hits_evictions_and_expiry(self):
+        validation_cache = ValidationCache(maxsize=2, ttl=60)
+        calls = []
+
+        def compute(value):
+            calls.append(value)
+            return value.upper()
+
+        for value in ('a', 'a', 'b', 'c', 'a'):
+            validation_cache.get_or_compute('name', None, value, lambda: compute(value))
+        self.assertEqual(calls, ['a', 'b', 'c', 'a'])
+        self.assertEqual(validation_cache.stats()['evictions'], 2)
+
+        with mock.patch('core.validation_cache.time.monotonic', return_value=10 ** 9):
+            self.assertEqual(validation_cache.get_or_compute('name', None, 'a', lambda: compute('a')), 'A')
+        self.assertEqual(validation_cache.stats()['expired'], 1)
+
+    def test_label_is_part_of_the_key(self):
+        validation_cache = ValidationCache()
+        first = validation_cache.get_or_compute('name', 'First name', 'J', lambda: 'first')
+        last = validation_cache.get_or_compute('name', 'Last name', 'J', lambda: 'last')
+        self.assertEqual((first, last), ('first', 'last'))
+
+
+@override_settings(ASYNC_DB_READ_THREADS=2)
+class AsyncReadViewTests(TransactionTestCase):
+    """The async views read through the pool, and pool jobs give their connections back"""
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staffer', 'staff@company.org', 'x-9Hq!w2Zr', is_staff=True)
+        make_contact(name='Olivia Open', category='support')
+        make_contact(name='Derek Done', is_resolved=True)
+
+    def get(self, view, path, **params):
+        request = AsyncRequestFactory().get(path, params)
+        request.user = self.staff
+
+        async def auser():
+            return self.staff
+        request.auser = auser
+        return asyncio.run(view(request))
+
+    def test_contact_list(self):
+        response = self.get(async_views.contact_list_view, '/contacts/', status='pending')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Olivia Open')
+        self.assertNotContains(response, 'Derek Done')
+
+    def test_pending_count(self):
+        response = self.get(async_views.api_pending_contacts_count, '/api/pending-contacts-count/')
+        self.assertEqual(json.loads(response.content), {'pending_count': 1, 'total_count': 2})
+
+    def test_home(self):
+        self.assertEqual(self.get(async_views.home, '/').status_code, 200)
+
+    def test_pool_job_closes_its_connections(self):
+        used = []
+
+        def count_contacts():
+            used.append(connections['default'])
+            return Contact.objects.count()
+
+        with mock.patch.object(DatabaseWrapper, 'close', autospec=True) as close:
+            self.assertEqual(asyncio.run(run_read(count_contacts)), 2)
+        close.assert_called_once_with(used[0])
+
+
+class ContactExportStreamingTests(TestCase):
+    """Exports must reach ASGI clients chunk by chunk, not buffered whole"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staffer', 'staff@company.org', 'x-9Hq!w2Zr', is_staff=True)
+        for i in range(3):
+            make_contact(email=f'sender{i}@company.org')
+
+    async def test_asgi_export_uses_async_iterator(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get('/contacts/export/', {'format': 'jsonl'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 3)
+
+    async def test_chunks_are_pulled_one_batch_at_a_time(self):
+        pulled = []
+
+        def source():
+            for i in range(5):
+                pulled.append(i)
+                yield b'x'
+
+        stream = aiter_chunks(source(), batch_size=2)
+        self.assertEqual(await anext(stream), b'xx')
+        self.assertEqual(pulled, [0, 1])
+        self.assertEqual([chunk async for chunk in stream], [b'xx', b'x'])
+
+    def test_csv_cells_cannot_start_formulas(self):
+        row = (7, '=HYPERLINK("http://evil.test")', 'jane@company.org', '-2+3', 'general', '@SUM(A1)', None, False, None)
+        header, written = csv.reader(iter_csv([row]))
+        self.assertEqual(
+            written[:6],
+            ['7', '\'=HYPERLINK("http://evil.test")', 'jane@company.org', "'-2+3", 'general', "'@SUM(A1)"],
+        )
+
+
+class ContactDataVersionTests(TestCase):
+    """The ETag version advances only once a Contact write has committed"""
+
+    def test_version_advances_on_commit(self):
+        before = get_contact_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_contact()
+            self.assertEqual(get_contact_data_version(), before)
+        self.assertGreater(get_contact_data_version(), before)
+
+    def test_rolled_back_write_keeps_version(self):
+        before = get_contact_data_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    make_contact()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_contact_data_version(), before)
+
+
+class FakeInstance:
+    """Stands in for a model instance; save() can be held back or made to fail"""
+
+    def __init__(self, pk, release=None, error=None):
+        self.pk = None
+        self._pk = pk
+        self._release = release
+        self._error = error
+
+    def save(self):
+        if self._release:
+            self._release.wait(5)
+        if self._error:
+            raise self._error
+        self.pk = self._pk
+
+
+class WriteBatcherTests(TransactionTestCase):
+    """Group commit keeps rows independent and reports slow commits as pending"""
+
+    def test_failing_row_does_not_sink_batch(self):
+        batcher = WriteBatcher(window=0.05)
+        good = batcher.submit(FakeInstance(1))
+        bad = batcher.submit(FakeInstance(2, error=ValueError('bad row')))
+        self.assertEqual(good.result(timeout=5), 1)
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+
+    def test_timeout_reports_pending_not_failure(self):
+        release = threading.Event()
+        batcher = WriteBatcher(timeout=0.05)
+        with self.assertRaises(WritePending) as raised:
+            batcher.save(FakeInstance(7, release=release))
+        release.set()
+        self.assertEqual(raised.exception.future.result(timeout=5), 7)
+
+    @override_settings(WRITE_BATCHING=True)
+    def test_batched_save_pins_request_to_primary(self):
+        token = begin_request()
+        self.addCleanup(end_request, token)
+        save_instance(NewsletterSubscription(email='reader@company.org'))
+        self.assertTrue(NewsletterSubscription.objects.filter(email='reader@company.org').exists())
+        state = get_routing_state()
+        self.assertTrue(state.pinned)
+        self.assertTrue(state.wrote)
+
+    def test_benchmark_notifies_nobody_and_cleans_up(self):
+        stdout = io.StringIO()
+        with mock.patch('notifications.signals.get_channel_layer') as channel_layer:
+            call_command('benchmark_submissions', '--form', 'contact', '--threads', '2', '--per-thread', '2',
+                         stdout=stdout)
+        self.assertIn('batched', stdout.getvalue())
+        channel_layer.assert_not_called()
+        self.assertFalse(Contact.objects.exists())
+        self.assertFalse(EmailHistory.objects.exists())
+        self.assertFalse(ContactRollup.objects.exists())
+
+
+class ContactSideEffectTests(TestCase):
+    """In-process state only learns about contacts whose transaction committed"""
+
+    def test_duplicate_index_updated_on_commit(self):
+        with mock.patch('core.signals.remember') as remember:
+            with self.captureOnCommitCallbacks() as callbacks:
+                contact = make_contact()
+            remember.assert_not_called()
+            for callback in callbacks:
+                callback()
+        remember.assert_called_once_with(contact)
+
+
+class ContactListETagTests(TransactionTestCase):
+    """A new contact changes the list ETag, and the page under it shows the contact"""
+
+    def setUp(self):
+        staff = User.objects.create_user('staffer', 'staff@company.org', 'x-9Hq!w2Zr', is_staff=True)
+        self.client.force_login(staff)
+        # The tag covers the CSRF cookie, which the first page sets
+        self.client.get('/contacts/')
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get('/contacts/')['ETag']
+        response = self.client.get('/contacts/', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_contact_is_served_under_new_etag(self):
+        etag = self.client.get('/contacts/')['ETag']
+        make_contact(name='Ada Newcomer')
+        response = self.client.get('/contacts/', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Ada Newcomer')
+
+
+@mock.patch('core.routers.replica_configured', return_value=True)
+class ReplicaRoutingTests(TestCase):
+    """Lag-tolerant reads go to the replica; ETag-guarded ones stay on the primary"""
+
+    def setUp(self):
+        # Fixture writes pin this context to the primary; start unpinned like a fresh request
+        token = begin_request()
+        self.addCleanup(end_request, token)
+
+    def test_on_replica_binds_replica_alias(self, replica_configured):
+        self.assertEqual(on_replica(Contact.objects.all()).db, REPLICA_ALIAS)
+
+    def test_contact_list_reads_primary(self, replica_configured):
+        self.assertEqual(contact_list_queryset().db, 'default')
+        self.assertEqual(contact_list_queryset(archived=True).db, 'default')
+
+    def test_facets_read_primary(self, replica_configured):
+        make_contact()
+        self.assertEqual(compute_contact_facets()['pending'], 1)
+
+
+class ContactEmailHistoryTests(TestCase):
+    """Only staff learn that an address has contacted us before"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staffer', 'staff@company.org', 'x-9Hq!w2Zr', is_staff=True)
+        make_contact(email='repeat@company.org')
+
+    def test_anonymous_gets_plain_success(self):
+        response = self.client.post('/validate/email/', {'email': 'Repeat@company.org'})
+        self.assertContains(response, 'Email looks good')
+        self.assertNotContains(response, 'contacted us')
+
+    def test_batch_endpoint_hides_history_from_anonymous(self):
+        response = self.client.post('/validate/batch/', {'validate_form': 'contact', 'email': 'repeat@company.org'})
+        self.assertNotContains(response, 'contacted us')
+
+    def test_staff_see_history(self):
+        self.client.force_login(self.staff)
+        response = self.client.post('/validate/email/', {'email': 'repeat@company.org'})
+        self.assertContains(response, 'This email has contacted us once before')
+
+
+class BatchValidationTests(TestCase):
+    """The batch endpoint checks the fields edited since the last batch and the fields reading them"""
+
+    form = {
+        'validate_form': 'register',
+        'first_name': 'Jane',
+        'username': 'janedoe',
+        'password1': 'x-9Hq!w2Zr',
+        'password2': 'x-9Hq!w2Z',
+    }
+
+    def validate(self, fields=''):
+        response = self.client.post('/validate/batch/', {**self.form, 'validate_fields': fields})
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_only_edited_field_is_validated(self):
+        html = self.validate('first_name')
+        self.assertIn('id="first-name-validation"', html)
+        self.assertNotIn('id="username-validation"', html)
+        self.assertNotIn('id="password-validation"', html)
+
+    def test_dependent_field_is_revalidated(self):
+        html = self.validate('password1')
+        self.assertIn('id="password-validation"', html)
+        self.assertIn('Passwords do not match', html)
+        self.assertNotIn('id="first-name-validation"', html)
+
+    def test_several_edited_fields_in_one_batch(self):
+        html = self.validate('first_name,username')
+        self.assertIn('id="first-name-validation"', html)
+        self.assertIn('id="username-validation"', html)
+        self.assertNotIn('id="password-validation"', html)
+
+    def test_without_edited_fields_every_field_is_validated(self):
+        html = self.validate()
+        for target in ('first-name-validation', 'username-validation', 'password-validation', 'password2-validation'):
+            self.assertIn(f'id="{target}"', html)
+
+    def test_one_trigger_per_form(self):
+        for url in ('/contact/', '/accounts/register/'):
+            with self.subTest(url=url):
+                html = self.client.get(url).content.decode()
+                self.assertEqual(html.count('hx-post="/validate/batch/"'), 1)
+                self.assertIn('from:closest form', html)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ValidationConsumerTests(SimpleTestCase):
+    """One running check per field and a bounded number per connection"""
+
+    def setUp(self):
+        self.started = []
+        self.cancelled = []
+        self.release = asyncio.Event()
+
+    async def fake_run_read(self, func, form_name, field, *args, **kwargs):
+        self.started.append(field)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(field)
+            raise
+        return f'<p>{field}</p>'
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(ValidationConsumer.as_asgi(), '/ws/validation/')
+        communicator.scope['user'] = AnonymousUser()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def send(self, communicator, form, field, seq, value='Jane'):
+        await communicator.send_json_to({'type': 'validate', 'form': form, 'field': field, 'value': value, 'seq': seq})
+        # Let the consumer start the check before the next message
+        await asyncio.sleep(0.01)
+
+    async def test_newer_value_cancels_running_check(self):
+        with mock.patch('core.consumers.run_read', self.fake_run_read):
+            communicator = await self.connect()
+            await self.send(communicator, 'contact', 'name', 1)
+            await self.send(communicator, 'contact', 'name', 2)
+            self.assertEqual(self.cancelled, ['name'])
+            self.release.set()
+            reply = await communicator.receive_json_from()
+            self.assertEqual(reply['seq'], 2)
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+
+    async def test_running_checks_are_capped(self):
+        fields = [('contact', 'name'), ('contact', 'email'), ('contact', 'subject'),
+                  ('contact', 'message'), ('profile', 'website')]
+        with mock.patch('core.consumers.run_read', self.fake_run_read):
+            communicator = await self.connect()
+            for seq, (form, field) in enumerate(fields, 1):
+                await self.send(communicator, form, field, seq)
+            self.assertEqual(len(self.started), MAX_PENDING_CHECKS)
+            await communicator.disconnect()
+
+    async def test_dependent_field_is_revalidated(self):
+        async def run_now(func, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        with mock.patch('core.consumers.run_read', run_now):
+            communicator = await self.connect()
+            await self.send(communicator, 'register', 'password2', 1, value='x-9Hq!w2Zr')
+            self.assertEqual((await communicator.receive_json_from())['field'], 'password2')
+            await self.send(communicator, 'register', 'password1', 2, value='x-9Hq!w2Zq')
+            replies = {}
+            for _ in range(2):
+                reply = await communicator.receive_json_from()
+                replies[reply['field']] = reply
+            self.assertEqual(replies['password2']['seq'], 2)
+            self.assertIn('Passwords do not match', replies['password2']['html'])
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+
+
+class DomainBlocklistTests(SimpleTestCase):
+    """Lookups must terminate and stay correct whatever shape the list file has"""
+
+    def load(self, content, use_mmap=True):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'domains.txt'
+        path.write_bytes(content)
+        return DomainBlocklist(path, use_mmap=use_mmap)
+
+    def assertTerminates(self, func, *args):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func(*args)), daemon=True)
+        thread.start()
+        thread.join(2)
+        self.assertFalse(thread.is_alive(), 'lookup did not terminate')
+        return result[0]
+
+    def test_unterminated_last_line_does_not_hang(self):
+        buffer = HEADER + b'a.example\nm.example'
+        for key, expected in ((b'z.example', False), (b'm.example', True), (b'b.example', False)):
+            with self.subTest(key=key):
+                self.assertIs(self.assertTerminates(buffer_contains, buffer, len(HEADER), key), expected)
+
+    def test_unterminated_headered_file(self):
+        blocklist = self.load(HEADER + b'a.example\nm.example')
+        self.assertIn('m.example', blocklist)
+        self.assertNotIn('z.example', blocklist)
+        self.assertEqual(len(blocklist), 2)
+
+    def test_unsorted_headered_file_is_normalized(self):
+        for use_mmap in (True, False):
+            with self.subTest(use_mmap=use_mmap):
+                blocklist = self.load(HEADER + b'z.example\nA.example\nm.example\n', use_mmap)
+                for domain in ('z.example', 'a.example', 'm.example'):
+                    self.assertIn(domain, blocklist)
+                self.assertEqual(len(blocklist), 3)
+
+    def test_raw_list_and_subdomains(self):
+        blocklist = self.load(b'Mailinator.com\n# comment\n\nyopmail.com  # inline\n')
+        self.assertIn('mailinator.com', blocklist)
+        self.assertIn('inbox.Mailinator.com.', blocklist)
+        self.assertNotIn('mail.com', blocklist)
+        self.assertEqual(len(blocklist), 2)
+
+
+class BloomFilterTests(SimpleTestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'user{i}')
+        self.assertTrue(all(f'user{i}' in bloom for i in range(2000)))
+        false_positives = sum(f'other{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class AvailabilityFilterSyncTests(TestCase):
+    """A filter learns values taken in other processes, including changed rows"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('janedoe', 'jane@company.org', 'x-9Hq!w2Zr')
+
+    def make_filter(self, name='username'):
+        queryset, field = FILTER_SOURCES[name]
+        availability_filter = AvailabilityFilter(name, queryset, field, sync_seconds=0)
+        availability_filter.might_contain('')
+        return availability_filter
+
+    def save_elsewhere(self, instance):
+        """Save as another worker process would, running its on_commit hooks"""
+        with mock.patch('core.availability.PROCESS_ID', 'other-process'):
+            with self.captureOnCommitCallbacks(execute=True):
+                instance.save()
+
+    def test_renamed_user_is_seen(self):
+        usernames = self.make_filter('username')
+        self.user.username = 'jane.renamed'
+        self.save_elsewhere(self.user)
+        self.assertTrue(usernames.might_contain('Jane.Renamed'))
+        self.assertEqual(usernames.rebuilds, 1)
+
+    def test_reactivated_subscription_is_seen(self):
+        subscription = NewsletterSubscription.objects.create(email='reader@company.org', is_active=False)
+        newsletter = self.make_filter('newsletter')
+        self.assertFalse(newsletter.might_contain('reader@company.org'))
+        subscription.is_active = True
+        self.save_elsewhere(subscription)
+        self.assertTrue(newsletter.might_contain('reader@company.org'))
+
+    def test_unchanged_account_publishes_nothing(self):
+        with mock.patch('core.availability.remember') as remember:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.last_login = timezone.now()
+                self.user.save(update_fields=['last_login'])
+                self.user.first_name = 'Jane'
+                self.user.save()
+                User.objects.get(id=self.user.id).save()
+            remember.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.email = 'jane.doe@company.org'
+                self.user.save()
+            remember.assert_called_once_with('email', 'jane.doe@company.org')
+
+    def test_gap_in_log_forces_rebuild(self):
+        usernames = self.make_filter('username')
+        self.user.username = 'jane.renamed'
+        self.save_elsewhere(self.user)
+        cache.delete(usernames._entry_key(usernames._seq + 1))
+        self.assertTrue(usernames.might_contain('jane.renamed'))
+        self.assertEqual(usernames.rebuilds, 2)
+
+
+# Loads the browser rules with a stub window and checks each [form, field, value] from stdin
+NODE_RULES_HARNESS = """
+const window = {};
+new Function('window', 'document', require('fs').readFileSync(process.argv[1], 'utf8'))(window, {});
+const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const results = cases.map(([form, field, value]) => {
+    const result = window.clientValidation.check(form, field, value);
+    return result ? result.html : null;
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+NODE_BATCH_HARNESS = """
+const window = {};
+const shown = {};
+const document = { getElementById: (id) => ({ set innerHTML(html) { shown[id] = html; } }) };
+new Function('window', 'document', require('fs').readFileSync(process.argv[1], 'utf8'))(window, document);
+const v = window.clientValidation;
+const form = { elements: {} };
+for (const name of ['first_name', 'last_name', 'username', 'email', 'password1', 'password2']) {
+    form.elements[name] = { name, value: '', form };
+}
+// Each fire is the trigger's debounce ending; a request is posted when fields are still queued
+const requests = [];
+for (const [step, name, value] of JSON.parse(require('fs').readFileSync(0, 'utf8'))) {
+    if (step === 'input') {
+        form.elements[name].value = value;
+        v.changed('register', form.elements[name]);
+    } else if (step === 'fire' && v.flush('register', form, () => false).queued) {
+        requests.push(v.take(form));
+    } else if (step === 'fail') {
+        v.restore(form, requests[requests.length - 1]);
+    }
+}
+process.stdout.write(JSON.stringify({ requests, shown }));
+"""
+
+
+PARITY_CASES = [
+    ('contact', 'name', ['Jane Doe', "O'Brien-Smith Jr.", 'José', 'Jane\u00a0Doe', 'Jane\tDoe', 'J4ne', 'aa', '\U0001F600\U0001F600']),
+    ('contact', 'email', ['jane@company.org', 'Jane@Company.ORG', 'jane@company.c0m', 'jané@company.org',
+                          'jane@.company.org', 'jane@test.com', 'a' * 65 + '@company.org', 'jane..doe@company.org']),
+    ('contact', 'subject', ['Question about my order', 'Questionaboutmyorderplease', '\U0001F600' * 11,
+                            '\U0001F600' * 21, 'Hola señor', 'FREE MONEY now', 'Hi']),
+    ('contact', 'message', ['Hello, when will my order ship?', 'http http http http here', 'héllo wörld again and again',
+                            'spam ' * 12, 'short']),
+    ('register', 'username', ['janedoe', 'jane.doe_99', 'jäne', 'admin', 'superadmin', 'jo']),
+    ('profile', 'phone_number', ['+1-234-567-8900', '٠١٢٣٤٥٦٧٨٩', '+1\u00a0234 567 8900', '(555) 123.4567',
+                                 '1234567890', '+1 234 567 890 123 45']),
+    ('profile', 'website', ['company.org', 'https://www.company.org/path', 'http://localhost:8000', 'https://exämple.org',
+                            'https://a..org', 'https://nodot']),
+    ('profile', 'location', ['New York, NY', "Val-d'Or", 'Zürich', 'São\u00a0Paulo', '...', 'n/a']),
+]
+
+
+def python_client_result(form_name, field, raw):
+    """What the browser rules should answer for raw: failure or success HTML, or None for the server"""
+    entry = client_validation_config()['forms'][form_name][field]
+    field_rules = FIELD_RULES[entry['rules']]
+    label = entry['label']
+    value = field_rules.normalize(raw)
+    client_count = len(field_rules.to_client()['rules'])
+    for rule in field_rules.rules[:client_count]:
+        if rule.fails(value):
+            return render_validation_html(entry['invalid'], rule.message.format(field=label, field_lower=label.lower()))
+    if entry['server']:
+        return None
+    return render_validation_html('success', validate(entry['rules'], raw, label)[1])
+
+
+@skipUnless(shutil.which('node'), 'node is needed to run the browser rules')
+class ClientBatchTriggerTests(SimpleTestCase):
+    """Keystrokes across a form end in at most one batch request per debounce"""
+
+    def run_steps(self, steps):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        script = Path(directory.name) / 'validation_rules.js'
+        script.write_text(client_validation_script()[0], encoding='utf-8')
+        harness = subprocess.run(
+            ['node', '-e', NODE_BATCH_HARNESS, str(script)],
+            input=json.dumps(steps), capture_output=True, text=True, timeout=30,
+        )
+        self.assertEqual(harness.returncode, 0, harness.stderr)
+        return json.loads(harness.stdout)
+
+    def typing(self, name, text):
+        return [['input', name, text[:end]] for end in range(1, len(text) + 1)]
+
+    def test_keystrokes_across_fields_make_one_request(self):
+        result = self.run_steps(
+            self.typing('first_name', 'Jane') + self.typing('username', 'janedoe')
+            + self.typing('password1', 'x-9Hq!w2Zr') + [['fire']]
+        )
+        self.assertEqual(result['requests'], [['username', 'password1']])
+        self.assertIn('first-name-validation', result['shown'])
+
+    def test_only_fields_edited_since_last_batch_are_sent(self):
+        result = self.run_steps(
+            self.typing('username', 'janedoe') + [['fire'], ['fire']]
+            + self.typing('first_name', 'Janet') + [['fire']]
+            + self.typing('password1', 'x-9Hq!w2Zr') + [['fire']]
+        )
+        self.assertEqual(result['requests'], [['username'], ['password1']])
+
+    def test_failed_request_is_queued_again(self):
+        result = self.run_steps(
+            self.typing('username', 'janedoe') + [['fire'], ['fail']]
+            + self.typing('password1', 'x-9Hq!w2Zr') + [['fire']]
+        )
+        self.assertEqual(result['requests'], [['username'], ['username', 'password1']])
+
+
+class ClientRulesParityTests(SimpleTestCase):
+    """The exported rules must give the same answer in the browser as on the server"""
+
+    def run_browser_rules(self, cases):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        script = Path(directory.name) / 'validation_rules.js'
+        script.write_text(client_validation_script()[0], encoding='utf-8')
+        harness = subprocess.run(
+            ['node', '-e', NODE_RULES_HARNESS, str(script)],
+            input=json.dumps(cases), capture_output=True, text=True, timeout=30,
+        )
+        self.assertEqual(harness.returncode, 0, harness.stderr)
+        return json.loads(harness.stdout)
+
+    def test_browser_and_server_agree(self):
+        cases = [[form_name, field, value] for form_name, field, values in PARITY_CASES for value in values]
+        results = self.run_browser_rules(cases)
+        for (form_name, field, value), browser in zip(cases, results):
+            with self.subTest(form=form_name, field=field, value=value):
+                self.assertEqual(browser, python_client_result(form_name, field, value))
+
+    def test_unicode_digits_and_astral_characters(self):
+        """Cases that differed before the rules ran with re.ASCII and the u flag"""
+        phone, subject = self.run_browser_rules([
+            ['profile', 'phone_number', '٠١٢٣٤٥٦٧٨٩'],
+            ['contact', 'subject', '\U0001F600' * 11],
+        ])
+        self.assertIn('Please enter a valid phone number', phone)
+        self.assertIn('Subject should contain at least 2 words', subject)
+        self.assertFalse(validate('phone_number', '٠١٢٣٤٥٦٧٨٩')[0])
@@ -1,19 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Read-heavy pages are served by their async versions when enabled
+if getattr(settings, 'CORE_ASYNC_VIEWS', False):
+    from . import async_views as read_views
+else:
+    read_views = views
+
 app_name = 'core'
 
 urlpatterns = [
     # Main pages
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('contact/', views.contact_view, name='contact'),
-    path('contacts/', views.contact_list_view, name='contact_list'),
+    path('contacts/', read_views.contact_list_view, name='contact_list'),
+    path('contacts/export/', views.export_contacts_view, name='export_contacts'),
+    path('analytics/', views.analytics_view, name='analytics'),
     path('newsletter/subscribe/', views.newsletter_subscribe, name='newsletter_subscribe'),
 
     # API endpoints
-    path('api/pending-contacts-count/', views.api_pending_contacts_count, name='api_pending_contacts_count'),
+    path('api/pending-contacts-count/', read_views.api_pending_contacts_count, name='api_pending_contacts_count'),
+    path('api/contacts/changes/', views.api_contact_changes, name='api_contact_changes'),
+    path('api/availability-filters/', views.api_availability_filter_stats, name='api_availability_filter_stats'),
+    path('api/validation-cache/', views.api_validation_cache_stats, name='api_validation_cache_stats'),
 
     # Enhanced validation endpoints for contact form
+    path('validate/batch/', views.validate_batch, name='validate_batch'),
+    path('validate/rules.js', views.validation_rules_js, name='validation_rules_js'),
     path('validate/name/', views.validate_name, name='validate_name'),
     path('validate/email/', views.validate_email, name='validate_email'),
     path('validate/subject/', views.validate_subject, name='validate_subject'),
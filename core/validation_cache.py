@@ -0,0 +1,99 @@
+"""
+Bounded memo of pure field validation results.
+
+htmx re-posts identical debounced values (keyup then blur, the batch
+endpoint revalidating untouched fields), and the database-free rules in
+core.rules give the same answer each time. Results are kept in an LRU keyed
+by field, label and a 16-byte digest of the value, so a 2,000-character
+message costs an entry of a few hundred bytes rather than a copy of its
+text. Entries expire after VALIDATION_CACHE_TTL_SECONDS so rule data that
+can change at runtime (the disposable domain blocklist) is picked up.
+Database checks such as availability never go through this cache.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def value_digest(value):
+    return hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ValidationCache:
+    """Thread-safe LRU of validation results with a time-to-live"""
+
+    def __init__(self, maxsize=2048, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, field, label, value, compute):
+        """The cached result for value, calling compute() on a miss"""
+        if self.maxsize <= 0:
+            return compute()
+
+        key = (field, label, value_digest(value))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'expired': self.expired,
+            'evictions': self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_validation_cache():
+    """Process-wide cache configured from settings"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ValidationCache(
+                    maxsize=getattr(settings, 'VALIDATION_CACHE_SIZE', 2048),
+                    ttl=getattr(settings, 'VALIDATION_CACHE_TTL_SECONDS', 60),
+                )
+    return _cache
@@ -3,26 +3,41 @@ import logging
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import etag, require_http_methods
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control, cache_page
 from django.core.exceptions import ValidationError
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
 
+from .batching import WritePending
 from .forms import ContactForm, NewsletterForm
-from .models import Contact, NewsletterSubscription
+from .models import ArchivedContact, Contact, NewsletterSubscription
+from . import utils
 from .utils import (
-    is_htmx_request, validate_email_format, validate_name, 
-    validate_subject, validate_message, validate_newsletter_email,
-    validate_phone_number, validate_website, validate_location,
-    render_validation_response, log_validation_attempt, get_contact_stats
+    is_htmx_request, render_validation_response, log_validation_attempt, get_contact_stats,
+    filter_contacts, contact_list_queryset, safe_int
 )
+from .availability import get_filter_stats
+from .validation_cache import get_validation_cache
+from .batch_validation import check_contact_email, client_validation_script, validate_fields
+from .exports import EXPORT_FORMATS, EXPORT_CONTENT_TYPES, aiter_chunks, stream_contacts
+from .changes import DEFAULT_FEED_LIMIT, get_contact_changes
+from .conditional import contact_data_conditional
+from .facets import get_contact_facets
+from .idempotency import claim_submission
+from .rollups import get_rollup_series
+from .routers import on_replica
 
 logger = logging.getLogger(__name__)
 
+CONTACTS_PER_PAGE = 10
+
 def home(request):
     """Home page with dashboard stats"""
     try:
@@ -43,10 +58,16 @@ def home(request):
 def contact_view(request):
     """Handle contact form submission with improved error handling"""
     if request.method == 'POST':
+        # Re-posts of a submission we already have get the original response
+        claim = claim_submission(request.POST)
+        if claim.is_duplicate:
+            return repeated_submission_response(request, claim)
+
         form = ContactForm(request.POST)
         try:
             if form.is_valid():
                 contact = form.save()
+                claim.complete(contact.id)
                 logger.info(f"New contact created: {contact.id} from {contact.email}")
                 
                 # For HTMX requests, return success partial
@@ -60,13 +81,27 @@ def contact_view(request):
                 )
                 return redirect('core:contact')
             else:
+                claim.release()
                 logger.warning(f"Invalid contact form submission: {form.errors}")
                 # For HTMX requests, return form with errors
                 if is_htmx_request(request):
                     return render(request, 'partials/contact_form.html', {'form': form})
                 # For regular requests, show form with errors
                 messages.error(request, 'Please correct the errors below.')
+        except WritePending as pending:
+            # Queued but not committed yet: keep the claim so a retry cannot duplicate it
+            claim.complete_later(pending.future)
+            logger.warning("Contact submission still queued for commit after the wait")
+            if is_htmx_request(request):
+                return render(request, 'partials/contact_success.html', {'contact': None, 'pending': True})
+            messages.info(
+                request,
+                'Thank you! Your inquiry has been received and is still being saved; it will reach us shortly.',
+                extra_tags='success-notification'
+            )
+            return redirect('core:contact')
         except Exception as e:
+            claim.release()
             logger.error(f"Error processing contact form: {e}")
             if is_htmx_request(request):
                 return render(request, 'partials/contact_form_error.html', {'form': form})
@@ -88,6 +123,32 @@ def contact_view(request):
     }
     return render(request, 'core/contact.html', context)
 
+def repeated_submission_response(request, claim):
+    """Answer a repeated contact submission like the original, without writing"""
+    if claim.in_flight:
+        # The original request is still saving and will answer for itself
+        logger.info("Contact submission repeated while the original is in flight")
+        if is_htmx_request(request):
+            return HttpResponse('Your inquiry is already being processed.', status=409)
+        messages.info(request, 'Your inquiry is already being processed.', extra_tags='success-notification')
+        return redirect('core:contact')
+
+    contact = None
+    if claim.original_id is not None:
+        contact = Contact.objects.filter(pk=claim.original_id).only('id', 'name').first()
+    logger.info(f"Duplicate contact submission suppressed (original: {claim.original_id})")
+
+    if is_htmx_request(request):
+        return render(request, 'partials/contact_success.html', {'contact': contact})
+
+    if contact:
+        messages.success(
+            request, 
+            f'Thank you {contact.name}! Your inquiry has been submitted successfully. Reference ID: #{contact.id}',
+            extra_tags='success-notification'
+        )
+    return redirect('core:contact')
+
 def newsletter_subscribe(request):
     """Handle newsletter subscription with improved validation"""
     if request.method == 'POST':
@@ -120,6 +181,15 @@ def newsletter_subscribe(request):
                 else:
                     messages.error(request, 'Please check your email address and try again.')
                     
+        except WritePending:
+            logger.warning("Newsletter subscription still queued for commit after the wait")
+            if is_htmx_request(request):
+                return render(request, 'partials/newsletter_success.html', {'pending': True})
+            messages.info(
+                request,
+                'Thank you! Your subscription is still being saved and will be active shortly.',
+                extra_tags='success-notification'
+            )
         except Exception as e:
             logger.error(f"Error processing newsletter subscription: {e}")
             if is_htmx_request(request):
@@ -129,6 +199,7 @@ def newsletter_subscribe(request):
     return redirect('core:home')
 
 @login_required
+@contact_data_conditional
 def contact_list_view(request):
     """Display contact list with optimized queries and improved filtering"""
     if not request.user.is_staff:
@@ -138,32 +209,22 @@ def contact_list_view(request):
     try:
         query = request.GET.get('q', '').strip()
         status = request.GET.get('status', '')
+        archived = request.GET.get('archived') == '1'
         
-        # Start with optimized base query
-        contacts_list = Contact.objects.select_related('resolved_by').order_by('-created_at')
-        
-        # Apply filters
-        if query:
-            contacts_list = contacts_list.filter(
-                Q(name__icontains=query) | 
-                Q(email__icontains=query) | 
-                Q(subject__icontains=query)
-            )
-        
-        if status == 'resolved':
-            contacts_list = contacts_list.filter(is_resolved=True)
-        elif status == 'pending':
-            contacts_list = contacts_list.filter(is_resolved=False)
+        # Optimized, filtered base query
+        contacts_list = contact_list_queryset(query, status, archived)
 
         # Paginate results
-        paginator = Paginator(contacts_list, 10)
+        paginator = Paginator(contacts_list, CONTACTS_PER_PAGE)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
 
         context = {
             'contacts': page_obj, 
+            'facets': get_contact_facets(query, archived),
             'query': query, 
-            'status': status
+            'status': status,
+            'archived': archived
         }
         return render(request, 'core/contact_list.html', context)
         
@@ -174,6 +235,38 @@ def contact_list_view(request):
 
 @login_required
 @require_http_methods(["GET"])
+def analytics_view(request):
+    """Staff dashboard of contact trends read from pre-aggregated rollups"""
+    if not request.user.is_staff:
+        messages.error(request, 'You do not have permission to view this page.')
+        return redirect('core:home')
+
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in ('hour', 'day'):
+        granularity = 'day'
+    default_span = 48 if granularity == 'hour' else 30
+    span = min(max(safe_int(request.GET.get('span'), default_span), 1), 366)
+    span_delta = timedelta(hours=span) if granularity == 'hour' else timedelta(days=span)
+
+    try:
+        series, totals = get_rollup_series(granularity, since=timezone.now() - span_delta)
+    except Exception as e:
+        logger.error(f"Error loading contact analytics: {e}")
+        messages.error(request, 'Error loading analytics. Please try again.')
+        return redirect('core:home')
+
+    context = {
+        'series': series,
+        'totals': totals,
+        'granularity': granularity,
+        'span': span,
+        'categories': Contact.SUBJECT_CHOICES,
+    }
+    return render(request, 'core/analytics.html', context)
+
+@login_required
+@require_http_methods(["GET"])
+@contact_data_conditional
 def api_pending_contacts_count(request):
     """API endpoint to get current pending contacts count"""
     if not request.user.is_staff:
@@ -191,6 +284,91 @@ def api_pending_contacts_count(request):
         logger.error(f"Error getting pending contacts count: {e}")
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
+@login_required
+@require_http_methods(["GET"])
+def export_contacts_view(request):
+    """Stream filtered contacts as CSV or JSONL, optionally gzipped"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unsupported format: {export_format}'}, status=400)
+
+    query = request.GET.get('q', '').strip()
+    status = request.GET.get('status', '')
+    compress = request.GET.get('gzip') in ('1', 'true', 'yes')
+    archived = request.GET.get('archived') == '1'
+
+    source = ArchivedContact.objects.all() if archived else Contact.objects.all()
+    contacts = on_replica(filter_contacts(source, query, status))
+    prefix = 'archived-contacts' if archived else 'contacts'
+    filename = f"{prefix}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    content_type = EXPORT_CONTENT_TYPES[export_format]
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    logger.info(f"Contact export ({export_format}, gzip={compress}) started by {request.user.username}")
+    chunks = stream_contacts(contacts, export_format, compress=compress)
+    if isinstance(request, ASGIRequest):
+        # Under ASGI a sync iterator would be read into memory in one go
+        chunks = aiter_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+@require_http_methods(["GET"])
+def api_contact_changes(request):
+    """Change feed of created/resolved contacts after a cursor"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    after = safe_int(request.GET.get('after'), 0)
+    limit = safe_int(request.GET.get('limit'), DEFAULT_FEED_LIMIT)
+    since = None
+    if request.GET.get('since'):
+        since = parse_datetime(request.GET['since'])
+        if since is None:
+            return JsonResponse({'error': 'Invalid since timestamp'}, status=400)
+
+    try:
+        changes, next_cursor, has_more = get_contact_changes(after, limit, since)
+        return JsonResponse({
+            'changes': changes,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        })
+    except Exception as e:
+        logger.error(f"Error reading contact change feed: {e}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+
+@login_required
+@require_http_methods(["GET"])
+def api_availability_filter_stats(request):
+    """Hit and false-positive counters of this process's availability filters"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    return JsonResponse({'filters': get_filter_stats()})
+
+@login_required
+@require_http_methods(["GET"])
+def api_validation_cache_stats(request):
+    """Hit and miss counters of this process's validation result cache"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    return JsonResponse({'cache': get_validation_cache().stats()})
+
+@require_http_methods(["GET"])
+@cache_control(public=True, max_age=300)
+@etag(lambda request: client_validation_script()[1])
+def validation_rules_js(request):
+    """Field rules run in the browser before the validation endpoints (see core.batch_validation)"""
+    return HttpResponse(client_validation_script()[0], content_type='text/javascript; charset=utf-8')
+
 # Enhanced validation endpoints with comprehensive field support
 @require_http_methods(["POST"])
 def validate_name(request):
@@ -200,18 +378,16 @@ def validate_name(request):
         return HttpResponse('')
     
     try:
-        # Use the enhanced validate_name from utils
-        from .utils import validate_name as validate_name_util
-        is_valid, message = validate_name_util(name)
+        is_valid, message = utils.validate_name(name)
         log_validation_attempt('name', name, is_valid, request)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating name: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_email(request):
@@ -221,24 +397,12 @@ def validate_email(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_email_format(email)
-        
-        if not is_valid:
-            return render(request, 'partials/validation_error.html', {'message': message})
-        
-        # Check if email has contacted before (warning, not error)
-        if Contact.objects.filter(email=email).exists():
-            return render(request, 'partials/validation_warning.html', {
-                'message': 'This email has contacted us before'
-            })
-        else:
-            return render(request, 'partials/validation_success.html', {
-                'message': '✓ Email looks good!'
-            })
+        template_type, message = check_contact_email(email, request.POST, request.user)
+        return render_validation_response(template_type, message, request)
         
     except Exception as e:
         logger.error(f"Error validating email: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_subject(request):
@@ -248,15 +412,15 @@ def validate_subject(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_subject(subject)
+        is_valid, message = utils.validate_subject(subject)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating subject: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_message(request):
@@ -266,15 +430,15 @@ def validate_message(request):
         return HttpResponse('')
     
     try:
-        is_valid, msg = validate_message(message)
+        is_valid, msg = utils.validate_message(message)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': msg})
+            return render_validation_response('success', msg, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': msg})
+            return render_validation_response('error', msg, request)
     except Exception as e:
         logger.error(f"Error validating message: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_newsletter_email(request):
@@ -284,15 +448,24 @@ def validate_newsletter_email(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_newsletter_email(email)
+        is_valid, message = utils.validate_newsletter_email(email)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_warning.html', {'message': message})
+            return render_validation_response('warning', message, request)
     except Exception as e:
         logger.error(f"Error validating newsletter email: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
+
+@require_http_methods(["POST"])
+def validate_batch(request):
+    """Validate the fields edited since the form's last batch and their dependents, answering with out-of-band swaps"""
+    changed = [field for field in request.POST.get('validate_fields', '').split(',') if field]
+    fragments = validate_fields(request.POST.get('validate_form', ''), request.POST, request, changed=changed)
+    if fragments is None:
+        return HttpResponse('Unknown form', status=400)
+    return HttpResponse(fragments)
 
 # Profile validation endpoints (for user profile forms)
 @require_http_methods(["POST"])
@@ -303,15 +476,15 @@ def validate_phone_number(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_phone_number(phone)
+        is_valid, message = utils.validate_phone_number(phone)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating phone number: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_website(request):
@@ -321,15 +494,15 @@ def validate_website(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_website(website)
+        is_valid, message = utils.validate_website(website)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating website: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
 
 @require_http_methods(["POST"])
 def validate_location(request):
@@ -339,12 +512,12 @@ def validate_location(request):
         return HttpResponse('')
     
     try:
-        is_valid, message = validate_location(location)
+        is_valid, message = utils.validate_location(location)
         
         if is_valid:
-            return render(request, 'partials/validation_success.html', {'message': message})
+            return render_validation_response('success', message, request)
         else:
-            return render(request, 'partials/validation_error.html', {'message': message})
+            return render_validation_response('error', message, request)
     except Exception as e:
         logger.error(f"Error validating location: {e}")
-        return render(request, 'partials/validation_error.html', {'message': 'Validation error occurred'})
+        return render_validation_response('error', 'Validation error occurred', request)
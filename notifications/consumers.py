@@ -62,3 +62,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'type': 'count_update',
             'data': event['data']
         }))
+
+    # Handle bulk import summaries
+    async def contacts_imported_notification(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'contacts_imported',
+            'data': event['data']
+        }))
@@ -1,4 +1,5 @@
 from django.db.models.signals import post_save
+from django.db import transaction
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
@@ -11,7 +12,8 @@ def notify_new_contact(sender, instance, created, **kwargs):
     """
     Send real-time notification when a new contact is created
     """
-    if created:  # Only trigger for new contacts
+    # Only trigger for new contacts; auto-resolved duplicates are not broadcast
+    if created and not instance.is_resolved:
         channel_layer = get_channel_layer()
 
         # Prepare notification data
@@ -26,24 +28,58 @@ def notify_new_contact(sender, instance, created, **kwargs):
             'message_preview': instance.message[:100] + "..." if len(instance.message) > 100 else instance.message,
         }
 
-        # Send notification to admin group
-        async_to_sync(channel_layer.group_send)(
-            'admin_notifications',
-            {
-                'type': 'new_contact_notification',
-                'data': notification_data
-            }
-        )
-
-        # Also send updated count
-        pending_count = Contact.objects.filter(is_resolved=False).count()
-        async_to_sync(channel_layer.group_send)(
-            'admin_notifications',
-            {
-                'type': 'notification_count_update',
-                'data': {
-                    'pending_count': pending_count,
-                    'total_count': Contact.objects.count()
+        def send():
+            # Send notification to admin group
+            async_to_sync(channel_layer.group_send)(
+                'admin_notifications',
+                {
+                    'type': 'new_contact_notification',
+                    'data': notification_data
                 }
+            )
+
+            # Also send updated count
+            broadcast_contact_counts()
+
+        # Batched saves commit several contacts at once; only announce
+        # contacts that are committed (runs immediately in autocommit mode)
+        transaction.on_commit(send)
+
+
+def broadcast_contact_counts():
+    """
+    Push the current pending/total contact counts to the admin group
+    """
+    channel_layer = get_channel_layer()
+    pending_count = Contact.objects.filter(is_resolved=False).count()
+    async_to_sync(channel_layer.group_send)(
+        'admin_notifications',
+        {
+            'type': 'notification_count_update',
+            'data': {
+                'pending_count': pending_count,
+                'total_count': Contact.objects.count()
             }
-        )
+        }
+    )
+
+
+def notify_contacts_imported(imported, skipped=0, source=''):
+    """
+    Send a single summary notification for a bulk contact import
+    instead of one notification per row
+    """
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        'admin_notifications',
+        {
+            'type': 'contacts_imported_notification',
+            'data': {
+                'imported': imported,
+                'skipped': skipped,
+                'source': source,
+                'finished_at': timezone.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+        }
+    )
+    broadcast_contact_counts()
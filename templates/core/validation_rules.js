@@ -0,0 +1,164 @@
+// Field validation rules exported from core/rules.py and run in the browser
+// before any request is made, and the per-form record of which fields a
+// batch request has to check. Served by core.views.validation_rules_js;
+// change the rules in core/rules.py, not here.
+(function () {
+    const config = {{ config|safe }};
+
+    const parts = {
+        lower: (value) => value.toLowerCase(),
+        domain: (value) => value.slice(value.lastIndexOf('@') + 1),
+        localPart: (value) => value.split('@')[0],
+        compactLower: (value) => value.replace(/ /g, '').toLowerCase(),
+        digits: (value) => value.replace(/\D/g, ''),
+        host: (value) => {
+            const match = /^[a-zA-Z][a-zA-Z0-9+.-]*:\/\/([^\/?#]*)/.exec(value);
+            return match ? match[1].toLowerCase() : '';
+        },
+    };
+
+    const normalizers = {
+        strip: (value) => value.trim(),
+        stripLower: (value) => value.trim().toLowerCase(),
+        withScheme: (value) => {
+            value = value.trim();
+            return value && !/^https?:\/\//.test(value) ? 'https://' + value : value;
+        },
+    };
+
+    // Lengths in code points, as Python counts them
+    const length = (value) => Array.from(value).length;
+    const words = (value) => value.split(/\s+/).filter(Boolean);
+
+    const counters = {
+        letters: (value) => (value.match(/\p{L}/gu) || []).length,
+        words: (value) => words(value).length,
+        distinct: (value) => new Set(Array.from(value)).size,
+    };
+
+    const checks = {
+        // One word of three or more letters making up over 30% of a longer message
+        repetitive: (value) => {
+            const all = words(value.toLowerCase());
+            if (all.length <= 10) return false;
+            const seen = new Map();
+            let top = 0;
+            for (const word of all) {
+                seen.set(word, (seen.get(word) || 0) + 1);
+                if (length(word) > 2) top = Math.max(top, seen.get(word));
+            }
+            return top > all.length * 0.3;
+        },
+    };
+
+    const fails = {
+        minLength: (rule, value) => length(value) < rule.limit,
+        maxLength: (rule, value) => length(value) > rule.limit,
+        matches: (rule, value) => !rule.regex.test(value),
+        rejects: (rule, value) => (value.match(rule.regex) || []).length > rule.allowed,
+        oneOf: (rule, value) => rule.words.includes(value),
+        contains: (rule, value) => rule.words.filter((word) => value.includes(word)).length > rule.allowed,
+        scan: (rule, value) => {
+            const text = value.toLowerCase();
+            return rule.patterns.filter((pattern) => text.includes(pattern)).length > rule.allowed;
+        },
+        minCount: (rule, value) => counters[rule.counter](value) < rule.limit,
+        check: (rule, value) => checks[rule.name](value),
+    };
+
+    for (const field of Object.values(config.fields)) {
+        for (const rule of field.rules) {
+            // u: match code points, as Python does, not UTF-16 units
+            if (rule.type === 'matches') rule.regex = new RegExp(rule.pattern, 'u');
+            if (rule.type === 'rejects') rule.regex = new RegExp(rule.pattern, 'gu');
+        }
+    }
+
+    const escapes = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;' };
+    const escapeHtml = (text) => String(text).replace(/[&<>"']/g, (c) => escapes[c]);
+
+    function format(message, label, value) {
+        return message.replace(/\{(field|field_lower|words)\}/g, (_, key) => {
+            if (key === 'field') return label;
+            if (key === 'field_lower') return label.toLowerCase();
+            return counters.words(value);
+        });
+    }
+
+    function fragment(type, message) {
+        const [before, after] = config.fragments[type];
+        return before + escapeHtml(message) + after;
+    }
+
+    // {target, html} for a form field value, or null when the server must answer
+    function check(form, field, raw) {
+        const entry = (config.forms[form] || {})[field];
+        if (!entry) return null;
+        if (!raw.trim()) return { target: entry.target, html: '' };
+
+        const spec = config.fields[entry.rules];
+        const value = normalizers[spec.normalize](raw);
+        for (const rule of spec.rules) {
+            const part = rule.part ? parts[rule.part](value) : value;
+            if (fails[rule.type](rule, part)) {
+                return { target: entry.target, html: fragment(entry.invalid, format(rule.message, entry.label, value)) };
+            }
+        }
+        if (entry.server) return null;
+        return { target: entry.target, html: fragment('success', format(spec.success, entry.label, value)) };
+    }
+
+    // Fields edited since they were last checked, per form element
+    const edited = new WeakMap();
+
+    function editedFields(form) {
+        if (!edited.has(form)) edited.set(form, new Set());
+        return edited.get(form);
+    }
+
+    // Records an edit to a field the form's batch trigger checks
+    function changed(form, field) {
+        if ((config.batch[form] || []).includes(field.name)) editedFields(field.form).add(field.name);
+    }
+
+    // Runs when the form's debounced trigger fires. Edited fields the rules can
+    // answer are shown here, send(field) may take others (the WebSocket; it
+    // returns false when closed), and the rest stay queued for the batch
+    // request. Returns the targets answered here and the number still queued.
+    function flush(form, formElt, send) {
+        const fields = editedFields(formElt);
+        const answered = [];
+        for (const name of Array.from(fields)) {
+            const field = formElt.elements[name];
+            if (!field) {
+                fields.delete(name);
+                continue;
+            }
+            const result = check(form, name, field.value);
+            if (result) {
+                const container = document.getElementById(result.target);
+                if (container) container.innerHTML = result.html;
+                answered.push(result.target);
+                fields.delete(name);
+            } else if (send(field)) {
+                fields.delete(name);
+            }
+        }
+        return { answered, queued: fields.size };
+    }
+
+    // Names for the batch request; restore() queues them again if it fails
+    function take(formElt) {
+        const fields = editedFields(formElt);
+        const names = Array.from(fields);
+        fields.clear();
+        return names;
+    }
+
+    function restore(formElt, names) {
+        const fields = editedFields(formElt);
+        for (const name of names) fields.add(name);
+    }
+
+    window.clientValidation = { check, changed, flush, take, restore };
+})();